@@ -39,6 +39,52 @@ class Settings(BaseSettings):
     groq_llm_model: str = "llama-3.3-70b-versatile"  # Groq model for LLM tasks
     groq_report_api_key: str | None = None  # Groq API key for report generation
     
+    # Shared LLM client (services/llm_client.py) - pooled keep-alive connections for all LLM calls
+    llm_timeout_seconds: float = 30.0  # Default read timeout (call sites pass shorter ones)
+    llm_connect_timeout_seconds: float = 5.0
+    llm_report_timeout_seconds: float = 60.0  # Report agents (long JSON generations)
+    llm_max_retries: int = 2  # Retries on connection errors, 429 and 5xx
+    llm_retry_backoff_seconds: float = 0.25  # First retry delay (doubles per retry)
+    llm_retry_max_wait_seconds: float = 5.0  # Cap on any retry delay, including Retry-After
+    llm_max_connections: int = 20  # Pooled connections per client
+    llm_keepalive_seconds: float = 60.0  # Idle time before a pooled connection is closed
+    llm_http2: bool = True  # Use HTTP/2 where supported (needs the h2 package)
+    llm_coalesce_enabled: bool = True  # Identical concurrent requests share one upstream call
+    
+    # Multi-provider failover for helper texts (HedgedLLMAdapter in services/llm_adapter.py)
+    llm_failover_providers: list[Literal["gemini", "ollama", "groq"]] = []  # Asked after llm_provider, in order, e.g. ["ollama", "gemini"]
+    llm_hedge_budget_seconds: float = 12.0  # Longest a helper call waits across providers before the canned fallback
+    llm_hedge_default_delay_seconds: float = 2.0  # Hedge delay until a provider has its own p95 latency
+    
+    # Circuit breakers (services/circuit_breaker.py) - one per provider endpoint
+    circuit_breaker_enabled: bool = True
+    circuit_breaker_failure_threshold: int = 3  # Consecutive failed calls (errors/timeouts, after retries) that open it
+    circuit_breaker_open_seconds: float = 30.0  # Time open before a single probe call is let through
+    
+    # Prompt packing (services/prompt_budget.py) - retrieved chunks packed into a token budget per provider/model
+    prompt_tokenizer: Literal["tiktoken", "tokenizers", "heuristic"] = "heuristic"  # "tiktoken" needs the optional package (requirements.txt)
+    prompt_tokenizer_name: str = "cl100k_base"  # tiktoken encoding, or a tokenizer.json path for "tokenizers"
+    prompt_context_budget_tokens: int = 600  # Context tokens per helper prompt, unless set below
+    prompt_context_budgets: dict[str, int] = {"ollama": 350, "groq": 700, "gemini": 1200}  # By "provider" or "provider:model"
+    
+    # Helper response cache (services/helper_cache.py) - memory LRU + SQLite, both with TTL
+    helper_cache_enabled: bool = True
+    helper_cache_max_entries: int = 1024  # In-memory LRU entries (0 = disk tier only)
+    helper_cache_ttl_seconds: float = 86400.0  # Entry lifetime in both tiers
+    helper_cache_path: str = "app/data/helper_cache.sqlite3"  # Disk tier, shared by workers ("" disables)
+    
+    # Semantic cache (services/semantic_cache.py) - reuse helper/extraction results for paraphrases
+    semantic_cache_enabled: bool = True
+    semantic_cache_helper_threshold: float = 0.90  # Cosine similarity for reusing a helper text
+    semantic_cache_extraction_threshold: float = 0.97  # Stricter: "it is black" vs "it is red" embed closely
+    semantic_cache_store: Literal["memory", "sqlite"] = "sqlite"
+    semantic_cache_path: str = "app/data/semantic_cache.sqlite3"  # Used by the "sqlite" store
+    semantic_cache_max_entries: int = 256  # Per (parameter, language, model) bucket, oldest evicted first
+    semantic_cache_ttl_seconds: float = 86400.0
+    
+    # Async hot path (services/blocking_pool.py) - threads for CPU-bound and blocking-SDK work
+    blocking_pool_workers: int = 8  # Bounded: extra work queues instead of spawning threads
+    
     # Multiple Gemini keys for load distribution
     gemini_api_key_1: str | None = None  # For soil analysis
     gemini_api_key_2: str | None = None  # For crop recommendations
@@ -48,9 +94,27 @@ class Settings(BaseSettings):
     asr_provider: Literal["groq", "local_whisper", "openai"] = "groq"
     tts_provider: Literal["gtts", "coqui", "openai"] = "gtts"
     
+    # API key pool (services/key_pool.py) - all Groq / Gemini keys above, shared by every call site
+    key_pool_groq_rpm: int = 30  # Requests per minute, per key (0 = no limit)
+    key_pool_groq_tpm: int = 12000  # Tokens per minute, per key (0 = no limit)
+    key_pool_whisper_rpm: int = 20  # Groq Whisper requests per minute, per key
+    key_pool_gemini_rpm: int = 15
+    key_pool_gemini_tpm: int = 1000000
+    key_pool_weights: dict[str, float] = {}  # Rotation weight by setting name, e.g. {"groq_report_api_key": 2}
+    key_pool_max_wait_seconds: float = 20.0  # Longest a call queues for a key before failing
+    key_pool_cooldown_seconds: float = 10.0  # Key pause after an upstream 429 without Retry-After
+    
     # Embeddings Configuration
     embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
     hf_token: str | None = None  # Hugging Face token for private models
+    query_embedding_cache_size: int = 512  # LRU entries for query embeddings (0 disables)
+    embedding_cache_enabled: bool = True  # Persistent text-hash -> vector cache (services/embedding_cache.py)
+    embedding_cache_path: str = "app/data/embedding_cache.sqlite3"  # Shared by all workers and ingestion
+    embedding_num_threads: int = 0  # torch intra-op threads for encoding (0 = torch default)
+    embedding_max_concurrency: int = 2  # Concurrent encode calls per process
+    embedding_backend: Literal["torch", "onnx"] = "torch"  # "onnx" needs export_onnx_model.py first
+    embedding_onnx_dir: str = "app/data/onnx"  # Exported ONNX model + tokenizer
+    embedding_onnx_quantized: bool = True  # Use the int8 model when present
     
     # n8n Integration
     n8n_webhook_url: str = "http://localhost:5678/webhook/soil-report"  # Default n8n webhook URL
@@ -59,6 +123,27 @@ class Settings(BaseSettings):
     kb_raw_dir: str = "app/data/kb_raw"
     kb_processed_dir: str = "app/data/kb_processed"
     embeddings_dir: str = "app/data/embeddings"
+    kb_index_mmap: bool = True  # Memory-map FAISS index + chunk metadata (shared across workers)
+    kb_ingest_batch_size: int = 64  # Chunks per embedding batch during preprocessing
+    kb_ingest_workers: int = 0  # Chunking processes during preprocessing (0 = CPU count)
+    kb_ingest_queue_size: int = 8  # Items buffered between ingestion stages
+    kb_dedup_threshold: float = 0.85  # MinHash Jaccard at which a chunk is dropped as a near-duplicate (>1 disables)
+    admin_token: str | None = None  # X-Admin-Token for /api/v1/admin (KB hot reload); unset disables
+    kb_reload_poll_seconds: float = 5.0  # How often each worker checks for a KB reload published by another (0 disables)
+    
+    # FAISS index type (see services/ann_index.py) - re-run preprocessing after changing
+    kb_index_type: Literal["flat", "hnsw", "ivfpq"] = "flat"
+    kb_hnsw_m: int = 32  # HNSW graph degree
+    kb_hnsw_ef_construction: int = 200  # HNSW build-time beam width
+    kb_hnsw_ef_search: int = 64  # HNSW query-time beam width (applied at load)
+    kb_ivf_nlist: int = 1024  # IVF centroids (capped by training data size)
+    kb_ivf_nprobe: int = 16  # IVF lists probed per query (applied at load)
+    kb_pq_m: int = 48  # PQ sub-quantizers (must divide embedding dim, 384 for MiniLM)
+    
+    # Hybrid retrieval (BM25 + vectors, see services/lexical_index.py)
+    rag_overfetch_factor: int = 2  # Vector candidates per result when fusing with BM25
+    rag_rrf_k: int = 60  # Reciprocal-rank fusion constant
+    rag_lexical_skip_threshold: float = 0.7  # BM25 confidence (1 = every query term once in an average chunk) at which embedding is skipped (>1 disables)
     
     # API Configuration - use private field name to avoid env parsing
     _allowed_origins: list[str] | None = None
@@ -2,11 +2,16 @@
 FastAPI application entry point for Argovers Soil Assistant.
 
 Initializes:
-- RAG engine (loads FAISS index)
+- RAG engine (loads FAISS index) - in the background, see services/warmup.py
 - LLM adapter (Gemini or local)
 - FastAPI app with routes
 - CORS middleware
 
+Probes:
+- /health - liveness (process is up) + per-call-site LLM latency/token stats
+  and provider circuit breaker states
+- /ready  - readiness (warm-up finished with a KB loaded; 503 until then)
+
 To run:
     uvicorn app.main:app --reload
 
@@ -14,14 +19,19 @@ To change LLM provider:
     Update llm_provider in config.py and set corresponding API key
 """
 
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from .config import settings
-from .routes import sessions, reports
+from .routes import sessions, reports, admin
 from .services.rag_engine import RAGEngine
 from .services.llm_adapter import create_llm_adapter
+from .services.llm_client import get_llm_client
+from .services.blocking_pool import shutdown_blocking_pool
+from .services.warmup import run_warmup, warmup_status
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -44,6 +54,20 @@ app.add_middleware(
 # Initialize RAG engine and LLM adapter
 rag_engine: RAGEngine | None = None
 llm_adapter = None
+warmup_task: asyncio.Future | None = None
+
+
+async def warm_up_in_background() -> None:
+    """Load and warm the RAG engine off the event loop, then hand it to the routes."""
+    global rag_engine
+    
+    loop = asyncio.get_running_loop()
+    engine = await loop.run_in_executor(None, run_warmup)
+    if engine is not None:
+        rag_engine = engine
+        sessions.set_rag_engine(rag_engine)
+        rag_engine.start_reload_watcher()  # KB reloads published by other workers
+        print("✓ RAG engine ready")
 
 
 @app.on_event("startup")
@@ -52,24 +76,14 @@ async def startup_event():
     Initialize services on application startup.
     
     Loads:
-    - RAG engine (FAISS index + embedding model)
-
+    - LLM adapter (blocking - required)
+    - RAG engine (FAISS index + embedding model), warmed in the background
+      so the server accepts connections immediately; /ready flips when done
     """
-    global rag_engine, llm_adapter
+    global llm_adapter, warmup_task
     
     print("🚀 Starting Argovers Soil Assistant...")
     
-    # Initialize RAG engine
-    try:
-        rag_engine = RAGEngine()
-        sessions.set_rag_engine(rag_engine)
-        print("✓ RAG engine ready")
-    except Exception as e:
-        print(f"⚠ Warning: RAG engine initialization failed: {e}")
-        print("  Helper mode will not work until index is built.")
-        # Create a dummy engine that returns empty results
-        rag_engine = None
-    
     # Initialize LLM adapter
     try:
         llm_adapter = create_llm_adapter()
@@ -79,17 +93,25 @@ async def startup_event():
         print(f"✗ Error: LLM adapter initialization failed: {e}")
         print("  Please check your API keys in .env file")
         raise
+    
+    # Warm up RAG engine without blocking startup
+    warmup_task = asyncio.ensure_future(warm_up_in_background())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on application shutdown."""
     print("👋 Shutting down Argovers Soil Assistant...")
+    if rag_engine is not None:
+        rag_engine.stop_reload_watcher()
+    await get_llm_client().aclose()
+    shutdown_blocking_pool()
 
 
 # Include routers
 app.include_router(sessions.router)
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
+app.include_router(admin.router)
 
 # Mount static files for audio
 audio_dir = Path(__file__).parent / "data" / "audio"
@@ -109,9 +131,25 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """Health check endpoint."""
+    """Health check endpoint (liveness - healthy while warming up too)."""
     return {
         "status": "healthy",
         "rag_ready": rag_engine.is_ready() if rag_engine else False,
+        "warmup": warmup_status.state,
+        "kb_generation": rag_engine.generation_counter if rag_engine else 0,
+        "kb_content_id": rag_engine.content_id if rag_engine else "",
+        "llm": get_llm_client().stats(),
+    }
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once warm-up has finished with a KB loaded, 503 before (or without one)."""
+    rag_ready = rag_engine.is_ready() if rag_engine else False
+    body = {
+        "ready": warmup_status.is_finished() and rag_ready,
+        "rag_ready": rag_ready,
+        "warmup": warmup_status.to_dict(),
     }
+    return JSONResponse(status_code=200 if body["ready"] else 503, content=body)
 
@@ -0,0 +1,103 @@
+"""
+Admin routes for operating the knowledge base without restarts.
+
+Endpoints:
+- POST /api/v1/admin/kb/reload - Load the KB on disk as a new generation, in
+  every worker
+- GET /api/v1/admin/kb/status - Current generation and last reload result
+
+Rebuilding is not done here - it is a heavy job with its own process pool;
+run preprocess_kb_improved.py (it writes next to the live files), then call
+the reload endpoint. The worker that receives the call loads and validates
+the new generation, then publishes it; the other workers pick it up within
+`kb_reload_poll_seconds` (see RAGEngine.check_reload_marker).
+
+Requires the X-Admin-Token header to match `admin_token` in config.py;
+the endpoints are disabled while no token is configured.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException
+from ..config import settings
+from ..services.rag_engine import RAGEngine
+from .sessions import get_rag_engine_dep
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
+
+
+# Last reload job (one at a time per worker)
+_reload_lock = threading.Lock()  # Held by the running _run_reload
+_reload_state_lock = threading.Lock()
+_reload_state: Dict[str, Any] = {
+    "status": "idle",  # "idle", "running", "completed", "failed"
+    "started_at": None,
+    "finished_at": None,
+    "generation": None,
+    "error": None,
+}
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """Dependency: check the admin token."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints disabled (set ADMIN_TOKEN)")
+    if x_admin_token != settings.admin_token:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def _run_reload(rag_engine: RAGEngine) -> None:
+    """Background job: load and swap a new generation, then publish it to the other workers."""
+    with _reload_lock:
+        try:
+            generation = rag_engine.reload()
+            if generation is None:
+                raise RuntimeError("New KB generation failed to load - still serving the previous one")
+            rag_engine.publish_reload()
+            result = {"status": "completed", "generation": generation.number}
+            print(f"✓ KB hot reload complete: generation {generation.number} ({generation.content_id})")
+        except Exception as e:
+            result = {"status": "failed", "error": str(e)}
+            print(f"✗ KB hot reload failed: {e}")
+        with _reload_state_lock:
+            _reload_state.update(result, finished_at=time.time())
+
+
+@router.post("/kb/reload", status_code=202, dependencies=[Depends(require_admin)])
+async def reload_kb(
+    background_tasks: BackgroundTasks,
+    rag_engine: RAGEngine = Depends(get_rag_engine_dep),
+) -> Dict[str, Any]:
+    """
+    Load the KB on disk as a new generation in the background and swap it
+    in atomically, here and (via the reload marker) in every other worker.
+    """
+    with _reload_state_lock:
+        if _reload_state["status"] == "running":
+            raise HTTPException(status_code=409, detail="A KB reload is already running")
+        _reload_state.update(
+            status="running",
+            started_at=time.time(),
+            finished_at=None,
+            generation=None,
+            error=None,
+        )
+    background_tasks.add_task(_run_reload, rag_engine)
+
+    return {
+        "status": "started",
+        "current_generation": rag_engine.generation_counter,
+    }
+
+
+@router.get("/kb/status", dependencies=[Depends(require_admin)])
+async def kb_status(rag_engine: RAGEngine = Depends(get_rag_engine_dep)) -> Dict[str, Any]:
+    """Current KB generation and the last reload job."""
+    generation = rag_engine.generation
+    with _reload_state_lock:
+        reload_state = dict(_reload_state)
+    return {
+        "generation": generation.info() if generation else None,
+        "reload": reload_state,
+    }
@@ -4,11 +4,14 @@ API routes for session management and soil test wizard.
 Endpoints:
 - POST /api/v1/session/start - Start new session
 - POST /api/v1/session/next - Submit answer and get next step
+- POST /api/v1/session/next/stream - Same, as Server-Sent Events (helper text streamed)
 - GET /api/v1/session/state/{session_id} - Get current session state
 """
 
+import json
 from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, Optional
 from ..models import (
     StartSessionRequest,
     StartSessionResponse,
@@ -24,12 +27,16 @@ from ..services.orchestrator import (
     PARAMETER_ORDER,
     handle_user_message,
 )
-from ..services.orchestrator_enhanced import handle_user_message_enhanced
+from ..services.orchestrator_enhanced import (
+    handle_user_message_enhanced_async,
+    stream_user_message_enhanced,
+)
 from ..services.rag_engine import RAGEngine
 from ..services.llm_adapter import LLMAdapter
 # n8n removed - using direct LLM report generation
 from ..services.stt_service import create_stt_service
 from ..services.tts_service import create_tts_service
+from ..services.warmup import warmup_status
 
 router = APIRouter(prefix="/api/v1/session", tags=["sessions"])
 
@@ -68,6 +75,8 @@ def set_llm_adapter(adapter: LLMAdapter) -> None:
 def get_rag_engine_dep() -> RAGEngine:
     """Dependency function that returns RAG engine."""
     if _rag_engine is None:
+        if warmup_status.state in ("pending", "running"):
+            raise HTTPException(status_code=503, detail="RAG engine warming up, retry shortly")
         raise HTTPException(status_code=500, detail="RAG engine not initialized")
     return _rag_engine
 
@@ -93,7 +102,7 @@ async def start_session(request: StartSessionRequest) -> StartSessionResponse:
     tts_service = create_tts_service()
     audio_url = ""
     try:
-        audio_path = tts_service.synthesize(question, request.language)
+        audio_path = await tts_service.asynthesize(question, request.language)
         audio_url = tts_service.get_audio_url(audio_path, base_url="http://localhost:8001")
         print(f"✓ TTS generated for first question: {audio_url}")
     except Exception as e:
@@ -140,8 +149,8 @@ async def next_message(
     stt_service = create_stt_service() if audio_bytes else None
     tts_service = create_tts_service()
     
-    # Process through enhanced orchestrator
-    response, audit = handle_user_message_enhanced(
+    # Process through enhanced orchestrator (non-blocking: LLM/STT I/O is async, CPU work is pooled)
+    response, audit = await handle_user_message_enhanced_async(
         session=session,
         user_message=user_text,
         audio_bytes=audio_bytes,
@@ -151,7 +160,73 @@ async def next_message(
         tts_service=tts_service,
     )
     
-    # Update session state
+    _save_turn(session, response, audit)
+    
+    # n8n removed - report generation happens via /api/reports/generate endpoint
+    
+    return response
+
+
+@router.post("/next/stream")
+async def next_message_stream(
+    session_id: str = Form(...),
+    user_text: Optional[str] = Form(None),
+    audio_file: Optional[UploadFile] = File(None),
+    rag_engine: RAGEngine = Depends(get_rag_engine_dep),
+    llm: LLMAdapter = Depends(get_llm_dep),
+) -> StreamingResponse:
+    """
+    Streaming version of /next (Server-Sent Events).
+    
+    Same form fields. Events:
+    - token: {"text": "..."} - helper text pieces as the LLM produces them
+    - final: NextMessageResponse - always last (the same payload /next returns)
+    - error: {"detail": "..."} - if the turn failed
+    
+    Time to first text matters most on slow links, so helper text is
+    sent as it is generated instead of after the full completion.
+    """
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    audio_bytes = await audio_file.read() if audio_file else None
+    stt_service = create_stt_service() if audio_bytes else None
+    tts_service = create_tts_service()
+    
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for kind, payload in stream_user_message_enhanced(
+                session=session,
+                user_message=user_text,
+                audio_bytes=audio_bytes,
+                rag_engine=rag_engine,
+                llm=llm,
+                stt_service=stt_service,
+                tts_service=tts_service,
+            ):
+                if kind == "token":
+                    yield _sse("token", json.dumps({"text": payload}, ensure_ascii=False))
+                else:
+                    response, audit = payload
+                    _save_turn(session, response, audit)
+                    yield _sse("final", response.model_dump_json())
+        except Exception as e:
+            print(f"✗ Streaming turn failed: {e}")
+            yield _sse("error", json.dumps({"detail": str(e)}))
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Don't let nginx buffer the stream
+        },
+    )
+
+
+def _save_turn(session: SessionState, response: NextMessageResponse, audit: Dict[str, Any]) -> None:
+    """Persist the session after a turn and log its audit data."""
     session.current_parameter = response.parameter
     session.helper_mode = response.helper_mode
     session.answers = response.answers
@@ -159,10 +234,11 @@ async def next_message(
     
     # Log audit data
     print(f"📊 Audit: {audit}")
-    
-    # n8n removed - report generation happens via /api/reports/generate endpoint
-    
-    return response
+
+
+def _sse(event: str, data: str) -> str:
+    """One Server-Sent Events frame (data must be a single line - JSON is)."""
+    return f"event: {event}\ndata: {data}\n\n"
 
 
 @router.get("/state/{session_id}", response_model=SessionStateResponse)
@@ -0,0 +1,146 @@
+"""
+Pluggable FAISS index types for the knowledge base.
+
+Supported types (set `kb_index_type` in config.py):
+- "flat":  exact brute-force L2 (IndexFlatL2) - best for small KBs
+- "hnsw":  graph-based ANN (IndexHNSWFlat) - fast, high recall, more memory
+- "ivfpq": inverted file + product quantization (IndexIVFPQ) - compact,
+           for very large KBs; needs training data
+
+Small inputs fall back to "flat" where an ANN type can't be trained or
+wouldn't pay off; the type actually built is what gets recorded in the
+index manifest (kb_index_manifest.json).
+
+To add an index type: extend `build_index()` and `configure_search()`.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import faiss
+from ..config import settings
+from .kb_store import atomic_output, save_json
+
+
+MANIFEST_FILE = "kb_index_manifest.json"
+
+# Below this many vectors an ANN index isn't worth building
+MIN_ANN_VECTORS = 1000
+
+# FAISS recommends ~39 training points per IVF centroid
+IVF_POINTS_PER_CENTROID = 39
+
+# PQ uses 8-bit codes -> 256 centroids per sub-quantizer
+PQ_NBITS = 8
+
+
+def index_params(index_type: Optional[str] = None) -> Dict[str, Any]:
+    """Build-time parameters for an index type, taken from settings."""
+    index_type = index_type or settings.kb_index_type
+    if index_type == "hnsw":
+        return {"m": settings.kb_hnsw_m, "ef_construction": settings.kb_hnsw_ef_construction}
+    if index_type == "ivfpq":
+        return {"nlist": settings.kb_ivf_nlist, "pq_m": settings.kb_pq_m, "nbits": PQ_NBITS}
+    return {}
+
+
+def build_index(
+    embeddings: np.ndarray,
+    index_type: Optional[str] = None,
+    ids: Optional[np.ndarray] = None,
+) -> Tuple[faiss.Index, str, Dict[str, Any]]:
+    """
+    Build and populate a FAISS index of the requested type.
+
+    Args:
+        embeddings: float32 array of shape (n, dim)
+        index_type: "flat", "hnsw" or "ivfpq" (defaults to settings.kb_index_type)
+        ids: Optional int64 ids for the rows; wraps the index in IndexIDMap
+            so searches return these ids (used for shards)
+
+    Returns:
+        Tuple of (index, index_type actually built, build params)
+    """
+    index_type = index_type or settings.kb_index_type
+    n, dimension = embeddings.shape
+
+    if index_type != "flat" and n < MIN_ANN_VECTORS:
+        index_type = "flat"
+
+    if index_type == "ivfpq" and dimension % settings.kb_pq_m != 0:
+        print(f"⚠ PQ m={settings.kb_pq_m} doesn't divide dim={dimension}, using HNSW")
+        index_type = "hnsw"
+
+    params = index_params(index_type)
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, params["m"])
+        index.hnsw.efConstruction = params["ef_construction"]
+    elif index_type == "ivfpq":
+        # Never ask for more centroids than the data can train
+        params["nlist"] = max(1, min(params["nlist"], n // IVF_POINTS_PER_CENTROID))
+        quantizer = faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, params["nlist"], params["pq_m"], params["nbits"])
+        index.train(embeddings)
+    else:
+        index = faiss.IndexFlatL2(dimension)
+
+    if ids is not None:
+        index = faiss.IndexIDMap(index)
+        index.add_with_ids(embeddings, ids)
+    else:
+        index.add(embeddings)
+
+    return index, index_type, params
+
+
+def configure_search(index: faiss.Index) -> None:
+    """
+    Apply query-time parameters (efSearch / nprobe) from settings.
+
+    Works through IndexIDMap wrappers; a no-op for flat indexes.
+    """
+    inner = index
+    if isinstance(inner, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        inner = faiss.downcast_index(inner.index)
+
+    space = faiss.ParameterSpace()
+    if isinstance(inner, faiss.IndexHNSW):
+        space.set_index_parameter(index, "efSearch", settings.kb_hnsw_ef_search)
+    elif isinstance(inner, faiss.IndexIVF):
+        space.set_index_parameter(index, "nprobe", settings.kb_ivf_nprobe)
+
+
+def write_index_manifest(
+    embeddings_dir: str,
+    index_type: str,
+    params: Dict[str, Any],
+    ntotal: int,
+    dimension: int,
+) -> None:
+    """Record how the global index was built."""
+    manifest = {
+        "index_type": index_type,
+        "requested_index_type": settings.kb_index_type,
+        "params": params,
+        "ntotal": ntotal,
+        "dimension": dimension,
+        "embedding_model": settings.embedding_model_name,
+    }
+    save_json(os.path.join(embeddings_dir, MANIFEST_FILE), manifest, indent=2)
+
+
+def write_index(index: faiss.Index, path: str) -> None:
+    """Write a FAISS index atomically (safe while the old file is mmap'd)."""
+    with atomic_output(path) as tmp_path:
+        faiss.write_index(index, tmp_path)
+
+
+def read_index_manifest(embeddings_dir: str) -> Dict[str, Any]:
+    """Read the index manifest (empty dict for indexes built before it existed)."""
+    path = os.path.join(embeddings_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
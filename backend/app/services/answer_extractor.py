@@ -10,12 +10,42 @@ Examples:
 - "It looks dark, almost black" → extracts "black"
 """
 
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
+import numpy as np
 from ..models import Language
 from ..config import settings
+from .llm_client import GROQ_CHAT_URL, OLLAMA_URL, get_llm_client
+from .blocking_pool import run_blocking
+from .semantic_cache import (
+    SemanticHit,
+    get_semantic_cache,
+    log_hit,
+    names_other_value,
+    numbers_differ,
+    semantic_extraction_hit,
+)
+from .validators import (
+    COLOR_MAPPINGS,
+    MOISTURE_MAPPINGS,
+    SMELL_MAPPINGS,
+    SOIL_TYPE_MAPPINGS,
+    EARTHWORMS_MAPPINGS,
+)
 import re
 
 
+# Synonyms per parameter, used to refuse a semantic cache hit when the
+# message names a different value than the cached extraction (numeric
+# answers like pH are guarded by `numbers_differ` instead)
+VALUE_SYNONYMS: Dict[str, Dict[str, Dict[str, str]]] = {
+    "color": COLOR_MAPPINGS,
+    "moisture": MOISTURE_MAPPINGS,
+    "smell": SMELL_MAPPINGS,
+    "soil_type": SOIL_TYPE_MAPPINGS,
+    "earthworms": EARTHWORMS_MAPPINGS,
+}
+
+
 class AnswerExtractor:
     """Extracts structured answers from natural language using LLM."""
     
@@ -24,16 +54,14 @@ class AnswerExtractor:
         self.llm_provider = llm_provider
         
         if llm_provider == "groq":
-            self.base_url = "https://api.groq.com/openai/v1/chat/completions"
-            self.api_key = getattr(settings, 'groq_llm_api_key', None)
+            self.base_url = GROQ_CHAT_URL
             self.model_name = getattr(settings, 'groq_llm_model', 'llama-3.3-70b-versatile')
             print(f"✓ Answer extractor initialized with Groq ({self.model_name})")
         elif llm_provider == "ollama":
-            self.base_url = "http://localhost:11434"
+            self.base_url = OLLAMA_URL
             self.model_name = getattr(settings, 'ollama_model_name', 'llama3.2')
             print(f"✓ Answer extractor initialized with Ollama ({self.model_name})")
         elif llm_provider == "gemini":
-            self.api_key = settings.gemini_api_key
             self.model_name = settings.gemini_model_name
             print(f"✓ Answer extractor initialized with Gemini ({self.model_name})")
     
@@ -58,6 +86,11 @@ class AnswerExtractor:
             - extracted_value: One of expected_values or None
             - confidence: 0.0-1.0 confidence score
         """
+        hit, vector = self._semantic_lookup(user_message, parameter, language, expected_values)
+        semantic_extraction_hit.set(hit.audit("extraction") if hit else None)
+        if hit is not None:
+            return tuple(hit.payload)
+        
         # Build extraction prompt
         prompt = self._build_extraction_prompt(
             user_message, parameter, language, expected_values
@@ -65,13 +98,89 @@ class AnswerExtractor:
         
         # Call LLM
         if self.llm_provider == "groq":
-            return self._extract_with_groq(prompt, expected_values)
+            result = self._extract_with_groq(prompt, expected_values)
         elif self.llm_provider == "ollama":
-            return self._extract_with_ollama(prompt, expected_values)
+            result = self._extract_with_ollama(prompt, expected_values)
         elif self.llm_provider == "gemini":
-            return self._extract_with_gemini(prompt, expected_values)
+            result = self._extract_with_gemini(prompt, expected_values)
         else:
             return None, 0.0
+        
+        self._semantic_store(user_message, parameter, language, vector, result)
+        return result
+    
+    async def aextract_answer(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language,
+        expected_values: list[str]
+    ) -> Tuple[Optional[str], float]:
+        """Async variant of `extract_answer` (non-blocking LLM call)."""
+        # Embedding the message is CPU-bound
+        hit, vector = await run_blocking(
+            self._semantic_lookup, user_message, parameter, language, expected_values
+        )
+        semantic_extraction_hit.set(hit.audit("extraction") if hit else None)
+        if hit is not None:
+            return tuple(hit.payload)
+        
+        result = await self._aextract_with_llm(
+            self._build_extraction_prompt(user_message, parameter, language, expected_values),
+            expected_values,
+        )
+        if vector is not None and result[0] is not None:
+            # SQLite write
+            await run_blocking(self._semantic_store, user_message, parameter, language, vector, result)
+        return result
+    
+    async def _aextract_with_llm(
+        self,
+        prompt: str,
+        expected_values: list[str]
+    ) -> Tuple[Optional[str], float]:
+        """Extract answer with the configured provider (async I/O)."""
+        client = get_llm_client()
+        try:
+            if self.llm_provider == "groq":
+                result = await client.agroq_chat(
+                    [{"role": "user", "content": prompt}],
+                    model=self.model_name,
+                    call_site="extraction",
+                    timeout=10,
+                    temperature=0.1,
+                    max_tokens=10,
+                )
+            elif self.llm_provider == "ollama":
+                result = await client.aollama_generate(
+                    prompt,
+                    model=self.model_name,
+                    call_site="extraction",
+                    timeout=10,
+                    options={
+                        "temperature": 0.1,
+                        "num_predict": 10,
+                        "top_p": 0.9,
+                    },
+                    base_url=self.base_url,
+                )
+            elif self.llm_provider == "gemini":
+                result = await client.agemini_generate(
+                    prompt,
+                    model=self.model_name,
+                    call_site="extraction",
+                    timeout=10,
+                    temperature=0.1,
+                    max_output_tokens=20,
+                )
+            else:
+                return None, 0.0
+            
+            return self._parse_extraction(result.text.lower(), expected_values)
+        
+        except Exception as e:
+            print(f"✗ {self.llm_provider.capitalize()} extraction error: {e}")
+            return None, 0.0
     
     def _build_extraction_prompt(
         self,
@@ -114,35 +223,18 @@ Answer:"""
         expected_values: list[str]
     ) -> Tuple[Optional[str], float]:
         """Extract answer using Groq."""
-        import requests
-        
         try:
-            response = requests.post(
-                self.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model_name,
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.1,
-                    "max_tokens": 10,
-                },
-                timeout=10
+            result = get_llm_client().groq_chat(
+                [{"role": "user", "content": prompt}],
+                model=self.model_name,
+                call_site="extraction",
+                timeout=10,
+                temperature=0.1,
+                max_tokens=10,
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                extracted_text = result["choices"][0]["message"]["content"].strip().lower()
-                
-                # Parse response
-                return self._parse_extraction(extracted_text, expected_values)
-            else:
-                print(f"✗ Groq extraction error: {response.status_code}")
-                return None, 0.0
+            # Parse response
+            return self._parse_extraction(result.text.lower(), expected_values)
         
         except Exception as e:
             print(f"✗ Groq extraction error: {e}")
@@ -154,33 +246,22 @@ Answer:"""
         expected_values: list[str]
     ) -> Tuple[Optional[str], float]:
         """Extract answer using Ollama."""
-        import requests
-        
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,  # Very low for extraction
-                        "num_predict": 10,  # Short response
-                        "top_p": 0.9,
-                    }
+            result = get_llm_client().ollama_generate(
+                prompt,
+                model=self.model_name,
+                call_site="extraction",
+                timeout=10,
+                options={
+                    "temperature": 0.1,  # Very low for extraction
+                    "num_predict": 10,  # Short response
+                    "top_p": 0.9,
                 },
-                timeout=10
+                base_url=self.base_url,
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                extracted_text = result.get('response', '').strip().lower()
-                
-                # Parse response
-                return self._parse_extraction(extracted_text, expected_values)
-            else:
-                print(f"✗ Ollama extraction error: {response.status_code}")
-                return None, 0.0
+            # Parse response
+            return self._parse_extraction(result.text.lower(), expected_values)
         
         except Exception as e:
             print(f"✗ Ollama extraction error: {e}")
@@ -191,65 +272,79 @@ Answer:"""
         prompt: str,
         expected_values: list[str]
     ) -> Tuple[Optional[str], float]:
-        """Extract answer using Gemini."""
+        """Extract answer using Gemini (shared SDK client)."""
         try:
-            # Try new API first
-            try:
-                from google import genai
-                from google.genai import types
-                
-                client = genai.Client(api_key=self.api_key)
-                
-                contents = [
-                    types.Content(
-                        role="user",
-                        parts=[types.Part.from_text(text=prompt)],
-                    )
-                ]
-                
-                config = types.GenerateContentConfig(
-                    temperature=0.1,
-                    max_output_tokens=20,
-                )
-                
-                response = client.models.generate_content(
-                    model=self.model_name,
-                    contents=contents,
-                    config=config,
-                )
-                
-                # Extract text
-                if hasattr(response, 'text'):
-                    extracted_text = response.text.strip().lower()
-                else:
-                    # Try candidates
-                    extracted_text = ""
-                    if hasattr(response, 'candidates') and response.candidates:
-                        for candidate in response.candidates:
-                            if hasattr(candidate, 'content') and candidate.content:
-                                if hasattr(candidate.content, 'parts') and candidate.content.parts:
-                                    for part in candidate.content.parts:
-                                        if hasattr(part, 'text'):
-                                            extracted_text += str(part.text)
-                    extracted_text = extracted_text.strip().lower()
-                
-                return self._parse_extraction(extracted_text, expected_values)
-            
-            except ImportError:
-                # Fall back to old API
-                import google.generativeai as genai
-                genai.configure(api_key=self.api_key)
-                model = genai.GenerativeModel(self.model_name)
-                
-                response = model.generate_content(prompt)
-                extracted_text = response.text.strip().lower()
-                
-                return self._parse_extraction(extracted_text, expected_values)
+            result = get_llm_client().gemini_generate(
+                prompt,
+                model=self.model_name,
+                call_site="extraction",
+                timeout=10,
+                temperature=0.1,
+                max_output_tokens=20,
+            )
+            return self._parse_extraction(result.text.lower(), expected_values)
         
         except Exception as e:
             print(f"✗ Gemini extraction error: {e}")
             return None, 0.0
     
+    def _semantic_key(self, parameter: str, language: Language) -> Tuple[str, str, str, str]:
+        return ("extraction", f"{self.llm_provider}:{getattr(self, 'model_name', '')}", parameter, language)
+    
+    def _semantic_lookup(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language,
+        expected_values: list[str]
+    ) -> Tuple[Optional[SemanticHit], Optional[np.ndarray]]:
+        """
+        Extraction for a near-identical earlier message (see semantic_cache.py).
+        
+        Returns:
+            Tuple of (accepted hit with payload [value, confidence] or None,
+            message vector or None when the cache is off or embedding failed)
+        """
+        cache = get_semantic_cache()
+        if cache is None or not expected_values:
+            return None, None
+        
+        try:
+            vector = cache.embed(user_message)
+        except Exception as e:
+            print(f"⚠ Semantic cache skipped (embedding failed): {e}")
+            return None, None
+        
+        hit = cache.lookup(
+            self._semantic_key(parameter, language), vector, settings.semantic_cache_extraction_threshold
+        )
+        if hit is None:
+            return None, vector
+        
+        value = hit.payload[0]
+        synonyms = {v: v for v in expected_values}
+        for mapping in VALUE_SYNONYMS.get(parameter, {}).values():
+            synonyms.update(mapping)
+        if names_other_value(user_message, value, synonyms) or numbers_differ(user_message, hit.matched_message):
+            cache.reject("extraction")
+            return None, vector
+        
+        log_hit("extraction", parameter, language, user_message, hit)
+        return hit, vector
+    
+    def _semantic_store(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language,
+        vector: Optional[np.ndarray],
+        result: Tuple[Optional[str], float]
+    ) -> None:
+        """Remember a successful extraction (None results may be LLM errors, so they aren't kept)."""
+        cache = get_semantic_cache()
+        if cache is not None and vector is not None and result[0] is not None:
+            cache.add(self._semantic_key(parameter, language), user_message, vector, list(result))
+    
     def _parse_extraction(
         self,
         extracted_text: str,
@@ -0,0 +1,69 @@
+"""
+Bounded thread pool for the async request path.
+
+`/api/v1/session/next` runs on the event loop; anything that would block
+it goes through `run_blocking()` instead:
+- CPU-bound work: validators (embedding similarity), RAG retrieval,
+  local Whisper
+- Libraries without an async API: gTTS, the Gemini SDK, OpenAI/Groq SDK
+  fallbacks
+
+Network calls that have an async client (Groq/Ollama through
+llm_client.py, Groq Whisper) don't use the pool.
+
+The pool is shared and bounded (`blocking_pool_workers`): under load,
+blocking work waits for a free thread instead of each request starting its
+own, and the loop keeps serving other farmers meanwhile. Embedding
+encodes are additionally capped by `embedding_max_concurrency`.
+
+To modify:
+- Pool size: `blocking_pool_workers` in config.py
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+from ..config import settings
+
+
+T = TypeVar("T")
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_blocking_pool() -> ThreadPoolExecutor:
+    """Get or create the process-wide pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=max(1, settings.blocking_pool_workers),
+                    thread_name_prefix="blocking",
+                )
+    return _pool
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run `func(*args, **kwargs)` on the pool without blocking the event loop.
+
+    Like asyncio.to_thread, `func` sees the caller's context variables (a
+    copy: values it sets don't come back).
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_blocking_pool(), functools.partial(context.run, func, *args, **kwargs))
+
+
+def shutdown_blocking_pool() -> None:
+    """Stop the pool (app shutdown); queued work is cancelled."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
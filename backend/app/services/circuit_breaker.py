@@ -0,0 +1,143 @@
+"""
+Circuit breakers for LLM provider endpoints.
+
+When Groq degrades, every turn used to wait out each LLM call in turn -
+intent (3 s), extraction, then the helper - before falling back to the
+keyword classifier, the validators and the canned helper text anyway. A
+breaker per provider endpoint ("groq.chat", "ollama.generate",
+"gemini.generate") remembers that the endpoint is failing:
+
+- closed: calls go through; consecutive failures are counted
+- open: after `circuit_breaker_failure_threshold` consecutive failures
+  (errors or timeouts, after retries) calls fail at once, so the callers'
+  fallbacks answer in milliseconds
+- half-open: after `circuit_breaker_open_seconds` a single call is let
+  through as a probe (others still fail fast); success closes the breaker,
+  failure opens it again
+
+`LLMClient` (llm_client.py) checks the breaker before every call and
+reports each call's outcome. States are served on /health and recorded in
+every turn's audit.
+
+To modify:
+- Sensitivity: `circuit_breaker_failure_threshold`, `circuit_breaker_open_seconds`
+- Disable: `circuit_breaker_enabled = False`
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+from ..config import settings
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """The endpoint's breaker is open (or already probing); the call was not made."""
+
+
+class CircuitBreaker:
+    """Thread-safe breaker for one provider endpoint."""
+
+    def __init__(self, name: str, failure_threshold: int, open_seconds: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.failures = 0  # Consecutive
+        self.opened_at = 0.0
+        self.probing = False
+        self.times_opened = 0
+        self.short_circuited = 0
+        self._lock = threading.Lock()
+
+    def admit(self) -> None:
+        """
+        Let a call through or raise CircuitOpen.
+
+        A call admitted while half-open is the probe; its outcome must be
+        reported (`success`, `failure` or `release`).
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                print(f"⚠ Circuit {self.name} half-open: probing")
+                return
+            self.short_circuited += 1
+            retry_in = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+            raise CircuitOpen(f"Circuit {self.name} is {self.state} (next probe in {retry_in:.0f}s)")
+
+    def success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✓ Circuit {self.name} closed")
+            self.state = CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                print(f"✗ Circuit {self.name} open after {self.failures} failures ({self.open_seconds:.0f}s)")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.probing = False
+                self.times_opened += 1
+
+    def release(self) -> None:
+        """The call ended without telling anything about the endpoint (cancelled, bad request...)."""
+        with self._lock:
+            self.probing = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "short_circuited": self.short_circuited,
+            }
+
+
+# Global registry
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> Optional[CircuitBreaker]:
+    """Process-wide breaker for an endpoint (None when breakers are disabled)."""
+    if not settings.circuit_breaker_enabled:
+        return None
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(
+                    name,
+                    failure_threshold=settings.circuit_breaker_failure_threshold,
+                    open_seconds=settings.circuit_breaker_open_seconds,
+                )
+    return breaker
+
+
+def circuit_breaker_states() -> Dict[str, str]:
+    """State of every endpoint used so far (for the turn audit)."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
+
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-endpoint breaker details (for /health)."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.to_dict() for breaker in breakers}
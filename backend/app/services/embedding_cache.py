@@ -0,0 +1,148 @@
+"""
+Persistent, content-addressed embedding cache (SQLite).
+
+Maps (namespace, SHA-256 of text) -> float32 vector, where the namespace
+is the embedding model plus backend (torch vectors and int8 ONNX vectors
+differ slightly, so they are never mixed). One file on disk is shared by
+every process on the host:
+- KB ingestion (kb_pipeline.py): re-running after a restart or on
+  another checkout encodes nothing it has seen before
+- Validator synonym tables and runtime queries (EmbeddingService.embed_queries):
+  behind the in-memory LRU, so a restarted worker doesn't re-encode them
+
+SQLite runs in WAL mode, so readers in several workers don't block each
+other or the occasional writer.
+
+To modify:
+- Disable: `embedding_cache_enabled = False` in config.py
+- Move the file: `embedding_cache_path` (relative to backend/)
+- Start over: delete the file (it is rebuilt on demand)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+
+# SQLite caps bound parameters per statement; stay well below it
+_LOOKUP_BATCH = 500
+
+
+def text_key(text: str) -> bytes:
+    """Cache key of a text (raw SHA-256 digest)."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Thread- and process-safe vector store keyed by text hash."""
+
+    def __init__(self, path: str, namespace: str):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite file
+            namespace: Model + backend the vectors came from
+        """
+        self.path = path
+        self.namespace = namespace
+        self._local = threading.local()  # One connection per thread
+        self.enabled = True
+
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            connection = self._connection()
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " namespace TEXT NOT NULL,"
+                " text_hash BLOB NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (namespace, text_hash)"
+                ") WITHOUT ROWID"
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            print(f"⚠ Embedding cache disabled ({path}): {e}")
+            self.enabled = False
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors for texts (None where missing), in input order."""
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        if not self.enabled or not texts:
+            return vectors
+
+        keys = [text_key(text) for text in texts]
+        found: Dict[bytes, np.ndarray] = {}
+        try:
+            connection = self._connection()
+            distinct = list(dict.fromkeys(keys))
+            for start in range(0, len(distinct), _LOOKUP_BATCH):
+                batch = distinct[start:start + _LOOKUP_BATCH]
+                rows = connection.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE namespace = ? "
+                    f"AND text_hash IN ({','.join('?' * len(batch))})",
+                    [self.namespace, *batch],
+                )
+                for key, blob in rows:
+                    found[bytes(key)] = np.frombuffer(blob, dtype=np.float32)
+        except sqlite3.Error as e:
+            print(f"⚠ Embedding cache read failed: {e}")
+
+        for i, key in enumerate(keys):
+            vectors[i] = found.get(key)
+
+        hits = sum(vector is not None for vector in vectors)
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += len(texts) - hits
+        return vectors
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> None:
+        """Store vectors for texts (existing entries are kept)."""
+        if not self.enabled or not texts:
+            return
+
+        rows = [
+            (self.namespace, text_key(text), np.ascontiguousarray(vector, dtype=np.float32).tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        try:
+            connection = self._connection()
+            with connection:
+                connection.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"⚠ Embedding cache write failed: {e}")
+            return
+
+        with self._stats_lock:
+            self.writes += len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/write counters for this process."""
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,295 @@
+"""
+Process-wide embedding service.
+
+One SentenceTransformer instance per model name, shared by RAGEngine,
+SemanticValidator and the preprocessing scripts, so a worker holds the
+model in memory once and pays its load time once.
+
+Also owns:
+- Backend choice: PyTorch SentenceTransformer or ONNX Runtime
+  (`embedding_backend`, see onnx_embedder.py)
+- Thread policy: intra-op threads (`embedding_num_threads`) and a cap on
+  concurrent encode calls (`embedding_max_concurrency`), so request
+  threads don't oversubscribe the CPU
+- Query embedding LRU cache (normalized text -> vector), backed by the
+  persistent on-disk cache (embedding_cache.py), which `encode_cached`
+  also uses for KB ingestion
+- Instrumentation: encode calls, texts encoded, encode time, cache hits
+
+To modify:
+- Change embedding model: Update `embedding_model_name` in config.py
+- Switch to ONNX/int8: run export_onnx_model.py, set `embedding_backend = "onnx"`
+- Tune CPU usage: `embedding_num_threads`, `embedding_max_concurrency`
+- Persistent cache: `embedding_cache_enabled`, `embedding_cache_path`
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+from ..config import settings
+from .embedding_cache import EmbeddingCache
+
+
+class EmbeddingService:
+    """Lazily loaded, thread-safe wrapper around one embedding model."""
+
+    def __init__(self, model_name: str):
+        """
+        Initialize the service (the model loads on first use).
+
+        Args:
+            model_name: Sentence-transformers model name or path
+        """
+        self.model_name = model_name
+        self.model = None  # SentenceTransformer or OnnxEmbedder (same encode() API)
+        self.backend = ""
+        self._load_lock = threading.Lock()
+
+        # Bound concurrent encodes; each one already uses several torch threads
+        self._encode_slots = threading.BoundedSemaphore(max(1, settings.embedding_max_concurrency))
+
+        # LRU cache of query embeddings (normalized query -> vector)
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_size = settings.query_embedding_cache_size
+        self._cache_lock = threading.Lock()
+
+        # Persistent cache (opened on first use; None when disabled)
+        self._disk_cache: Optional[EmbeddingCache] = None
+        self._disk_cache_lock = threading.Lock()
+
+        # Instrumentation
+        self._stats_lock = threading.Lock()
+        self.encode_calls = 0
+        self.texts_encoded = 0
+        self.encode_seconds = 0.0
+        self.load_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def load(self) -> None:
+        """Load the model if it isn't loaded yet (safe to call from many threads)."""
+        if self.model is not None:
+            return
+
+        with self._load_lock:
+            if self.model is not None:
+                return
+
+            try:
+                start = time.perf_counter()
+                if settings.embedding_backend == "onnx" and self._onnx_available():
+                    self.model = self._load_onnx()
+                else:
+                    self.model = self._load_torch()
+                self.load_seconds = time.perf_counter() - start
+                print(f"✓ Loaded embedding model: {self.model_name} [{self.backend}] ({self.load_seconds:.1f}s)")
+            except Exception as e:
+                print(f"✗ Error loading embedding model: {e}")
+                raise
+
+    def _resolve_backend(self) -> str:
+        """Backend label `load()` will pick, without loading the model."""
+        if self.backend:
+            return self.backend
+        if settings.embedding_backend == "onnx":
+            from .onnx_embedder import QUANTIZED_MODEL_FILE, MODEL_FILE, onnx_model_exists
+
+            if onnx_model_exists(settings.embedding_onnx_dir):
+                quantized = os.path.join(settings.embedding_onnx_dir, QUANTIZED_MODEL_FILE)
+                use_int8 = settings.embedding_onnx_quantized and os.path.exists(quantized)
+                return f"onnx:{os.path.splitext(QUANTIZED_MODEL_FILE if use_int8 else MODEL_FILE)[0]}"
+        return "torch"
+
+    def disk_cache(self) -> Optional[EmbeddingCache]:
+        """The persistent cache for this model + backend (None if disabled)."""
+        if not settings.embedding_cache_enabled:
+            return None
+        if self._disk_cache is None:
+            with self._disk_cache_lock:
+                if self._disk_cache is None:
+                    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+                    path = os.path.join(backend_dir, settings.embedding_cache_path)
+                    self._disk_cache = EmbeddingCache(path, f"{self.model_name}|{self._resolve_backend()}")
+        return self._disk_cache
+
+    def _onnx_available(self) -> bool:
+        """Whether an ONNX export of this model exists (else fall back to torch)."""
+        from .onnx_embedder import onnx_model_exists
+
+        if not onnx_model_exists(settings.embedding_onnx_dir):
+            print(f"⚠ No ONNX model in {settings.embedding_onnx_dir} - run export_onnx_model.py; using torch")
+            return False
+        return True
+
+    def _load_onnx(self):
+        """Load the exported ONNX model (no torch import)."""
+        from .onnx_embedder import OnnxEmbedder
+
+        embedder = OnnxEmbedder(
+            settings.embedding_onnx_dir,
+            quantized=settings.embedding_onnx_quantized,
+            num_threads=settings.embedding_num_threads,
+        )
+        exported = embedder.config.get("model_name")
+        if exported != self.model_name:
+            print(f"⚠ ONNX model was exported from {exported}, not {self.model_name}")
+        self.backend = f"onnx:{os.path.splitext(embedder.model_file)[0]}"
+        return embedder
+
+    def _load_torch(self):
+        """Load the PyTorch SentenceTransformer."""
+        from sentence_transformers import SentenceTransformer
+
+        if settings.embedding_num_threads > 0:
+            import torch
+            torch.set_num_threads(settings.embedding_num_threads)
+
+        # Use HF token if provided (for private models)
+        model_kwargs = {}
+        if settings.hf_token:
+            model_kwargs["token"] = settings.hf_token
+
+        self.backend = "torch"
+        return SentenceTransformer(self.model_name, **model_kwargs)
+
+    def is_ready(self) -> bool:
+        """Check if the model is loaded."""
+        return self.model is not None
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+    ) -> np.ndarray:
+        """
+        Encode texts (no caching - use `embed_queries` for short queries).
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        self.load()
+
+        start = time.perf_counter()
+        with self._encode_slots:
+            embeddings = self.model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=show_progress_bar,
+                convert_to_numpy=True,
+            )
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.encode_calls += 1
+            self.texts_encoded += len(texts)
+            self.encode_seconds += elapsed
+
+        return embeddings.astype('float32')
+
+    def encode_cached(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Encode texts through the persistent cache: only unseen texts reach
+        the model (which isn't even loaded if everything is cached).
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        cache = self.disk_cache()
+        if cache is None:
+            return self.encode(texts, batch_size=batch_size)
+
+        vectors = cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            encoded = self.encode(missing, batch_size=batch_size)
+            cache.put_many(missing, encoded)
+            fresh = dict(zip(missing, encoded))
+            vectors = [fresh[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+
+        return np.vstack(vectors).astype(np.float32)
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize query text for cache lookup (MiniLM is uncased)."""
+        return " ".join(query.lower().split())
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed several queries, serving repeats from the LRU cache, then the
+        persistent cache, and encoding the remaining misses in one batch.
+
+        Returns:
+            float32 array of shape (len(queries), dim)
+        """
+        keys = [self.normalize_query(query) for query in queries]
+        vectors: List[Optional[np.ndarray]] = [None] * len(keys)
+
+        if self._query_cache_size > 0:
+            with self._cache_lock:
+                for i, key in enumerate(keys):
+                    cached = self._query_cache.get(key)
+                    if cached is not None:
+                        self._query_cache.move_to_end(key)
+                        self.cache_hits += 1
+                        vectors[i] = cached
+                    else:
+                        self.cache_misses += 1
+
+        # Encode each distinct missing query once
+        missing = list(dict.fromkeys(key for key, vec in zip(keys, vectors) if vec is None))
+        if missing:
+            encoded = self.encode_cached(missing)
+            fresh = {key: encoded[j:j + 1] for j, key in enumerate(missing)}
+
+            for i, key in enumerate(keys):
+                if vectors[i] is None:
+                    vectors[i] = fresh[key]
+
+            if self._query_cache_size > 0:
+                with self._cache_lock:
+                    for key, embedding in fresh.items():
+                        self._query_cache[key] = embedding
+                        self._query_cache.move_to_end(key)
+                    while len(self._query_cache) > self._query_cache_size:
+                        self._query_cache.popitem(last=False)
+
+        return np.vstack(vectors)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return encode and query-cache counters."""
+        total = self.cache_hits + self.cache_misses
+        return {
+            "model": self.model_name,
+            "loaded": self.is_ready(),
+            "backend": self.backend,
+            "load_seconds": round(self.load_seconds, 3),
+            "encode_calls": self.encode_calls,
+            "texts_encoded": self.texts_encoded,
+            "encode_ms_avg": 1000 * self.encode_seconds / self.encode_calls if self.encode_calls else 0.0,
+            "cache_size": len(self._query_cache),
+            "cache_max_size": self._query_cache_size,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hits / total if total else 0.0,
+            "disk_cache": self._disk_cache.stats() if self._disk_cache else None,
+        }
+
+
+# Registry: one service per model name
+_embedding_services: Dict[str, EmbeddingService] = {}
+_registry_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: Optional[str] = None) -> EmbeddingService:
+    """Get the shared embedding service for a model (defaults to settings)."""
+    model_name = model_name or settings.embedding_model_name
+    with _registry_lock:
+        service = _embedding_services.get(model_name)
+        if service is None:
+            service = EmbeddingService(model_name)
+            _embedding_services[model_name] = service
+        return service
@@ -0,0 +1,211 @@
+"""
+Helper response cache.
+
+`generate_helper` is a pure function of (adapter + model, parameter,
+language, user message, retrieved chunks), and most help requests are the
+same few questions - "how do I check colour?" shouldn't cost a fresh
+400-token generation every time. `CachedLLMAdapter` (llm_adapter.py) puts
+this cache in front of every adapter:
+- Key: SHA-256 of namespace (adapter class + model), parameter, language,
+  the normalized message and a hash of the retrieved chunks. Chunks are
+  content-addressed (the hash of their texts), so a KB reload that changes
+  the retrieved context changes the key
+- Memory tier: LRU with TTL (`helper_cache_max_entries`, `helper_cache_ttl_seconds`)
+- Disk tier: SQLite shared by all workers on the host (`helper_cache_path`),
+  same TTL; hits are promoted to memory
+- Fallback/error texts are never stored (see `FallbackText` in llm_adapter.py)
+
+The status of the current turn's lookup ("memory", "disk", "miss") is kept
+in a ContextVar so the orchestrator can put it in the audit together with
+the running hit rates.
+
+To modify:
+- Disable: `helper_cache_enabled = False` in config.py
+- Memory only: `helper_cache_path = ""`
+- Start over: delete the SQLite file
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import settings
+
+
+# Lookup status of the helper call in the current request ("memory" | "disk" | "miss")
+helper_cache_status: ContextVar[Optional[str]] = ContextVar("helper_cache_status", default=None)
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?.!।,]+$")
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, collapse whitespace, drop trailing punctuation."""
+    return _TRAILING_PUNCTUATION.sub("", " ".join(message.lower().split()))
+
+
+def helper_cache_key(
+    namespace: str,
+    parameter: str,
+    language: str,
+    user_message: str,
+    retrieved_chunks: List[str],
+) -> bytes:
+    """Cache key of a helper call (raw SHA-256 digest)."""
+    chunks_hash = hashlib.sha256("\x1e".join(retrieved_chunks).encode("utf-8")).hexdigest()
+    material = "\x1f".join([namespace, parameter, language, normalize_message(user_message), chunks_hash])
+    return hashlib.sha256(material.encode("utf-8")).digest()
+
+
+class HelperCache:
+    """Two-tier (memory LRU + SQLite) text cache with TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, path: str = ""):
+        """
+        Args:
+            max_entries: Memory tier size (0 disables the memory tier)
+            ttl_seconds: Entry lifetime in both tiers
+            path: SQLite file for the disk tier ("" disables it)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._memory: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()  # key -> (expires_at, text)
+        self._lock = threading.Lock()
+        self._local = threading.local()  # One SQLite connection per thread
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self.disk_enabled = bool(path)
+        if self.disk_enabled:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                connection = self._connection()
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS helper_cache ("
+                    " key BLOB PRIMARY KEY,"
+                    " text TEXT NOT NULL,"
+                    " expires_at REAL NOT NULL"
+                    ") WITHOUT ROWID"
+                )
+                connection.commit()
+            except sqlite3.Error as e:
+                print(f"⚠ Helper cache disk tier disabled ({path}): {e}")
+                self.disk_enabled = False
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: bytes) -> Tuple[Optional[str], str]:
+        """Cached text (or None) and where it came from: "memory", "disk" or "miss"."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1], "memory"
+                del self._memory[key]
+
+        text = self._disk_get(key, now)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+                return None, "miss"
+            self.disk_hits += 1
+        self._memory_put(key, text, now)
+        return text, "disk"
+
+    def put(self, key: bytes, text: str) -> None:
+        """Store text in both tiers."""
+        now = time.time()
+        self._memory_put(key, text, now)
+        if self.disk_enabled:
+            try:
+                connection = self._connection()
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO helper_cache VALUES (?, ?, ?)",
+                        (key, text, now + self.ttl_seconds),
+                    )
+                    # Expired rows are only ever skipped on read; drop them as we go
+                    connection.execute("DELETE FROM helper_cache WHERE expires_at <= ?", (now,))
+            except sqlite3.Error as e:
+                print(f"⚠ Helper cache write failed: {e}")
+        with self._lock:
+            self.writes += 1
+
+    def _memory_put(self, key: bytes, text: str, now: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (now + self.ttl_seconds, text)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_get(self, key: bytes, now: float) -> Optional[str]:
+        if not self.disk_enabled:
+            return None
+        try:
+            row = self._connection().execute(
+                "SELECT text FROM helper_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠ Helper cache read failed: {e}")
+            return None
+        return row[0] if row else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Global instance
+_helper_cache: Optional[HelperCache] = None
+_helper_cache_lock = threading.Lock()
+
+
+def get_helper_cache() -> HelperCache:
+    """Get or create the process-wide helper cache."""
+    global _helper_cache
+    if _helper_cache is None:
+        with _helper_cache_lock:
+            if _helper_cache is None:
+                _helper_cache = HelperCache(
+                    max_entries=settings.helper_cache_max_entries,
+                    ttl_seconds=settings.helper_cache_ttl_seconds,
+                    path=settings.helper_cache_path,
+                )
+    return _helper_cache
+
+
+def helper_cache_audit() -> Optional[Dict[str, Any]]:
+    """This request's lookup status plus running hit rates (None if the cache wasn't consulted)."""
+    status = helper_cache_status.get()
+    if status is None:
+        return None
+    return {"status": status, **get_helper_cache().stats()}
@@ -7,26 +7,26 @@ Uses local LLM to intelligently detect user intent:
 - What's the confidence level?
 """
 
-from typing import Tuple
+from typing import Optional, Tuple
 from ..models import Language
 from ..config import settings
-import requests
+from .llm_client import GROQ_CHAT_URL, OLLAMA_URL, get_llm_client
 
 
 class IntentClassifier:
     """Classifies user intent using local LLM."""
     
     def __init__(self, provider: str = "groq", model_name: str = "llama-3.3-70b-versatile", api_key: str = None):
-        """Initialize intent classifier with Groq or Ollama."""
+        """Initialize intent classifier with Groq or Ollama (Groq keys come from the key pool unless api_key pins one)."""
         self.provider = provider
         self.model_name = model_name
         self.api_key = api_key
         
         if provider == "groq":
-            self.base_url = "https://api.groq.com/openai/v1/chat/completions"
+            self.base_url = GROQ_CHAT_URL
             print(f"✓ Intent classifier initialized with Groq ({model_name})")
         else:
-            self.base_url = "http://localhost:11434"
+            self.base_url = OLLAMA_URL
             print(f"✓ Intent classifier initialized with Ollama ({model_name})")
     
     def classify_intent(
@@ -48,6 +48,99 @@ class IntentClassifier:
             - intent: "answer" or "help_request"
             - confidence: 0.0-1.0
         """
+        quick = self._classify_without_llm(user_message, parameter)
+        if quick is not None:
+            return quick
+        
+        prompt = self._build_prompt(user_message, parameter, language)
+        
+        try:
+            client = get_llm_client()
+            if self.provider == "groq":
+                # Use Groq API (pooled connection; no retries - the keyword fallback is cheaper)
+                result = client.groq_chat(
+                    [{"role": "user", "content": prompt}],
+                    api_key=self.api_key,
+                    model=self.model_name,
+                    call_site="intent",
+                    timeout=3,  # Shorter timeout
+                    retries=0,
+                    temperature=0.0,  # Deterministic for faster response
+                    max_tokens=3,  # Just need "ANSWER" or "HELP"
+                )
+            else:
+                # Use Ollama API
+                result = client.ollama_generate(
+                    prompt,
+                    model=self.model_name,
+                    call_site="intent",
+                    timeout=5,
+                    retries=0,
+                    options={
+                        "temperature": 0.1,
+                        "num_predict": 5,
+                        "top_p": 0.9,
+                    },
+                    base_url=self.base_url,
+                )
+            
+            return self._parse_classification(result.text, user_message, language)
+        
+        except Exception as e:
+            print(f"✗ Intent classification error: {e}")
+            return self._fallback_classification(user_message, language)
+    
+    async def aclassify_intent(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language
+    ) -> Tuple[str, float]:
+        """Async variant of `classify_intent` (non-blocking LLM call)."""
+        quick = self._classify_without_llm(user_message, parameter)
+        if quick is not None:
+            return quick
+        
+        prompt = self._build_prompt(user_message, parameter, language)
+        
+        try:
+            client = get_llm_client()
+            if self.provider == "groq":
+                # Use Groq API (pooled connection; no retries - the keyword fallback is cheaper)
+                result = await client.agroq_chat(
+                    [{"role": "user", "content": prompt}],
+                    api_key=self.api_key,
+                    model=self.model_name,
+                    call_site="intent",
+                    timeout=3,  # Shorter timeout
+                    retries=0,
+                    temperature=0.0,  # Deterministic for faster response
+                    max_tokens=3,  # Just need "ANSWER" or "HELP"
+                )
+            else:
+                # Use Ollama API
+                result = await client.aollama_generate(
+                    prompt,
+                    model=self.model_name,
+                    call_site="intent",
+                    timeout=5,
+                    retries=0,
+                    options={
+                        "temperature": 0.1,
+                        "num_predict": 5,
+                        "top_p": 0.9,
+                    },
+                    base_url=self.base_url,
+                )
+            
+            return self._parse_classification(result.text, user_message, language)
+        
+        except Exception as e:
+            print(f"✗ Intent classification error: {e}")
+            return self._fallback_classification(user_message, language)
+    
+    def _classify_without_llm(self, user_message: str, parameter: str) -> Optional[Tuple[str, float]]:
+        """Keyword/heuristic classification; None when the LLM has to decide."""
         # Quick check: If message is very short and looks like a valid value, it's likely an answer
         user_lower = user_message.lower().strip()
         
@@ -186,7 +279,10 @@ class IntentClassifier:
         if len(user_message.split()) <= 2:
             return "answer", 0.85
         
-        # For longer messages, use LLM classification
+        return None
+    
+    def _build_prompt(self, user_message: str, parameter: str, language: Language) -> str:
+        """Build the ANSWER/HELP classification prompt."""
         # Build classification prompt
         if language == "hi":
             # Special prompt for location
@@ -245,71 +341,17 @@ Reply with ONLY ONE WORD: "ANSWER" or "HELP"
 
 Reply:"""
         
-        try:
-            if self.provider == "groq":
-                # Use Groq API
-                response = requests.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model_name,
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.0,  # Deterministic for faster response
-                        "max_tokens": 3,  # Just need "ANSWER" or "HELP"
-                    },
-                    timeout=3  # Shorter timeout
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    classification = result["choices"][0]["message"]["content"].strip().upper()
-                    
-                    # Parse response
-                    if "HELP" in classification:
-                        return "help_request", 0.90
-                    elif "ANSWER" in classification:
-                        return "answer", 0.90
-                    else:
-                        return self._fallback_classification(user_message, language)
-                else:
-                    return self._fallback_classification(user_message, language)
-            else:
-                # Use Ollama API
-                response = requests.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.1,
-                            "num_predict": 5,
-                            "top_p": 0.9,
-                        }
-                    },
-                    timeout=5
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    classification = result.get('response', '').strip().upper()
-                    
-                    if "HELP" in classification:
-                        return "help_request", 0.90
-                    elif "ANSWER" in classification:
-                        return "answer", 0.90
-                    else:
-                        return self._fallback_classification(user_message, language)
-                else:
-                    return self._fallback_classification(user_message, language)
+        return prompt
+    
+    def _parse_classification(self, text: str, user_message: str, language: Language) -> Tuple[str, float]:
+        """Map the LLM reply to an intent (keyword fallback if it is neither)."""
+        classification = text.upper()
         
-        except Exception as e:
-            print(f"✗ Intent classification error: {e}")
+        if "HELP" in classification:
+            return "help_request", 0.90
+        elif "ANSWER" in classification:
+            return "answer", 0.90
+        else:
             return self._fallback_classification(user_message, language)
     
     def _fallback_classification(self, user_message: str, language: Language) -> Tuple[str, float]:
@@ -339,9 +381,8 @@ def get_intent_classifier() -> IntentClassifier:
     if _intent_classifier is None:
         provider = getattr(settings, 'llm_provider', 'ollama')
         if provider == "groq":
-            api_key = getattr(settings, 'groq_llm_api_key', None)
             model_name = getattr(settings, 'groq_llm_model', 'llama-3.3-70b-versatile')
-            _intent_classifier = IntentClassifier(provider="groq", model_name=model_name, api_key=api_key)
+            _intent_classifier = IntentClassifier(provider="groq", model_name=model_name)
         else:
             model_name = getattr(settings, 'ollama_model_name', 'gemma2:9b')
             _intent_classifier = IntentClassifier(provider="ollama", model_name=model_name)
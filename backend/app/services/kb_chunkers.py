@@ -0,0 +1,304 @@
+"""
+Markdown chunking strategies for the knowledge base.
+
+- "improved" (default): keeps step-by-step "How to test" instructions
+  together and adds per-step and option chunks
+- "basic": splits on headings, then paragraphs, then sentences
+
+Chunkers are plain module-level functions `(content, filename) -> chunks`
+so the ingestion pipeline (kb_pipeline.py) can run them in worker processes.
+
+To modify chunking strategy:
+    - Edit the chunker function and re-run preprocessing (a changed
+      chunker invalidates incremental reuse automatically)
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+
+def detect_language(text: str) -> str:
+    """
+    Simple language detection (Hindi vs English).
+    
+    Checks for Devanagari script characters.
+    """
+    # Check for Devanagari Unicode range
+    devanagari_pattern = re.compile(r'[\u0900-\u097F]')
+    if devanagari_pattern.search(text):
+        return "hi"
+    return "en"
+
+
+# ---- Basic chunker (preprocess_kb.py) ----
+
+def extract_metadata_from_filename(filename: str) -> Dict[str, Any]:
+    """
+    Extract metadata from filename.
+    
+    Examples:
+        "01-color-detection.md" -> {module_id: "01", module_name: "color_detection", parameter: "color"}
+        "05-09-combined.md" -> {module_id: "05-09", module_name: "combined"}
+    """
+    base = Path(filename).stem
+    parts = base.split("-", 1)
+    
+    metadata = {
+        "module_id": parts[0] if parts else "",
+        "module_name": parts[1] if len(parts) > 1 else base,
+    }
+    
+    # Try to infer parameter from module name
+    param_mapping = {
+        "color": "color",
+        "moisture": "moisture",
+        "smell": "smell",
+        "ph": "ph",
+        "soil_type": "soil_type",
+        "earthworms": "earthworms",
+        "location": "location",
+        "fertilizer": "fertilizer_used",
+        "crop": "crop_recommendation",
+    }
+    
+    for key, param in param_mapping.items():
+        if key in metadata["module_name"].lower():
+            metadata["parameter"] = param
+            break
+    
+    return metadata
+
+
+def chunk_markdown(content: str, filename: str) -> List[Dict[str, Any]]:
+    """
+    Split markdown content into chunks.
+    
+    Strategy:
+    - Split on headings (##, ###)
+    - Split on bullet points for lists
+    - Each chunk should be 100-500 characters ideally
+    """
+    chunks = []
+    base_metadata = extract_metadata_from_filename(filename)
+    
+    # Split by headings first
+    sections = re.split(r'\n(#{2,3}\s+.+?)\n', content, flags=re.MULTILINE)
+    
+    current_section = ""
+    current_heading = ""
+    
+    for i, section in enumerate(sections):
+        if section.startswith("#"):
+            # This is a heading
+            current_heading = section.strip()
+            continue
+        
+        # This is content
+        if section.strip():
+            current_section = section.strip()
+            
+            # Further split by paragraphs
+            paragraphs = re.split(r'\n\n+', current_section)
+            
+            for para in paragraphs:
+                if not para.strip():
+                    continue
+                
+                # If paragraph is too long, split by sentences
+                if len(para) > 500:
+                    sentences = re.split(r'[.!?]\s+', para)
+                    current_chunk = ""
+                    
+                    for sentence in sentences:
+                        if len(current_chunk) + len(sentence) > 500:
+                            if current_chunk:
+                                chunks.append(_create_chunk(
+                                    current_chunk,
+                                    base_metadata,
+                                    current_heading
+                                ))
+                            current_chunk = sentence
+                        else:
+                            current_chunk += " " + sentence if current_chunk else sentence
+                    
+                    if current_chunk:
+                        chunks.append(_create_chunk(
+                            current_chunk,
+                            base_metadata,
+                            current_heading
+                        ))
+                else:
+                    chunks.append(_create_chunk(
+                        para,
+                        base_metadata,
+                        current_heading
+                    ))
+    
+    # If no chunks created (no headings), chunk by paragraphs
+    if not chunks:
+        paragraphs = re.split(r'\n\n+', content)
+        for para in paragraphs:
+            if para.strip() and len(para.strip()) > 50:
+                chunks.append(_create_chunk(
+                    para.strip(),
+                    base_metadata,
+                    ""
+                ))
+    
+    return chunks
+
+
+def _create_chunk(
+    text: str,
+    base_metadata: Dict[str, Any],
+    heading: str
+) -> Dict[str, Any]:
+    """Create a chunk dictionary with metadata."""
+    language = detect_language(text)
+    
+    # Determine section type
+    section_type = "explanation"
+    if "how" in text.lower() or "कैसे" in text:
+        section_type = "how_to_test"
+    elif "?" in text or "?" in text:
+        section_type = "question"
+    elif re.match(r'^[-*•]', text, re.MULTILINE):
+        section_type = "options"
+    
+    chunk_meta = {
+        **base_metadata,
+        "text": text.strip(),
+        "language": language,
+        "section_type": section_type,
+        "heading": heading,
+    }
+    
+    return chunk_meta
+
+
+# ---- Improved chunker (preprocess_kb_improved.py) ----
+
+def extract_parameter_from_filename(filename: str) -> str:
+    """Extract parameter from filename."""
+    param_mapping = {
+        "color": "color",
+        "moisture": "moisture",
+        "smell": "smell",
+        "ph": "ph",
+        "soil": "soil_type",
+        "earthworm": "earthworms",
+        "location": "location",
+        "fertilizer": "fertilizer_used",
+    }
+    
+    filename_lower = filename.lower()
+    for key, param in param_mapping.items():
+        if key in filename_lower:
+            return param
+    
+    return "general"
+
+
+def chunk_markdown_improved(content: str, filename: str) -> List[Dict[str, Any]]:
+    """
+    Improved chunking that preserves step-by-step instructions.
+    
+    Strategy:
+    1. Find "कैसे जांचें" or "How to test" sections
+    2. Extract step-by-step instructions (कदम 1, कदम 2, Step 1, Step 2)
+    3. Keep steps together in chunks
+    4. Separate options/examples into different chunks
+    """
+    chunks = []
+    parameter = extract_parameter_from_filename(filename)
+    language = detect_language(content)
+    
+    # Pattern 1: Find "कैसे करें" or "कैसे जांचें" sections with steps
+    # Match both formats: **कैसे करें:** and **कैसे जांचें**
+    how_to_pattern_hi = r'\*\*कैसे (?:करें|जांचें).*?\*\*\s*(.*?)(?=\n###|\n---|\Z)'
+    how_to_matches_hi = re.findall(how_to_pattern_hi, content, re.DOTALL)
+    
+    for match in how_to_matches_hi:
+        # Extract steps (कदम 1, कदम 2, etc.)
+        step_pattern = r'####\s*कदम\s*\d+:.*?(?=####|###|\n\n---|\Z)'
+        steps = re.findall(step_pattern, match, re.DOTALL)
+        
+        if steps:
+            # Combine all steps into one instructional chunk
+            full_instructions = "\n\n".join(steps)
+            if len(full_instructions) > 100:
+                chunks.append({
+                    "text": full_instructions.strip(),
+                    "language": "hi",
+                    "parameter": parameter,
+                    "section_type": "how_to_test",
+                    "module_name": Path(filename).stem,
+                })
+        
+        # Also create individual step chunks for better retrieval
+        for i, step in enumerate(steps):
+            if len(step.strip()) > 50:
+                chunks.append({
+                    "text": step.strip(),
+                    "language": "hi",
+                    "parameter": parameter,
+                    "section_type": "how_to_test_step",
+                    "step_number": i + 1,
+                    "module_name": Path(filename).stem,
+                })
+    
+    # Pattern 2: Find English "How to test" sections
+    how_to_pattern_en = r'\*\*How to (?:test|check).*?\*\*\s*(.*?)(?=\n###|\n---|\Z)'
+    how_to_matches_en = re.findall(how_to_pattern_en, content, re.DOTALL | re.IGNORECASE)
+    
+    for match in how_to_matches_en:
+        step_pattern = r'####\s*Step\s*\d+:.*?(?=####|###|\n\n---|\Z)'
+        steps = re.findall(step_pattern, match, re.DOTALL | re.IGNORECASE)
+        
+        if steps:
+            full_instructions = "\n\n".join(steps)
+            if len(full_instructions) > 100:
+                chunks.append({
+                    "text": full_instructions.strip(),
+                    "language": "en",
+                    "parameter": parameter,
+                    "section_type": "how_to_test",
+                    "module_name": Path(filename).stem,
+                })
+        
+        for i, step in enumerate(steps):
+            if len(step.strip()) > 50:
+                chunks.append({
+                    "text": step.strip(),
+                    "language": "en",
+                    "parameter": parameter,
+                    "section_type": "how_to_test_step",
+                    "step_number": i + 1,
+                    "module_name": Path(filename).stem,
+                })
+    
+    # Pattern 3: Extract option descriptions (for reference)
+    option_pattern = r'###\s*विकल्प\s*\d+:.*?\n\n(.*?)(?=###|---|\Z)'
+    options = re.findall(option_pattern, content, re.DOTALL)
+    
+    for option in options:
+        # Only take first 300 chars of each option
+        option_text = option.strip()[:300]
+        if len(option_text) > 50 and "```json" not in option_text:
+            chunks.append({
+                "text": option_text,
+                "language": detect_language(option_text),
+                "parameter": parameter,
+                "section_type": "options",
+                "module_name": Path(filename).stem,
+            })
+    
+    return chunks
+
+
+# Chunker registry (name -> function)
+CHUNKERS: Dict[str, Callable[[str, str], List[Dict[str, Any]]]] = {
+    "basic": chunk_markdown,
+    "improved": chunk_markdown_improved,
+}
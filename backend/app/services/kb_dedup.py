@@ -0,0 +1,175 @@
+"""
+Near-duplicate chunk elimination (MinHash + LSH).
+
+05-09-combined.md, COMPLETE-SUMMARY.md and the per-parameter files repeat
+many passages almost verbatim, so retrieval returned several paraphrases
+of the same text and spent prompt tokens on them. The ingestion pipeline
+(kb_pipeline.py) runs every chunk through `NearDuplicateFilter` before it
+is embedded: a chunk whose estimated Jaccard similarity (word 3-gram
+shingles) to an already-kept chunk of the same (parameter, language)
+reaches `kb_dedup_threshold` is left out of the index and recorded in the
+merge report (kb_dedup_report.json). Chunks are only compared within their
+bucket - retrieval searches per-bucket shards, so a passage repeated under
+another parameter or language must stay in that bucket too.
+
+Files are processed in name order, so the per-parameter files (01-..., 02-...)
+win over the combined and summary files.
+
+Words are the lexical index's tokens (lexical_index.TOKEN_PATTERN, whole
+Devanagari words including matras and viramas). A chunk without any word
+(a table rule, "---") has no shingles and is never treated as a duplicate.
+
+To modify:
+- Threshold: `kb_dedup_threshold` in config.py (> 1 disables)
+- Shingle size / signature length: SHINGLE_SIZE, NUM_PERM, BANDS
+"""
+
+import hashlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+from .lexical_index import TOKEN_PATTERN
+
+
+SHINGLE_SIZE = 3  # Words per shingle
+NUM_PERM = 128  # MinHash signature length
+BANDS = 32  # LSH bands (NUM_PERM / BANDS rows each); candidate recall is high from ~0.45 up
+
+PREVIEW_CHARS = 80
+
+# Fixed seed: signatures must be identical across builds and processes
+_rng = np.random.default_rng(20240607)
+_MULTIPLIERS = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text: str) -> Set[str]:
+    """Word n-gram shingles of lowercased text (all words for very short chunks, none without words)."""
+    words = TOKEN_PATTERN.findall(text.lower())
+    if not words:
+        return set()
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(shingle_set: Set[str]) -> np.ndarray:
+    """
+    NUM_PERM-value MinHash signature of a non-empty shingle set
+    (multiply-shift hashing of 64-bit shingle hashes).
+    """
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingle_set],
+        dtype=np.uint64,
+    )
+    # (a * x + b) mod 2^64, keep the high 32 bits; uint64 overflow is the modulo
+    permuted = (hashes[:, None] * _MULTIPLIERS[None, :] + _OFFSETS[None, :]) >> np.uint64(32)
+    return permuted.min(axis=0)
+
+
+def estimated_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """Fraction of matching signature positions."""
+    return float(np.mean(a == b))
+
+
+class NearDuplicateFilter:
+    """
+    Streaming filter: call `check()` on chunks in order; near-duplicates of
+    earlier kept chunks are rejected and recorded for the report.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.n_seen = 0
+        self._rows = NUM_PERM // BANDS
+        # Per band: (parameter, language, band bytes) -> kept chunk ids
+        self._buckets: List[Dict[Tuple[str, str, bytes], List[int]]] = [{} for _ in range(BANDS)]
+        self._signatures: List[Optional[np.ndarray]] = []  # None: no shingles
+        self._kept: List[Dict[str, Any]] = []  # Summary of each kept chunk, by chunk id
+        self._merges: Dict[int, List[Dict[str, Any]]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return 0 < self.threshold <= 1
+
+    @property
+    def n_dropped(self) -> int:
+        return sum(len(dropped) for dropped in self._merges.values())
+
+    def check(self, chunk: Dict[str, Any]) -> bool:
+        """Whether to keep the chunk (kept chunks get the next chunk id)."""
+        self.n_seen += 1
+        if not self.enabled:
+            return True
+
+        shingle_set = shingles(chunk["text"])
+        if not shingle_set:
+            self._keep(chunk, None, [])  # Nothing to compare: never a duplicate
+            return True
+
+        signature = minhash_signature(shingle_set)
+        parameter, language = str(chunk.get("parameter", "")), str(chunk.get("language", ""))
+        bands = [
+            (parameter, language, signature[i * self._rows:(i + 1) * self._rows].tobytes())
+            for i in range(BANDS)
+        ]
+
+        match, best = self._best_match(signature, bands)
+        if match is not None:
+            self._merges.setdefault(match, []).append({
+                "module_name": chunk.get("module_name", ""),
+                "parameter": chunk.get("parameter", ""),
+                "language": chunk.get("language", ""),
+                "section_type": chunk.get("section_type", ""),
+                "similarity": round(best, 3),
+                "text": chunk["text"][:PREVIEW_CHARS],
+            })
+            return False
+
+        self._keep(chunk, signature, bands)
+        return True
+
+    def _keep(
+        self,
+        chunk: Dict[str, Any],
+        signature: Optional[np.ndarray],
+        bands: List[Tuple[str, str, bytes]],
+    ) -> None:
+        """Record a kept chunk under the next chunk id (LSH-indexed unless it has no signature)."""
+        chunk_id = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in zip(self._buckets, bands):
+            band.setdefault(key, []).append(chunk_id)
+        self._kept.append({
+            "module_name": chunk.get("module_name", ""),
+            "parameter": chunk.get("parameter", ""),
+            "language": chunk.get("language", ""),
+            "text": chunk["text"][:PREVIEW_CHARS],
+        })
+
+    def _best_match(self, signature: np.ndarray, bands: List[Tuple[str, str, bytes]]):
+        """Most similar kept chunk of the same bucket at or above the threshold, among LSH candidates."""
+        candidates: Set[int] = set()
+        for band, key in zip(self._buckets, bands):
+            candidates.update(band.get(key, ()))
+
+        match: Optional[int] = None
+        best = 0.0
+        for chunk_id in sorted(candidates):
+            similarity = estimated_jaccard(signature, self._signatures[chunk_id])
+            if similarity >= self.threshold and similarity > best:
+                match, best = chunk_id, similarity
+        return match, best
+
+    def report(self) -> Dict[str, Any]:
+        """Merge report: each kept chunk with the near-duplicates folded into it."""
+        return {
+            "method": f"minhash (word {SHINGLE_SIZE}-grams, {NUM_PERM} perms, {BANDS} bands)",
+            "threshold": self.threshold,
+            "chunks_in": self.n_seen,
+            "chunks_kept": self.n_seen - self.n_dropped,
+            "chunks_dropped": self.n_dropped,
+            "merges": [
+                {"kept": {"chunk_id": chunk_id, **self._kept[chunk_id]}, "dropped": dropped}
+                for chunk_id, dropped in sorted(self._merges.items())
+            ],
+        }
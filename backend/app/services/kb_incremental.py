@@ -0,0 +1,176 @@
+"""
+Incremental KB preprocessing keyed on content hashes.
+
+Each build records a manifest (kb_build_manifest.json) plus the chunk
+vectors themselves (kb_embeddings.npy, row = chunk id). The next build:
+- reuses the previous chunks of every markdown file whose SHA-256 hasn't
+  changed (no re-chunking)
+- reuses the previous vector of every chunk whose text hash it has seen
+  before (no re-embedding), so editing one advisory only encodes the
+  chunks that actually changed
+- starts from scratch if the embedding model or the chunker code changed
+
+The FAISS index, shards, BM25 and metadata are still rebuilt from the
+full set of vectors - that part takes milliseconds to seconds.
+
+The previous build is read lazily: only line offsets of kb_chunks.jsonl
+(every chunk the chunker produced, for per-file reuse) and text hashes of
+the indexed chunks (kb_meta_text.bin, row = vector row, after near-duplicate
+removal) are held in memory, and kb_embeddings.npy is memory-mapped.
+
+To force a full rebuild: delete kb_build_manifest.json (or pass --full
+to the preprocessing scripts).
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+import numpy as np
+from ..config import settings
+from .kb_store import ChunkStore, save_json
+
+
+BUILD_MANIFEST_FILE = "kb_build_manifest.json"
+EMBEDDINGS_FILE = "kb_embeddings.npy"
+MANIFEST_VERSION = 2
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a file's or chunk's text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunker_fingerprint(chunker: Callable) -> str:
+    """Hash of the chunker's source (module-level code included), so chunking changes invalidate reuse."""
+    source = inspect.getsource(inspect.getmodule(chunker) or chunker)
+    return content_hash(f"{chunker.__name__}\n{source}")[:16]
+
+
+class PreviousBuild:
+    """Chunks and vectors from the last build, looked up by file and text hash."""
+
+    def __init__(
+        self,
+        manifest: Dict[str, Any],
+        jsonl_file: BinaryIO,
+        line_offsets: List[int],
+        row_by_hash: Dict[str, int],
+        embeddings: np.ndarray,
+    ):
+        self.manifest = manifest
+        self.embeddings = embeddings
+        self._jsonl_file = jsonl_file  # Kept open: the rebuild replaces the path, not this inode
+        self._line_offsets = line_offsets
+        self._row_by_hash = row_by_hash
+        self._read_lock = threading.Lock()
+
+    def _read_row(self, row: int) -> Dict[str, Any]:
+        with self._read_lock:
+            self._jsonl_file.seek(self._line_offsets[row])
+            return json.loads(self._jsonl_file.readline())
+
+    def file_chunks(self, filename: str, file_sha: str) -> Optional[List[Dict[str, Any]]]:
+        """Previous chunks of a file if its content is unchanged, else None."""
+        entry = self.manifest["files"].get(filename)
+        if entry is None or entry["sha256"] != file_sha:
+            return None
+        start = entry["first_row"]
+        return [self._read_row(row) for row in range(start, start + entry["n_chunks"])]
+
+    def vector(self, text: str) -> Optional[np.ndarray]:
+        """Previous vector of a chunk with exactly this text, if any."""
+        row = self._row_by_hash.get(content_hash(text))
+        return None if row is None else np.asarray(self.embeddings[row])
+
+    def close(self) -> None:
+        self._jsonl_file.close()
+
+
+def _line_offsets(jsonl_file: BinaryIO) -> List[int]:
+    """Byte offset of each non-empty line, one line at a time."""
+    line_offsets: List[int] = []
+    offset = 0
+    for line in jsonl_file:
+        if line.strip():
+            line_offsets.append(offset)
+        offset += len(line)
+    return line_offsets
+
+
+def load_previous_build(embeddings_dir: str, jsonl_path: str, chunker_id: str) -> Optional[PreviousBuild]:
+    """
+    Load the previous build if it is reusable.
+
+    Returns None (full rebuild) when any artifact is missing, the embedding
+    model or chunker changed, or the artifacts disagree in size.
+    """
+    manifest_path = os.path.join(embeddings_dir, BUILD_MANIFEST_FILE)
+    embeddings_path = os.path.join(embeddings_dir, EMBEDDINGS_FILE)
+    if not all(os.path.exists(path) for path in (manifest_path, embeddings_path, jsonl_path)):
+        return None
+
+    jsonl_file = None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        if manifest.get("embedding_model") != settings.embedding_model_name:
+            print("  Embedding model changed - re-embedding everything")
+            return None
+        if manifest.get("chunker") != chunker_id:
+            print("  Chunking code changed - re-chunking everything")
+            return None
+
+        jsonl_file = open(jsonl_path, "rb")
+        line_offsets = _line_offsets(jsonl_file)
+        embeddings = np.load(embeddings_path, mmap_mode="r")
+        store = ChunkStore.load(embeddings_dir, mmap=True)
+        row_by_hash: Dict[str, int] = {}
+        for row, text in enumerate(store.iter_texts()):
+            row_by_hash.setdefault(content_hash(text), row)
+        if (
+            len(line_offsets) != manifest.get("n_raw_chunks")
+            or len(store) != len(embeddings)
+            or len(store) != manifest.get("n_chunks")
+        ):
+            print("  Previous build is inconsistent - rebuilding everything")
+            jsonl_file.close()
+            return None
+    except Exception as e:
+        if jsonl_file is not None:
+            jsonl_file.close()
+        print(f"⚠ Could not read previous build, rebuilding everything: {e}")
+        return None
+
+    return PreviousBuild(manifest, jsonl_file, line_offsets, row_by_hash, embeddings)
+
+
+def save_build_manifest(
+    embeddings_dir: str,
+    n_chunks: int,
+    n_raw_chunks: int,
+    dimension: int,
+    files: Dict[str, Dict[str, Any]],
+    chunker_id: str,
+) -> None:
+    """
+    Persist the manifest for the next incremental build (written after kb_embeddings.npy).
+
+    Args:
+        n_chunks: Indexed chunks (= vector rows)
+        n_raw_chunks: Chunker output before near-duplicate removal (= JSONL lines)
+        files: filename -> {"sha256", "first_row", "n_chunks"} (JSONL rows)
+    """
+    save_json(os.path.join(embeddings_dir, BUILD_MANIFEST_FILE), {
+        "version": MANIFEST_VERSION,
+        "embedding_model": settings.embedding_model_name,
+        "chunker": chunker_id,
+        "n_chunks": n_chunks,
+        "n_raw_chunks": n_raw_chunks,
+        "dimension": dimension,
+        "files": files,
+    }, indent=2)
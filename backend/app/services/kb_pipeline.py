@@ -0,0 +1,442 @@
+"""
+Streaming knowledge base ingestion pipeline.
+
+Builds every KB artifact in one pass over kb_raw/*.md, as a chain of
+generator stages connected by bounded queues (so memory stays flat and
+stages overlap):
+
+    read_files ──▶ chunk_files ──▶ encode_batches ──▶ KBIndexWriter
+    (thread)       (process pool)   (thread, dedup +    (main thread)
+                                     batched encoding)
+
+- read_files: reads markdown files and hashes their content
+- chunk_files: chunks changed files in worker processes, in file order;
+  unchanged files reuse their previous chunks (see kb_incremental.py)
+- encode_batches: drops near-duplicate chunks within each (parameter,
+  language) bucket (kb_dedup.py), then embeds
+  the rest in batches of `kb_ingest_batch_size`,
+  reusing the previous vector of any chunk text seen before, then the
+  persistent embedding cache (embedding_cache.py)
+- KBIndexWriter: streams kb_chunks.jsonl, the columnar metadata, BM25
+  postings and a vector spool, then builds the FAISS index and the
+  parameter/language shards once all vectors are in
+
+preprocess_kb.py / preprocess_kb_improved.py and the admin rebuild
+endpoint are thin wrappers around `run_pipeline()`.
+
+To modify:
+- Batch size / worker processes / queue depth: `kb_ingest_*` in config.py
+- Chunking: add a chunker to CHUNKERS in kb_chunkers.py
+- Near-duplicate threshold: `kb_dedup_threshold`
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from ..config import settings
+from .ann_index import build_index, write_index, write_index_manifest
+from .embedding_service import get_embedding_service
+from .kb_chunkers import CHUNKERS
+from .kb_dedup import NearDuplicateFilter
+from .kb_incremental import (
+    EMBEDDINGS_FILE,
+    PreviousBuild,
+    chunker_fingerprint,
+    content_hash,
+    load_previous_build,
+    save_build_manifest,
+)
+from .kb_store import ChunkStoreWriter, LEGACY_PICKLE_FILE, save_array, save_json
+from .lexical_index import LexicalIndexBuilder
+
+
+JSONL_FILE = "kb_chunks.jsonl"
+SHARD_MANIFEST_FILE = "kb_index_shards.json"
+DEDUP_REPORT_FILE = "kb_dedup_report.json"
+VECTOR_SPOOL_FILE = "kb_embeddings.f32.spool"
+
+Chunk = Dict[str, Any]
+
+_DONE = object()
+
+
+def _backend_dir() -> Path:
+    """backend/ directory (config paths are relative to it)."""
+    return Path(__file__).resolve().parents[2]
+
+
+def _prefetch(items: Iterable[Any], maxsize: int) -> Iterator[Any]:
+    """
+    Run an upstream stage in its own thread, handing items over a bounded queue.
+
+    The producer blocks once `maxsize` items are waiting, so a fast stage
+    can't run ahead of a slow one. Exceptions are re-raised in the consumer.
+    """
+    buffer: "queue.Queue[Any]" = queue.Queue(maxsize=max(maxsize, 1))
+    stopped = threading.Event()
+
+    def produce() -> None:
+        try:
+            for item in items:
+                while not stopped.is_set():
+                    try:
+                        buffer.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stopped.is_set():
+                    return
+            buffer.put(_DONE)
+        except BaseException as e:
+            buffer.put(e)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+
+
+def read_files(kb_raw_dir: Path) -> Iterator[Tuple[str, str, str]]:
+    """Stage 1: yield (filename, content, sha256) for each markdown file, in name order."""
+    for md_file in sorted(kb_raw_dir.glob("*.md")):
+        with open(md_file, "r", encoding="utf-8") as f:
+            content = f.read()
+        yield md_file.name, content, content_hash(content)
+
+
+def chunk_files(
+    files: Iterable[Tuple[str, str, str]],
+    chunker: Callable[[str, str], List[Chunk]],
+    previous: Optional[PreviousBuild],
+    workers: int,
+    max_in_flight: int,
+) -> Iterator[Tuple[str, str, List[Chunk], bool]]:
+    """
+    Stage 2: yield (filename, sha256, chunks, reused) in file order.
+
+    Changed files are chunked in a process pool with at most `max_in_flight`
+    files outstanding; results are yielded in submission order so chunk ids
+    stay deterministic.
+    """
+    pending: Deque[Tuple[str, str, Union[Future, List[Chunk]]]] = deque()
+
+    def drain(limit: int) -> Iterator[Tuple[str, str, List[Chunk], bool]]:
+        while len(pending) > limit:
+            name, sha, result = pending.popleft()
+            if isinstance(result, Future):
+                yield name, sha, result.result(), False
+            else:
+                yield name, sha, result, True
+
+    pool = None
+    if workers > 1:
+        # spawn: forking a process that has loaded torch/FAISS threads can deadlock
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        for name, content, sha in files:
+            chunks = previous.file_chunks(name, sha) if previous else None
+            if chunks is not None:
+                pending.append((name, sha, chunks))
+            elif pool is not None:
+                pending.append((name, sha, pool.submit(chunker, content, name)))
+            else:
+                future: Future = Future()
+                future.set_result(chunker(content, name))
+                pending.append((name, sha, future))
+            yield from drain(max_in_flight)
+        yield from drain(0)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def encode_batches(
+    chunks: Iterable[Chunk],
+    previous: Optional[PreviousBuild],
+    encode: Callable[[List[str]], np.ndarray],
+    batch_size: int,
+    dedup: Optional[NearDuplicateFilter] = None,
+) -> Iterator[Tuple[List[Chunk], List[Chunk], np.ndarray, int]]:
+    """
+    Stage 3: yield (raw chunks, kept chunks, float32 vectors of kept, reused count) per batch.
+
+    Near-duplicates (see kb_dedup.py) are dropped before embedding; only
+    kept texts the previous build didn't have are sent to the encoder.
+    """
+    def flush(raw: List[Chunk], kept: List[Chunk]) -> Tuple[List[Chunk], List[Chunk], np.ndarray, int]:
+        if not kept:
+            return raw, kept, np.zeros((0, 0), dtype=np.float32), 0
+        vectors: List[Optional[np.ndarray]] = [
+            previous.vector(chunk["text"]) if previous else None for chunk in kept
+        ]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = encode([kept[i]["text"] for i in missing])
+            for j, i in enumerate(missing):
+                vectors[i] = encoded[j]
+        return raw, kept, np.vstack(vectors).astype(np.float32), len(kept) - len(missing)
+
+    raw: List[Chunk] = []
+    kept: List[Chunk] = []
+    for chunk in chunks:
+        raw.append(chunk)
+        if dedup is None or dedup.check(chunk):
+            kept.append(chunk)
+        if len(kept) >= batch_size:
+            yield flush(raw, kept)
+            raw, kept = [], []
+    if raw:
+        yield flush(raw, kept)
+
+
+class KBIndexWriter:
+    """
+    Stage 4: write every KB artifact incrementally as batches arrive.
+
+    kb_chunks.jsonl gets every chunk the chunker produced (incremental builds
+    reuse it per file); the index artifacts only get the kept chunks.
+    Per-chunk outputs (JSONL, columnar metadata, BM25 postings) are streamed;
+    vectors go to a raw float32 spool that is memory-mapped at `close()` to
+    build kb_embeddings.npy, the global FAISS index and the shards. All
+    outputs are renamed into place only at `close()`.
+    """
+
+    def __init__(self, embeddings_dir: Path, jsonl_path: Path):
+        self.embeddings_dir = embeddings_dir
+        self.n_chunks = 0
+        self.n_raw_chunks = 0
+        self.dimension = 0
+        self.reused = 0
+        self.by_type: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[str, str], List[int]] = {}
+
+        self._jsonl_path = jsonl_path
+        self._jsonl_tmp_path = Path(f"{jsonl_path}.tmp-{os.getpid()}")
+        self._jsonl = open(self._jsonl_tmp_path, "w", encoding="utf-8")
+        self._spool_path = embeddings_dir / VECTOR_SPOOL_FILE
+        self._spool = open(self._spool_path, "wb")
+        self._store = ChunkStoreWriter(str(embeddings_dir))
+        self._lexical = LexicalIndexBuilder()
+
+    def add(self, raw: List[Chunk], chunks: List[Chunk], vectors: np.ndarray, reused: int) -> None:
+        """Append one batch (chunk id = position among kept chunks)."""
+        for chunk in raw:
+            self._jsonl.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+        self.n_raw_chunks += len(raw)
+        if not chunks:
+            return
+
+        self.dimension = vectors.shape[1]
+        self._spool.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        for chunk in chunks:
+            self._store.append(chunk)
+            self._lexical.add(chunk["text"])
+            key = (chunk.get("parameter", "general"), chunk.get("language", "en"))
+            self._buckets.setdefault(key, []).append(self.n_chunks)
+            section_type = chunk.get("section_type", "unknown")
+            self.by_type[section_type] = self.by_type.get(section_type, 0) + 1
+            self.n_chunks += 1
+        self.reused += reused
+
+    def close(self) -> Tuple[int, str]:
+        """
+        Finish per-chunk outputs, then build the indexes from the spooled vectors.
+
+        Returns:
+            Tuple of (global index size, index type)
+        """
+        self._spool.close()
+        self._jsonl.close()
+        os.replace(self._jsonl_tmp_path, self._jsonl_path)
+        self._store.close()
+        self._lexical.build().save(str(self.embeddings_dir))
+
+        embeddings = np.memmap(self._spool_path, dtype=np.float32, mode="r", shape=(self.n_chunks, self.dimension))
+        save_array(str(self.embeddings_dir / EMBEDDINGS_FILE), embeddings)
+
+        print("🔄 Building FAISS index...")
+        index, index_type, index_build_params = build_index(embeddings)
+        write_index(index, str(self.embeddings_dir / "kb_index.faiss"))
+        write_index_manifest(str(self.embeddings_dir), index_type, index_build_params, index.ntotal, self.dimension)
+        print(f"✓ Built {index_type} index ({index.ntotal} vectors)")
+
+        print("🔄 Building parameter/language shards...")
+        self._write_shards(embeddings)
+
+        del embeddings
+        self._spool_path.unlink()
+        legacy_meta_path = self.embeddings_dir / LEGACY_PICKLE_FILE
+        if legacy_meta_path.exists():
+            legacy_meta_path.unlink()
+        return index.ntotal, index_type
+
+    def abort(self) -> None:
+        """Drop partial outputs; the previous build stays in place."""
+        for f in (self._spool, self._jsonl):
+            f.close()
+        self._store.abort()
+        for path in (self._spool_path, self._jsonl_tmp_path):
+            if path.exists():
+                path.unlink()
+
+    def _write_shards(self, embeddings: np.ndarray) -> None:
+        """
+        One IndexIDMap per (parameter, language) bucket, with global chunk ids.
+
+        RAGEngine routes queries through the manifest (kb_index_shards.json)
+        and falls back to the global index.
+        """
+        # Remove shards from a previous build so stale buckets are not loaded
+        for old_shard in self.embeddings_dir.glob("kb_index__*.faiss"):
+            old_shard.unlink()
+
+        entries = []
+        for (parameter, language), ids in sorted(self._buckets.items()):
+            id_array = np.array(ids, dtype="int64")
+            # Same index type as the global index (small buckets fall back to flat)
+            shard, shard_type, _ = build_index(embeddings[id_array], ids=id_array)
+
+            filename = f"kb_index__{parameter}__{language}.faiss"
+            write_index(shard, str(self.embeddings_dir / filename))
+            entries.append({
+                "parameter": parameter,
+                "language": language,
+                "file": filename,
+                "size": len(ids),
+                "index_type": shard_type,
+            })
+            print(f"  - shard {parameter}/{language}: {len(ids)} vectors ({shard_type})")
+
+        save_json(
+            str(self.embeddings_dir / SHARD_MANIFEST_FILE),
+            {"global": "kb_index.faiss", "shards": entries},
+            indent=2,
+        )
+        print(f"✓ Saved {len(entries)} shard indexes ({SHARD_MANIFEST_FILE})")
+
+
+def run_pipeline(
+    chunker: str = "improved",
+    full: bool = False,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> bool:
+    """
+    Build the knowledge base from kb_raw/*.md.
+
+    Args:
+        chunker: Key in kb_chunkers.CHUNKERS ("improved" or "basic")
+        full: Ignore the previous build and re-chunk/re-embed everything
+        batch_size: Chunks per embedding batch (default: kb_ingest_batch_size)
+        workers: Chunking processes (default: kb_ingest_workers, 0 = CPU count)
+
+    Returns:
+        True if a new build was written
+    """
+    backend_dir = _backend_dir()
+    kb_raw_dir = backend_dir / settings.kb_raw_dir
+    kb_processed_dir = backend_dir / settings.kb_processed_dir
+    embeddings_dir = backend_dir / settings.embeddings_dir
+
+    kb_processed_dir.mkdir(parents=True, exist_ok=True)
+    embeddings_dir.mkdir(parents=True, exist_ok=True)
+
+    if not kb_raw_dir.exists():
+        print(f"⚠ Warning: Knowledge base directory not found: {kb_raw_dir}")
+        print("  Please copy your .md files to this directory first.")
+        return False
+
+    n_files = len(list(kb_raw_dir.glob("*.md")))
+    if not n_files:
+        print(f"⚠ Warning: No .md files found in {kb_raw_dir}")
+        return False
+
+    chunk_fn = CHUNKERS[chunker]
+    batch_size = batch_size or settings.kb_ingest_batch_size
+    workers = workers or settings.kb_ingest_workers or os.cpu_count() or 1
+    workers = min(workers, n_files)
+    queue_size = settings.kb_ingest_queue_size
+    print(f"📚 Found {n_files} markdown files ({chunker} chunker, {workers} workers, batch size {batch_size})")
+
+    # Previous build: unchanged files and chunks are reused, not re-embedded
+    jsonl_path = kb_processed_dir / JSONL_FILE
+    chunker_id = chunker_fingerprint(chunk_fn)
+    previous = None if full else load_previous_build(str(embeddings_dir), str(jsonl_path), chunker_id)
+    if previous is not None:
+        print("♻️  Incremental build - reusing unchanged files and chunks")
+
+    file_entries: Dict[str, Dict[str, Any]] = {}
+    dedup = NearDuplicateFilter(settings.kb_dedup_threshold)
+
+    def flatten(files: Iterable[Tuple[str, str, List[Chunk], bool]]) -> Iterator[Chunk]:
+        first_row = 0
+        for name, sha, chunks, reused in files:
+            if reused:
+                print(f"  Unchanged: {name} ({len(chunks)} chunks)")
+            else:
+                print(f"  Processed: {name} → {len(chunks)} chunks")
+            file_entries[name] = {"sha256": sha, "first_row": first_row, "n_chunks": len(chunks)}
+            first_row += len(chunks)
+            yield from chunks
+
+    # The embedding model loads lazily on the first batch that misses every cache
+    embedding_service = get_embedding_service()
+    encoded_before = embedding_service.texts_encoded
+    disk_cache = embedding_service.disk_cache()
+    cache_hits_before = disk_cache.hits if disk_cache else 0
+    stages = encode_batches(
+        flatten(chunk_files(_prefetch(read_files(kb_raw_dir), queue_size), chunk_fn, previous, workers, queue_size)),
+        previous,
+        lambda texts: embedding_service.encode_cached(texts, batch_size=batch_size),
+        batch_size,
+        dedup if dedup.enabled else None,
+    )
+
+    writer = KBIndexWriter(embeddings_dir, jsonl_path)
+    try:
+        for raw, chunks, vectors, reused in _prefetch(stages, queue_size):
+            writer.add(raw, chunks, vectors, reused)
+        if writer.n_chunks == 0:
+            raise ValueError("No chunks produced from the markdown files")
+        if dedup.enabled:
+            save_json(str(kb_processed_dir / DEDUP_REPORT_FILE), dedup.report(), indent=2)
+            print(f"🧹 Dropped {dedup.n_dropped} near-duplicate chunks of {writer.n_raw_chunks} "
+                  f"(threshold {dedup.threshold}, report: {DEDUP_REPORT_FILE})")
+        encoded = embedding_service.texts_encoded - encoded_before
+        cache_hits = (disk_cache.hits if disk_cache else 0) - cache_hits_before
+        print(f"\n📦 Total chunks: {writer.n_chunks} ({encoded} encoded, "
+              f"{writer.reused} reused from the previous build, {cache_hits} from the embedding cache)")
+        print("Chunk breakdown:")
+        for chunk_type, count in sorted(writer.by_type.items()):
+            print(f"  - {chunk_type}: {count}")
+        index_size, _ = writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        if previous is not None:
+            previous.close()
+
+    save_build_manifest(
+        str(embeddings_dir), writer.n_chunks, writer.n_raw_chunks, writer.dimension, file_entries, chunker_id
+    )
+
+    print("\n✅ Knowledge base preprocessing complete!")
+    print(f"   Index size: {index_size} vectors")
+    print(f"   Embedding dimension: {writer.dimension}")
+    return True
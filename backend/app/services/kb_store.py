@@ -0,0 +1,281 @@
+"""
+Columnar on-disk storage for knowledge base chunk metadata.
+
+Replaces the pickled dict-of-dicts (kb_index_meta.pkl) with files that can
+be memory-mapped, so every worker on a host shares the same pages and
+startup doesn't pay for unpickling:
+
+- kb_meta_text.bin        UTF-8 chunk texts, concatenated
+- kb_meta_offsets.npy     int64 byte offsets into the blob (n + 1 entries)
+- kb_meta_<column>.npy    int16 codes for parameter / language / section_type
+- kb_meta_vocab.json      code -> string tables for each column
+
+All KB artifacts are written with `atomic_output()` (write to a temp file,
+then rename), so a rebuild never modifies files that a running RAGEngine
+generation still has memory-mapped.
+
+To add a column: append it to COLUMNS and rebuild the index.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+
+
+COLUMNS = ("parameter", "language", "section_type")
+
+TEXT_FILE = "kb_meta_text.bin"
+OFFSETS_FILE = "kb_meta_offsets.npy"
+VOCAB_FILE = "kb_meta_vocab.json"
+LEGACY_PICKLE_FILE = "kb_index_meta.pkl"
+
+# Defaults applied when a chunk record lacks a column
+COLUMN_DEFAULTS = {
+    "parameter": "",
+    "language": "en",
+    "section_type": "",
+}
+
+
+def _column_file(column: str) -> str:
+    return f"kb_meta_{column}.npy"
+
+
+@contextmanager
+def atomic_output(path: str) -> Iterator[str]:
+    """
+    Yield a temporary path to write to, then rename it onto `path`.
+    
+    Replacing the file (instead of truncating it) leaves the old inode intact
+    for processes that still have it memory-mapped, e.g. a RAGEngine
+    generation serving in-flight requests during a hot reload.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def save_array(path: str, array: np.ndarray) -> None:
+    """np.save to exactly `path`, atomically."""
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(array))
+
+
+def save_json(path: str, data: Any, indent: Optional[int] = None) -> None:
+    """json.dump to `path`, atomically."""
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+
+
+class ChunkStore:
+    """
+    Read-only columnar view over chunk metadata, indexed by chunk id.
+
+    Texts are decoded on access from the (optionally memory-mapped) blob;
+    categorical columns are small integer arrays plus a vocabulary.
+    """
+
+    def __init__(
+        self,
+        offsets: np.ndarray,
+        blob: np.ndarray,
+        codes: Dict[str, np.ndarray],
+        vocab: Dict[str, List[str]],
+    ):
+        self._offsets = offsets
+        self._blob = blob
+        self._codes = codes
+        self._vocab = vocab
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    def text(self, chunk_id: int) -> str:
+        """Decode the text of one chunk."""
+        start, end = int(self._offsets[chunk_id]), int(self._offsets[chunk_id + 1])
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def iter_texts(self) -> Iterable[str]:
+        """Yield all chunk texts in id order."""
+        for chunk_id in range(len(self)):
+            yield self.text(chunk_id)
+
+    def codes(self, column: str) -> np.ndarray:
+        """Integer codes for a categorical column."""
+        return self._codes[column]
+
+    def vocab(self, column: str) -> List[str]:
+        """Code -> value table for a categorical column."""
+        return self._vocab[column]
+
+    def value(self, column: str, chunk_id: int) -> str:
+        """Decoded value of a categorical column for one chunk."""
+        return self._vocab[column][int(self._codes[column][chunk_id])]
+
+    def get(self, chunk_id: int) -> Dict[str, Any]:
+        """Chunk metadata as a dict (text plus categorical columns)."""
+        meta = {column: self.value(column, chunk_id) for column in COLUMNS}
+        meta["text"] = self.text(chunk_id)
+        return meta
+
+    def content_hash(self) -> str:
+        """SHA-256 of texts, offsets and categorical columns (same for every copy of a build)."""
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(self._offsets, dtype=np.int64).tobytes())
+        digest.update(memoryview(np.ascontiguousarray(self._blob)))
+        for column in COLUMNS:
+            digest.update(np.ascontiguousarray(self._codes[column], dtype=np.int16).tobytes())
+        digest.update(json.dumps(self._vocab, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "ChunkStore":
+        """Build an in-memory store from chunk dicts (as produced by the chunkers)."""
+        encoded = [record.get("text", "").encode("utf-8") for record in records]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            offsets[1:] = np.cumsum([len(b) for b in encoded])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        codes: Dict[str, np.ndarray] = {}
+        vocab: Dict[str, List[str]] = {}
+        for column in COLUMNS:
+            values = [str(record.get(column, COLUMN_DEFAULTS[column])) for record in records]
+            table = sorted(set(values))
+            lookup = {value: i for i, value in enumerate(table)}
+            codes[column] = np.array([lookup[v] for v in values], dtype=np.int16)
+            vocab[column] = table
+
+        return cls(offsets, blob, codes, vocab)
+
+    @classmethod
+    def from_legacy_pickle(cls, path: str) -> "ChunkStore":
+        """Load an old kb_index_meta.pkl ({"0": {...}, "1": {...}})."""
+        with open(path, "rb") as f:
+            metadata = pickle.load(f)
+        records = [metadata.get(str(i), {}) for i in range(len(metadata))]
+        return cls.from_records(records)
+
+    def save(self, directory: str) -> None:
+        """Write the columnar files into directory."""
+        with atomic_output(os.path.join(directory, TEXT_FILE)) as tmp_path:
+            with open(tmp_path, "wb") as f:
+                f.write(self._blob.tobytes())
+        save_array(os.path.join(directory, OFFSETS_FILE), self._offsets)
+        for column in COLUMNS:
+            save_array(os.path.join(directory, _column_file(column)), self._codes[column])
+        save_json(os.path.join(directory, VOCAB_FILE), self._vocab, indent=2)
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Whether a columnar store has been written to directory."""
+        return all(
+            os.path.exists(os.path.join(directory, name))
+            for name in (TEXT_FILE, OFFSETS_FILE, VOCAB_FILE)
+        )
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "ChunkStore":
+        """
+        Load a columnar store.
+
+        Args:
+            directory: Directory containing the kb_meta_* files
+            mmap: Memory-map arrays and the text blob instead of reading them
+        """
+        mmap_mode = "r" if mmap else None
+        offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode=mmap_mode)
+
+        text_path = os.path.join(directory, TEXT_FILE)
+        if os.path.getsize(text_path) == 0:
+            blob = np.zeros(0, dtype=np.uint8)  # np.memmap can't map empty files
+        elif mmap:
+            blob = np.memmap(text_path, dtype=np.uint8, mode="r")
+        else:
+            blob = np.fromfile(text_path, dtype=np.uint8)
+
+        codes = {
+            column: np.load(os.path.join(directory, _column_file(column)), mmap_mode=mmap_mode)
+            for column in COLUMNS
+        }
+        with open(os.path.join(directory, VOCAB_FILE), "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+
+        return cls(offsets, blob, codes, vocab)
+
+
+class ChunkStoreWriter:
+    """
+    Stream chunk records into the columnar files (same format as ChunkStore.save).
+
+    Texts go straight to the blob on disk; only offsets and the categorical
+    values are kept in memory until `close()`.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._text_path = os.path.join(directory, TEXT_FILE)
+        self._tmp_path = f"{self._text_path}.tmp-{os.getpid()}"
+        self._blob = open(self._tmp_path, "wb")
+        self._offsets: List[int] = [0]
+        self._values: Dict[str, List[str]] = {column: [] for column in COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Add one chunk (chunk id = number of chunks appended before it)."""
+        encoded = record.get("text", "").encode("utf-8")
+        self._blob.write(encoded)
+        self._offsets.append(self._offsets[-1] + len(encoded))
+        for column in COLUMNS:
+            self._values[column].append(str(record.get(column, COLUMN_DEFAULTS[column])))
+
+    def close(self) -> None:
+        """Move the blob into place and write offsets, codes and vocabularies."""
+        self._blob.close()
+        os.replace(self._tmp_path, self._text_path)
+        save_array(os.path.join(self._directory, OFFSETS_FILE), np.array(self._offsets, dtype=np.int64))
+
+        vocab: Dict[str, List[str]] = {}
+        for column in COLUMNS:
+            table = sorted(set(self._values[column]))
+            lookup = {value: i for i, value in enumerate(table)}
+            codes = np.array([lookup[v] for v in self._values[column]], dtype=np.int16)
+            save_array(os.path.join(self._directory, _column_file(column)), codes)
+            vocab[column] = table
+        save_json(os.path.join(self._directory, VOCAB_FILE), vocab, indent=2)
+
+    def abort(self) -> None:
+        """Discard the partially written blob (the live files are untouched)."""
+        self._blob.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def load_chunk_store(directory: str, mmap: bool = True) -> Optional[ChunkStore]:
+    """
+    Load chunk metadata from directory, preferring the columnar format.
+
+    Falls back to the legacy pickle so indexes built before the columnar
+    format keep working. Returns None if neither exists.
+    """
+    if ChunkStore.exists(directory):
+        return ChunkStore.load(directory, mmap=mmap)
+
+    legacy_path = os.path.join(directory, LEGACY_PICKLE_FILE)
+    if os.path.exists(legacy_path):
+        print("⚠ Loading legacy pickled metadata - re-run preprocessing for mmap support")
+        return ChunkStore.from_legacy_pickle(legacy_path)
+
+    return None
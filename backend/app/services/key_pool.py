@@ -0,0 +1,362 @@
+"""
+API key pool with per-key rate limiting.
+
+Settings carry several Groq keys (`groq_llm_api_key`, `groq_report_api_key`,
+`groq_api_key`) and Gemini keys (`gemini_api_key`, `gemini_api_key_1`,
+`gemini_api_key_2`). Call sites no longer pick one statically - every Groq
+and Gemini LLM call and every Groq Whisper call takes a lease from the
+provider's pool:
+- Per-key token buckets for requests per minute and tokens per minute
+  (refilled continuously; 0 = no limit)
+- Smooth weighted rotation over the keys that can take the request now
+  (`key_pool_weights`, default 1 per key)
+- A fair wait queue: when every key is exhausted, callers (threads and
+  coroutines alike) queue in arrival order and the head gets the next key
+  that frees up; a caller that waits longer than its own timeout (capped by
+  `key_pool_max_wait_seconds`) fails instead of piling up
+- Token usage is estimated up front (prompt length + max output tokens) and
+  corrected with the real usage when the call returns
+- A 429 from upstream cools the key down for its Retry-After (or
+  `key_pool_cooldown_seconds`), so retries rotate to another key
+
+Provider limits apply per model family, so Whisper has its own buckets
+over the same Groq keys ("groq.whisper"). Duplicate keys are pooled once.
+
+To modify:
+- Limits per key: `key_pool_groq_rpm`, `key_pool_groq_tpm`, `key_pool_gemini_rpm`,
+  `key_pool_gemini_tpm`, `key_pool_whisper_rpm`
+- Weights: `key_pool_weights` - e.g. KEY_POOL_WEIGHTS='{"groq_report_api_key": 2}'
+- Add a key: add the setting and list it in `POOL_KEYS`
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from ..config import settings
+from .prompt_budget import count_tokens
+
+
+# Settings holding each provider's keys (in pool order)
+POOL_KEYS: Dict[str, List[str]] = {
+    "groq": ["groq_llm_api_key", "groq_report_api_key", "groq_api_key"],
+    "groq.whisper": ["groq_api_key", "groq_llm_api_key", "groq_report_api_key"],
+    "gemini": ["gemini_api_key", "gemini_api_key_1", "gemini_api_key_2"],
+}
+
+# Per-key limits of each pool: (requests/minute setting, tokens/minute setting)
+POOL_LIMITS: Dict[str, Tuple[str, Optional[str]]] = {
+    "groq": ("key_pool_groq_rpm", "key_pool_groq_tpm"),
+    "groq.whisper": ("key_pool_whisper_rpm", None),
+    "gemini": ("key_pool_gemini_rpm", "key_pool_gemini_tpm"),
+}
+
+
+class KeyPoolExhausted(Exception):
+    """No key could take the request within the caller's wait limit (or the pool is empty)."""
+
+
+class TokenBucket:
+    """Continuously refilled bucket holding up to one minute of budget."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (a request above capacity waits for a full bucket)."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate) if self.rate > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        """Correct a previous take (negative amounts charge extra; the level may go into debt)."""
+        self.level = min(self.capacity, self.level + amount)
+
+
+class PooledKey:
+    """One API key with its buckets and rotation state."""
+
+    def __init__(self, name: str, secret: str, weight: float, rpm: int, tpm: Optional[int]):
+        self.name = name  # Setting name - the secret never leaves this object
+        self.secret = secret
+        self.weight = weight
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.cooldown_until = 0.0
+        self.current_weight = 0.0  # Smooth weighted round-robin
+
+        self.leases = 0
+        self.throttled = 0
+        self.tokens_used = 0
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        wait = max(0.0, self.cooldown_until - now)
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "weight": self.weight,
+            "leases": self.leases,
+            "throttled": self.throttled,
+            "tokens_used": self.tokens_used,
+            "requests_available": round(self.requests.level, 1) if self.requests else None,
+            "tokens_available": round(self.tokens.level) if self.tokens else None,
+            "cooldown_seconds": round(max(0.0, self.cooldown_until - now), 1),
+        }
+
+
+class KeyLease:
+    """A key granted for one request; call `finish` when it returns."""
+
+    def __init__(self, pool: "KeyPool", key: PooledKey, tokens: int):
+        self._pool = pool
+        self._key = key
+        self._tokens = tokens
+        self.key = key.secret
+        self.name = key.name
+
+    def finish(self, tokens_used: int = 0, error: Optional[BaseException] = None) -> None:
+        """
+        Report the outcome of the request.
+
+        On success the token estimate is replaced by `tokens_used`; on
+        failure it is refunded, and a 429 cools the key down.
+        """
+        if error is not None and getattr(error, "status_code", None) == 429:
+            self._pool._throttle(self._key, _retry_after(error))
+        self._pool._settle(self._key, self._tokens, tokens_used if error is None else 0)
+
+
+def _retry_after(error: BaseException) -> Optional[str]:
+    """Retry-After of a 429 (LLMError attribute or the SDK error's response headers)."""
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        retry_after = headers.get("retry-after") if headers is not None else None
+    return retry_after
+
+
+class _Waiter:
+    """A queued caller; `wake()` is safe from any thread."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event: Any = asyncio.Event() if loop is not None else threading.Event()
+
+    def wake(self) -> None:
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.event.set)
+        else:
+            self.event.set()
+
+
+class KeyPool:
+    """Rate-limited keys of one provider, shared by every call site in the process."""
+
+    def __init__(self, name: str, keys: List[PooledKey], max_wait_seconds: float, cooldown_seconds: float):
+        self.name = name
+        self.keys = keys
+        self.max_wait_seconds = max_wait_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._queue: Deque[_Waiter] = deque()
+        self.waits = 0
+        self.timeouts = 0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def acquire(self, tokens: int = 0, max_wait: Optional[float] = None) -> KeyLease:
+        """
+        Lease a key, waiting in line if every key is exhausted (blocks the thread).
+
+        Args:
+            tokens: Estimated tokens of the request
+            max_wait: Caller's deadline in seconds, e.g. its request timeout
+                (capped by `key_pool_max_wait_seconds`)
+        """
+        waiter = _Waiter()
+        deadline, limit = self._enqueue(waiter, max_wait)
+        try:
+            while True:
+                waiter.event.clear()
+                lease, wait = self._step(waiter, tokens)
+                if lease is not None:
+                    return lease
+                waiter.event.wait(self._timeout(deadline, limit, wait))
+        except BaseException:
+            self._leave(waiter)
+            raise
+
+    async def aacquire(self, tokens: int = 0, max_wait: Optional[float] = None) -> KeyLease:
+        """Async `acquire`: waits without blocking the event loop."""
+        waiter = _Waiter(asyncio.get_running_loop())
+        deadline, limit = self._enqueue(waiter, max_wait)
+        try:
+            while True:
+                waiter.event.clear()
+                lease, wait = self._step(waiter, tokens)
+                if lease is not None:
+                    return lease
+                timeout = self._timeout(deadline, limit, wait)
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._leave(waiter)
+            raise
+
+    def _enqueue(self, waiter: _Waiter, max_wait: Optional[float]) -> Tuple[float, float]:
+        """Queue the caller; returns (deadline, seconds it may wait)."""
+        if not self.keys:
+            raise KeyPoolExhausted(f"No {self.name} API key configured")
+        limit = self.max_wait_seconds if max_wait is None else max(0.0, min(max_wait, self.max_wait_seconds))
+        with self._lock:
+            self._queue.append(waiter)
+        return time.monotonic() + limit, limit
+
+    def _timeout(self, deadline: float, limit: float, wait: Optional[float]) -> float:
+        """How long to sleep before the next attempt (raises once the deadline has passed)."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            with self._lock:
+                self.timeouts += 1
+            raise KeyPoolExhausted(f"All {self.name} API keys are rate limited (waited {limit:.1f}s)")
+        return min(wait, remaining) if wait is not None else remaining
+
+    def _step(self, waiter: _Waiter, tokens: int) -> Tuple[Optional[KeyLease], Optional[float]]:
+        """
+        One attempt at the head of the line.
+
+        Returns:
+            Tuple of (lease or None, seconds until a key frees up - None if
+            this caller isn't at the head and waits to be woken)
+        """
+        with self._lock:
+            if self._queue[0] is not waiter:
+                return None, None
+
+            now = time.monotonic()
+            waits = [(key.wait_time(tokens, now), key) for key in self.keys]
+            ready = [key for wait, key in waits if wait <= 0]
+            if not ready:
+                self.waits += 1
+                return None, min(wait for wait, _ in waits)
+
+            # Smooth weighted round-robin among the keys that can take it now
+            total = sum(key.weight for key in ready)
+            for key in ready:
+                key.current_weight += key.weight
+            chosen = max(ready, key=lambda key: key.current_weight)
+            chosen.current_weight -= total
+
+            if chosen.requests is not None:
+                chosen.requests.take(1)
+            if chosen.tokens is not None:
+                chosen.tokens.take(tokens)
+            chosen.leases += 1
+
+            self._queue.popleft()
+            if self._queue:
+                self._queue[0].wake()
+            return KeyLease(self, chosen, tokens), None
+
+    def _leave(self, waiter: _Waiter) -> None:
+        """Drop a caller that gave up (timeout, cancellation) and pass the turn on."""
+        with self._lock:
+            if waiter in self._queue:
+                was_head = self._queue[0] is waiter
+                self._queue.remove(waiter)
+                if was_head and self._queue:
+                    self._queue[0].wake()
+
+    def _settle(self, key: PooledKey, estimated: int, actual: int) -> None:
+        with self._lock:
+            if key.tokens is not None:
+                key.tokens.give_back(estimated - actual)
+            key.tokens_used += actual
+            if self._queue:
+                self._queue[0].wake()  # A refund may let the head through
+
+    def _throttle(self, key: PooledKey, retry_after: Optional[str]) -> None:
+        try:
+            cooldown = float(retry_after) if retry_after else self.cooldown_seconds
+        except ValueError:
+            cooldown = self.cooldown_seconds
+        with self._lock:
+            key.throttled += 1
+            key.cooldown_until = max(key.cooldown_until, time.monotonic() + cooldown)
+        print(f"⚠ {self.name} key {key.name} rate limited upstream - cooling down {cooldown:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "queued": len(self._queue),
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "keys": {key.name: key.to_dict(now) for key in self.keys},
+            }
+
+
+def estimate_tokens(text: str, max_output_tokens: int = 0) -> int:
+    """Prompt tokens (local tokenizer, see prompt_budget.py) plus the output allowance."""
+    return count_tokens(text) + 1 + max_output_tokens
+
+
+def _build_pool(name: str) -> KeyPool:
+    rpm_setting, tpm_setting = POOL_LIMITS[name]
+    rpm = getattr(settings, rpm_setting)
+    tpm = getattr(settings, tpm_setting) if tpm_setting else None
+
+    keys: List[PooledKey] = []
+    seen = set()
+    for setting_name in POOL_KEYS[name]:
+        secret = getattr(settings, setting_name, None)
+        if secret and secret not in seen:
+            seen.add(secret)
+            weight = float(settings.key_pool_weights.get(setting_name, 1.0))
+            keys.append(PooledKey(setting_name, secret, weight, rpm, tpm))
+
+    if keys:
+        print(f"✓ {name} key pool: {len(keys)} key(s), {rpm} RPM" + (f" / {tpm} TPM" if tpm else "") + " each")
+    return KeyPool(name, keys, settings.key_pool_max_wait_seconds, settings.key_pool_cooldown_seconds)
+
+
+# Global instances
+_pools: Dict[str, KeyPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_key_pool(name: str) -> KeyPool:
+    """Process-wide pool "groq", "groq.whisper" or "gemini"."""
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = _pools[name] = _build_pool(name)
+    return pool
+
+
+def key_pool_stats() -> Dict[str, Any]:
+    """Stats of the pools created so far."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {name: pool.stats() for name, pool in sorted(pools.items())}
@@ -0,0 +1,217 @@
+"""
+Bilingual BM25 inverted index over knowledge base chunks.
+
+Complements FAISS for exact keywords that the small MiniLM model ranks
+poorly (e.g. "केंचुए", "दोमट"). Tokens are runs of Devanagari or Latin
+letters/digits, so Hindi and English (and Hinglish) share one index.
+
+Stored next to the FAISS index as memory-mappable arrays (CSR postings):
+- kb_lex_indptr.npy    int64, postings offsets per term (n_terms + 1)
+- kb_lex_doc_ids.npy   int32, chunk ids per posting
+- kb_lex_tf.npy        float32, term frequency per posting
+- kb_lex_doc_len.npy   float32, tokens per chunk
+- kb_lex_vocab.json    term -> term id
+
+To modify:
+- Tokenization / stopwords: Update `tokenize()` and `STOPWORDS`
+- Ranking: Adjust `BM25_K1` / `BM25_B`
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .kb_store import save_array, save_json
+
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Runs of Devanagari (incl. matras/virama) or Latin letters and digits
+TOKEN_PATTERN = re.compile(r"[\u0900-\u097F]+|[a-z0-9]+")
+
+# Function words that appear in nearly every chunk and every query template
+STOPWORDS = {
+    # English
+    "a", "an", "and", "are", "at", "by", "for", "how", "in", "is", "it", "of",
+    "on", "or", "step", "the", "to", "with", "your",
+    # Hindi
+    "का", "की", "के", "को", "है", "हैं", "में", "से", "और", "पर", "कैसे", "यह", "वह",
+}
+
+INDPTR_FILE = "kb_lex_indptr.npy"
+DOC_IDS_FILE = "kb_lex_doc_ids.npy"
+TF_FILE = "kb_lex_tf.npy"
+DOC_LEN_FILE = "kb_lex_doc_len.npy"
+VOCAB_FILE = "kb_lex_vocab.json"
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase Devanagari/Latin tokens, minus stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class LexicalIndex:
+    """BM25 ranking over a CSR inverted index, indexed by chunk id."""
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        tf: np.ndarray,
+        doc_len: np.ndarray,
+    ):
+        self.vocab = vocab
+        self._indptr = indptr
+        self._doc_ids = doc_ids
+        self._tf = tf
+        self._doc_len = np.asarray(doc_len, dtype=np.float32)
+        self.n_docs = len(doc_len)
+        avg_len = float(self._doc_len.mean()) if self.n_docs else 0.0
+        # Per-document length normalization term of the BM25 denominator
+        self._norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self._doc_len / max(avg_len, 1e-6))
+
+        # idf per term (BM25+ style floor at 0 so common terms never subtract)
+        df = np.diff(np.asarray(indptr)).astype(np.float64)
+        self._idf = np.maximum(np.log((self.n_docs - df + 0.5) / (df + 0.5) + 1.0), 0.0)
+
+    @classmethod
+    def build(cls, texts: List[str]) -> "LexicalIndex":
+        """Build the inverted index from chunk texts (chunk id = position)."""
+        builder = LexicalIndexBuilder()
+        for text in texts:
+            builder.add(text)
+        return builder.build()
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[List[int], float]:
+        """
+        Rank chunks for a query with BM25.
+
+        Args:
+            query: Query text
+            k: Number of chunk ids to return
+            mask: Optional boolean array restricting results (e.g. to a shard)
+
+        Returns:
+            Tuple of (chunk ids best-first, confidence). Confidence is the top
+            score relative to a chunk of average length containing every
+            query term once (capped at 1), in [0, 1].
+        """
+        term_ids = sorted({self.vocab[t] for t in tokenize(query) if t in self.vocab})
+        if not term_ids or k <= 0:
+            return [], 0.0
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term_id in term_ids:
+            start, end = int(self._indptr[term_id]), int(self._indptr[term_id + 1])
+            docs = self._doc_ids[start:end]
+            tf = self._tf[start:end]
+            scores[docs] += self._idf[term_id] * tf * (BM25_K1 + 1.0) / (tf + self._norm[docs])
+
+        if mask is not None:
+            scores = np.where(mask, scores, 0.0)
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) == 0:
+            return [], 0.0
+
+        top = candidates[np.argsort(-scores[candidates], kind="stable")[:k]]
+
+        # Reference: every query term once in an average-length chunk, where
+        # each term scores exactly its idf (tf (k1 + 1) / (tf + k1) = 1). The
+        # theoretical maximum (idf (k1 + 1), tf -> infinity) is out of reach
+        # for real chunks, so confidence against it never got near a threshold.
+        # Query terms not in the vocabulary count against confidence too
+        n_query_terms = len(set(tokenize(query)))
+        reference = float(self._idf[term_ids].sum()) * n_query_terms / len(term_ids)
+        confidence = float(scores[top[0]]) / reference if reference > 0 else 0.0
+
+        return [int(doc_id) for doc_id in top], min(confidence, 1.0)
+
+    def save(self, directory: str) -> None:
+        """Write the index files into directory."""
+        save_array(os.path.join(directory, INDPTR_FILE), self._indptr)
+        save_array(os.path.join(directory, DOC_IDS_FILE), self._doc_ids)
+        save_array(os.path.join(directory, TF_FILE), self._tf)
+        save_array(os.path.join(directory, DOC_LEN_FILE), self._doc_len)
+        save_json(os.path.join(directory, VOCAB_FILE), self.vocab)
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Whether a lexical index has been written to directory."""
+        return all(
+            os.path.exists(os.path.join(directory, name))
+            for name in (INDPTR_FILE, DOC_IDS_FILE, TF_FILE, DOC_LEN_FILE, VOCAB_FILE)
+        )
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "LexicalIndex":
+        """Load a lexical index, memory-mapping the postings arrays."""
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(directory, VOCAB_FILE), "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        return cls(
+            vocab,
+            np.load(os.path.join(directory, INDPTR_FILE), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, DOC_IDS_FILE), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, TF_FILE), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, DOC_LEN_FILE)),
+        )
+
+
+class LexicalIndexBuilder:
+    """Accumulate postings one chunk at a time (for streaming ingestion)."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_len: List[int] = []
+
+    def add(self, text: str) -> None:
+        """Index the next chunk (chunk id = number of chunks added before it)."""
+        doc_id = len(self._doc_len)
+        tokens = tokenize(text)
+        self._doc_len.append(len(tokens))
+        for token in tokens:
+            counts = self._postings.setdefault(token, {})
+            counts[doc_id] = counts.get(doc_id, 0) + 1
+
+    def build(self) -> LexicalIndex:
+        """Freeze the postings into CSR arrays."""
+        postings = self._postings
+        vocab = {term: i for i, term in enumerate(sorted(postings))}
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        doc_ids: List[int] = []
+        tf: List[float] = []
+        for term, term_id in vocab.items():
+            for doc_id, count in sorted(postings[term].items()):
+                doc_ids.append(doc_id)
+                tf.append(count)
+            indptr[term_id + 1] = len(doc_ids)
+
+        return LexicalIndex(
+            vocab,
+            indptr,
+            np.array(doc_ids, dtype=np.int32),
+            np.array(tf, dtype=np.float32),
+            np.array(self._doc_len, dtype=np.float32),
+        )
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = 60) -> List[int]:
+    """
+    Fuse several best-first id lists with reciprocal-rank fusion.
+
+    Each id scores sum(1 / (k + rank)) over the lists it appears in.
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused, key=lambda doc_id: fused[doc_id], reverse=True)
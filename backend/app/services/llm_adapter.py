@@ -9,17 +9,54 @@ To swap LLM provider:
 1. Implement new adapter class inheriting from LLMAdapter
 2. Update config.py to set llm_provider
 3. Update main.py to instantiate correct adapter
+
+All HTTP/SDK calls go through the shared pooled client (llm_client.py).
+`agenerate_helper` is the non-blocking variant used by the async orchestrator;
+`astream_helper` streams the same text for the SSE endpoint.
+`create_llm_adapter` wraps the adapter in `CachedLLMAdapter` (helper_cache.py).
+Helper prompts pack the retrieved chunks into a token budget per provider
+and model (prompt_budget.py) instead of keeping a fixed number of them.
+
+With `llm_failover_providers` set, the helper adapter is a `HedgedLLMAdapter`
+over `llm_provider` followed by those providers: when a provider has not
+answered within its own p95 latency (or has failed), the next one is asked
+as well and the first good answer wins, all within
+`llm_hedge_budget_seconds`.
 """
 
+import asyncio
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import ContextVar, copy_context
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
 from ..models import Language
 from ..config import settings
+from .blocking_pool import run_blocking
+from .helper_cache import HelperCache, get_helper_cache, helper_cache_key, helper_cache_status
+from .llm_client import GROQ_CHAT_URL, LATENCY_WINDOW, current_turn_usage, get_llm_client, set_call_deadline
+from .key_pool import get_key_pool
+from .prompt_budget import PackedContext, context_budget, count_tokens, get_token_counter, pack_context
+
+
+# Provider that produced this request's helper text, for the audit (set by HedgedLLMAdapter)
+helper_route: ContextVar[Optional[Dict[str, Any]]] = ContextVar("helper_route", default=None)
+
+# Successful calls a provider needs before its own p95 replaces the default hedge delay
+HEDGE_MIN_SAMPLES = 20
+
+
+class FallbackText(str):
+    """Helper text produced because the LLM call failed (never cached)."""
 
 
 class LLMAdapter(ABC):
     """Abstract base class for LLM adapters."""
     
+    provider = ""  # Provider name as in `llm_provider` (prompt budgets, audit)
+    
     @abstractmethod
     def generate_helper(
         self,
@@ -42,6 +79,38 @@ class LLMAdapter(ABC):
         """
         pass
     
+    async def agenerate_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """
+        Async variant of `generate_helper` for the async request path.
+        
+        Default runs `generate_helper` on the blocking pool; adapters with
+        an async HTTP client override it.
+        """
+        return await run_blocking(
+            self.generate_helper, parameter, language, user_message, retrieved_chunks
+        )
+    
+    async def astream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        """
+        Stream the helper explanation as text pieces (for the SSE endpoint).
+        
+        Default yields the whole `agenerate_helper` result at once; adapters
+        whose API can stream override it.
+        """
+        yield await self.agenerate_helper(parameter, language, user_message, retrieved_chunks)
+    
     async def generate_async(self, prompt: str, temperature: float = 0.3) -> str:
         """
         Generate text asynchronously (for report generation).
@@ -54,7 +123,7 @@ class LLMAdapter(ABC):
             Generated text
         """
         # Default implementation - subclasses should override for true async
-        return self.generate_sync(prompt, temperature)
+        return await run_blocking(self.generate_sync, prompt, temperature)
     
     def generate_sync(self, prompt: str, temperature: float = 0.3) -> str:
         """
@@ -68,6 +137,20 @@ class LLMAdapter(ABC):
             Generated text
         """
         raise NotImplementedError("Subclass must implement generate_sync")
+    
+    def _pack_context(self, retrieved_chunks: List[str]) -> PackedContext:
+        """The best retrieved chunks that fit this provider/model's context budget."""
+        return pack_context(retrieved_chunks, context_budget(self.provider, getattr(self, "model_name", "")))
+    
+    def _note_prompt(self, packed: PackedContext, *prompt_parts: str) -> None:
+        """Add the helper prompt's size to the turn's LLM usage (for the audit)."""
+        usage = current_turn_usage()
+        if usage is not None:
+            usage["prompts"][self.provider] = {
+                **packed.audit(),
+                "prompt_tokens": sum(count_tokens(part) for part in prompt_parts),
+                "tokenizer": get_token_counter().name,
+            }
 
 
 class OllamaLLMAdapter(LLMAdapter):
@@ -78,6 +161,17 @@ class OllamaLLMAdapter(LLMAdapter):
     Much better for Hindi/English and fully offline.
     """
     
+    provider = "ollama"
+    
+    HELPER_OPTIONS = {
+        "temperature": 0.4,  # Slightly higher for more helpful responses
+        "num_predict": 400,  # Allow more detailed steps (increased)
+        "top_p": 0.9,
+        "top_k": 40,
+        "repeat_penalty": 1.1,
+        "stop": ["Let me know", "let me know", "मुझे बताएं", "अगर आप", "if you'd like"],  # Stop at asking for more
+    }
+    
     def __init__(self, model_name: str = "mistral", base_url: str = "http://localhost:11434"):
         """
         Initialize Ollama adapter.
@@ -91,8 +185,7 @@ class OllamaLLMAdapter(LLMAdapter):
         
         # Test connection
         try:
-            import requests
-            response = requests.get(f"{base_url}/api/tags", timeout=2)
+            response = get_llm_client().http.get(f"{base_url}/api/tags", timeout=2)
             if response.status_code == 200:
                 models = response.json().get('models', [])
                 model_names = [m['name'] for m in models]
@@ -116,10 +209,80 @@ class OllamaLLMAdapter(LLMAdapter):
         retrieved_chunks: List[str],
     ) -> str:
         """Generate helper explanation using Ollama."""
-        import requests
+        full_prompt = self._build_prompt(parameter, language, user_message, retrieved_chunks)
+        
+        try:
+            result = get_llm_client().ollama_generate(
+                full_prompt,
+                model=self.model_name,
+                call_site="helper",
+                timeout=20,
+                options=self.HELPER_OPTIONS,
+                base_url=self.base_url,
+            )
+            return result.text
+        
+        except Exception as e:
+            print(f"✗ Ollama error: {e}")
+            return self._fallback_response(parameter, language)
+    
+    async def agenerate_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Generate helper explanation using Ollama (non-blocking)."""
+        full_prompt = self._build_prompt(parameter, language, user_message, retrieved_chunks)
+        
+        try:
+            result = await get_llm_client().aollama_generate(
+                full_prompt,
+                model=self.model_name,
+                call_site="helper",
+                timeout=20,
+                options=self.HELPER_OPTIONS,
+                base_url=self.base_url,
+            )
+            return result.text
+        
+        except Exception as e:
+            print(f"✗ Ollama error: {e}")
+            return self._fallback_response(parameter, language)
+    
+    async def astream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        """Stream helper explanation from Ollama token by token."""
+        full_prompt = self._build_prompt(parameter, language, user_message, retrieved_chunks)
         
-        # Build context from retrieved chunks
-        context = "\n\n".join(retrieved_chunks[:3])  # Use top 3 chunks
+        stream = get_llm_client().astream_ollama_generate(
+            full_prompt,
+            model=self.model_name,
+            call_site="helper.stream",
+            timeout=20,
+            options=self.HELPER_OPTIONS,
+            base_url=self.base_url,
+        )
+        async for text in _stream_or_fallback(stream, "Ollama", lambda: self._fallback_response(parameter, language)):
+            yield text
+    
+    def _build_prompt(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Build the step-by-step helper prompt."""
+        # Build context from the best chunks that fit the token budget
+        packed = self._pack_context(retrieved_chunks)
+        context = packed.text
         
         # Build structured prompt for step-by-step guidance
         param_names = {
@@ -180,43 +343,15 @@ To test {param_display}, follow ALL these steps:
 
 Step 1:"""
         
-        # Call Ollama API
-        try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": full_prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.4,  # Slightly higher for more helpful responses
-                        "num_predict": 400,  # Allow more detailed steps (increased)
-                        "top_p": 0.9,
-                        "top_k": 40,
-                        "repeat_penalty": 1.1,
-                        "stop": ["Let me know", "let me know", "मुझे बताएं", "अगर आप", "if you'd like"],  # Stop at asking for more
-                    }
-                },
-                timeout=20
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('response', '').strip()
-            else:
-                print(f"✗ Ollama API error: {response.status_code}")
-                return self._fallback_response(parameter, language)
-        
-        except Exception as e:
-            print(f"✗ Ollama error: {e}")
-            return self._fallback_response(parameter, language)
+        self._note_prompt(packed, full_prompt)
+        return full_prompt
     
     def _fallback_response(self, parameter: str, language: Language) -> str:
         """Fallback response if Ollama fails."""
         if language == "hi":
-            return f"किसान भाई, {parameter} की जांच के लिए कृपया विकल्पों में से चुनें या फिर से प्रयास करें।"
+            return FallbackText(f"किसान भाई, {parameter} की जांच के लिए कृपया विकल्पों में से चुनें या फिर से प्रयास करें।")
         else:
-            return f"Please select from the options or try again to test {parameter}."
+            return FallbackText(f"Please select from the options or try again to test {parameter}.")
 
 
 class GeminiLLMAdapter(LLMAdapter):
@@ -229,32 +364,25 @@ class GeminiLLMAdapter(LLMAdapter):
     Supports both old (google-generativeai) and new (google-genai) packages.
     """
     
-    def __init__(self, api_key: str, model_name: str = "gemini-2.5-flash"):
+    provider = "gemini"
+    
+    def __init__(self, api_key: Optional[str] = None, model_name: str = "gemini-2.5-flash"):
         """
         Initialize Gemini adapter.
         
         Args:
-            api_key: Gemini API key
+            api_key: Pin a Gemini API key (default: lease one per call from the "gemini" key pool)
             model_name: Model to use (e.g., "gemini-2.5-flash", "gemini-2.5-pro", "gemini-3-pro-preview")
         """
         self.api_key = api_key
         self.model_name = model_name
-        self.use_new_api = False
         
         try:
-            # Try new API first (google-genai package)
-            try:
-                from google import genai
-                self.client = genai.Client(api_key=api_key)
-                self.use_new_api = True
-                print(f"✓ Initialized Gemini adapter (new API) with model: {model_name}")
-            except ImportError:
-                # Fall back to old API (google-generativeai package)
-                import google.generativeai as genai
-                genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel(model_name)
-                self.use_new_api = False
-                print(f"✓ Initialized Gemini adapter (legacy API) with model: {model_name}")
+            # Shared SDK client (new google-genai API, else legacy google-generativeai)
+            client = get_llm_client().gemini_client(api_key or get_key_pool("gemini").keys[0].secret)
+            self.use_new_api = hasattr(client, "models")
+            api_name = "new API" if self.use_new_api else "legacy API"
+            print(f"✓ Initialized Gemini adapter ({api_name}) with model: {model_name}")
         except Exception as e:
             print(f"✗ Error initializing Gemini: {e}")
             raise
@@ -267,8 +395,51 @@ class GeminiLLMAdapter(LLMAdapter):
         retrieved_chunks: List[str],
     ) -> str:
         """Generate helper explanation using Gemini API."""
-        # Build context from retrieved chunks
-        context = "\n\n".join(retrieved_chunks)
+        full_prompt = self._build_prompt(parameter, language, user_message, retrieved_chunks)
+        
+        try:
+            result = get_llm_client().gemini_generate(full_prompt, **self._helper_kwargs())
+            return result.text
+        except Exception as e:
+            return self._error_response(parameter, language, e)
+    
+    async def agenerate_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Generate helper explanation using Gemini (SDK call on the blocking pool)."""
+        full_prompt = self._build_prompt(parameter, language, user_message, retrieved_chunks)
+        
+        try:
+            result = await get_llm_client().agemini_generate(full_prompt, **self._helper_kwargs())
+            return result.text
+        except Exception as e:
+            return self._error_response(parameter, language, e)
+    
+    def _helper_kwargs(self) -> dict:
+        return {
+            "api_key": self.api_key,
+            "model": self.model_name,
+            "call_site": "helper",
+            "temperature": 0.5,  # Lower for more consistent steps
+            "max_output_tokens": 1500,  # More tokens for detailed steps
+            "timeout": 30,
+        }
+    
+    def _build_prompt(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Build the Gemini helper prompt (system + context + user parts)."""
+        # Build context from the best chunks that fit the token budget
+        packed = self._pack_context(retrieved_chunks)
+        context = packed.text
         
         # Build system prompt based on language
         if language == "hi":
@@ -316,73 +487,26 @@ Context from knowledge base:
 
 {user_prompt}"""
         
-        try:
-            if self.use_new_api:
-                # Use new google-genai API
-                from google.genai import types
-                
-                contents = [
-                    types.Content(
-                        role="user",
-                        parts=[types.Part.from_text(text=full_prompt)],
-                    )
-                ]
-                
-                config = types.GenerateContentConfig(
-                    temperature=0.5,  # Lower for more consistent steps
-                    max_output_tokens=1500,  # More tokens for detailed steps
-                )
-                
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=contents,
-                    config=config,
-                )
-                # Handle response - new API returns different structure
-                # Try to get text directly first
-                try:
-                    if hasattr(response, 'text'):
-                        text = response.text
-                        if text:
-                            return text.strip()
-                except Exception as e:
-                    print(f"DEBUG: Could not get text directly: {e}")
-                
-                # Try to extract from candidates
-                if hasattr(response, 'candidates') and response.candidates:
-                    for candidate in response.candidates:
-                        if hasattr(candidate, 'content') and candidate.content:
-                            content = candidate.content
-                            if hasattr(content, 'parts') and content.parts:
-                                parts_text = []
-                                for part in content.parts:
-                                    if hasattr(part, 'text') and part.text:
-                                        parts_text.append(str(part.text))
-                                if parts_text:
-                                    return ' '.join(parts_text).strip()
-                
-                # If we can't extract text, raise an error to trigger fallback
-                raise ValueError(f"Could not extract text from response")
-            else:
-                # Use legacy google-generativeai API
-                response = self.model.generate_content(full_prompt)
-                return response.text.strip()
-        except Exception as e:
-            error_msg = str(e)
-            print(f"✗ Error calling Gemini API: {error_msg}")
-            
-            # Check for quota/rate limit errors
-            if "429" in error_msg or "quota" in error_msg.lower():
-                if language == "hi":
-                    return f"किसान भाई, API की सीमा पूरी हो गई है। कृपया कुछ देर बाद पुनः प्रयास करें।"
-                else:
-                    return f"API quota exceeded. Please try again later."
-            
-            # Fallback message
+        self._note_prompt(packed, full_prompt)
+        return full_prompt
+    
+    def _error_response(self, parameter: str, language: Language, e: Exception) -> str:
+        """User-facing message for a failed Gemini call."""
+        error_msg = str(e)
+        print(f"✗ Error calling Gemini API: {error_msg}")
+        
+        # Check for quota/rate limit errors
+        if "429" in error_msg or "quota" in error_msg.lower():
             if language == "hi":
-                return f"माफ करें, {parameter} के बारे में जानकारी प्राप्त करने में समस्या हुई। कृपया पुनः प्रयास करें।"
+                return FallbackText(f"किसान भाई, API की सीमा पूरी हो गई है। कृपया कुछ देर बाद पुनः प्रयास करें।")
             else:
-                return f"Sorry, there was an issue getting information about {parameter}. Please try again."
+                return FallbackText(f"API quota exceeded. Please try again later.")
+        
+        # Fallback message
+        if language == "hi":
+            return FallbackText(f"माफ करें, {parameter} के बारे में जानकारी प्राप्त करने में समस्या हुई। कृपया पुनः प्रयास करें।")
+        else:
+            return FallbackText(f"Sorry, there was an issue getting information about {parameter}. Please try again.")
 
 
 class GroqLLMAdapter(LLMAdapter):
@@ -393,17 +517,19 @@ class GroqLLMAdapter(LLMAdapter):
     Much faster than local models and suitable for production deployment.
     """
     
-    def __init__(self, api_key: str, model_name: str = "llama-3.3-70b-versatile"):
+    provider = "groq"
+    
+    def __init__(self, api_key: Optional[str] = None, model_name: str = "llama-3.3-70b-versatile"):
         """
         Initialize Groq adapter.
         
         Args:
-            api_key: Groq API key
+            api_key: Pin a Groq API key (default: lease one per call from the "groq" key pool)
             model_name: Model to use (llama-3.3-70b-versatile, mixtral-8x7b-32768, etc.)
         """
         self.api_key = api_key
         self.model_name = model_name
-        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
+        self.base_url = GROQ_CHAT_URL
         print(f"✓ Initialized Groq LLM adapter with model: {model_name}")
     
     def generate_helper(
@@ -414,10 +540,88 @@ class GroqLLMAdapter(LLMAdapter):
         retrieved_chunks: List[str],
     ) -> str:
         """Generate helper explanation using Groq API."""
-        import requests
+        system_prompt, user_prompt = self._build_prompt(parameter, language, user_message, retrieved_chunks)
         
-        # Build context from retrieved chunks
-        context = "\n\n".join(retrieved_chunks[:5])  # Use top 5 chunks
+        try:
+            result = get_llm_client().groq_chat(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                **self._helper_kwargs(),
+            )
+            return result.text
+        
+        except Exception as e:
+            print(f"✗ Groq error: {e}")
+            return self._fallback_response(parameter, language)
+    
+    async def agenerate_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Generate helper explanation using Groq API (non-blocking)."""
+        system_prompt, user_prompt = self._build_prompt(parameter, language, user_message, retrieved_chunks)
+        
+        try:
+            result = await get_llm_client().agroq_chat(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                **self._helper_kwargs(),
+            )
+            return result.text
+        
+        except Exception as e:
+            print(f"✗ Groq error: {e}")
+            return self._fallback_response(parameter, language)
+    
+    async def astream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        """Stream helper explanation from Groq token by token."""
+        system_prompt, user_prompt = self._build_prompt(parameter, language, user_message, retrieved_chunks)
+        
+        stream = get_llm_client().astream_groq_chat(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            **{**self._helper_kwargs(), "call_site": "helper.stream"},
+        )
+        async for text in _stream_or_fallback(stream, "Groq", lambda: self._fallback_response(parameter, language)):
+            yield text
+    
+    def _helper_kwargs(self) -> dict:
+        return {
+            "api_key": self.api_key,
+            "model": self.model_name,
+            "call_site": "helper",
+            "timeout": 30,
+            "temperature": 0.5,
+            "max_tokens": 1500,
+            "top_p": 0.9,
+        }
+    
+    def _build_prompt(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> Tuple[str, str]:
+        """Build the (system, user) helper prompts."""
+        # Build context from the best chunks that fit the token budget
+        packed = self._pack_context(retrieved_chunks)
+        context = packed.text
         
         # Build system prompt
         if language == "hi":
@@ -485,71 +689,29 @@ Provide clear, actionable steps. Do NOT add information not in the context.
 
 To test {parameter}:"""
         
-        try:
-            response = requests.post(
-                self.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model_name,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "temperature": 0.5,
-                    "max_tokens": 1500,
-                    "top_p": 0.9,
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"].strip()
-            else:
-                print(f"✗ Groq API error: {response.status_code} - {response.text}")
-                return self._fallback_response(parameter, language)
-        
-        except Exception as e:
-            print(f"✗ Groq error: {e}")
-            return self._fallback_response(parameter, language)
+        self._note_prompt(packed, system_prompt, user_prompt)
+        return system_prompt, user_prompt
     
     def _fallback_response(self, parameter: str, language: Language) -> str:
         """Fallback response if Groq fails."""
         if language == "hi":
-            return f"किसान भाई, {parameter} की जांच के लिए कृपया विकल्पों में से चुनें या फिर से प्रयास करें।"
+            return FallbackText(f"किसान भाई, {parameter} की जांच के लिए कृपया विकल्पों में से चुनें या फिर से प्रयास करें।")
         else:
-            return f"Please select from the options or try again to test {parameter}."
+            return FallbackText(f"Please select from the options or try again to test {parameter}.")
     
     def generate_sync(self, prompt: str, temperature: float = 0.3) -> str:
         """Generate text synchronously using Groq API."""
-        import requests
-        
         try:
-            response = requests.post(
-                self.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model_name,
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": temperature,
-                    "max_tokens": 2000,
-                },
-                timeout=60
+            result = get_llm_client().groq_chat(
+                [{"role": "user", "content": prompt}],
+                api_key=self.api_key,
+                model=self.model_name,
+                call_site="generate",
+                timeout=60,
+                temperature=temperature,
+                max_tokens=2000,
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"].strip()
-            else:
-                raise Exception(f"Groq API error: {response.status_code}")
+            return result.text
         
         except Exception as e:
             print(f"✗ Groq generation error: {e}")
@@ -557,70 +719,494 @@ To test {parameter}:"""
     
     async def generate_async(self, prompt: str, temperature: float = 0.3) -> str:
         """Generate text asynchronously using Groq API."""
-        import httpx
-        
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model_name,
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": temperature,
-                        "max_tokens": 2000,
-                    }
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return result["choices"][0]["message"]["content"].strip()
-                else:
-                    raise Exception(f"Groq API error: {response.status_code}")
+            result = await get_llm_client().agroq_chat(
+                [{"role": "user", "content": prompt}],
+                api_key=self.api_key,
+                model=self.model_name,
+                call_site="generate",
+                timeout=60,
+                temperature=temperature,
+                max_tokens=2000,
+            )
+            return result.text
         
         except Exception as e:
             print(f"✗ Groq async generation error: {e}")
             raise
 
 
+class HedgedLLMAdapter(LLMAdapter):
+    """
+    Helper texts from an ordered list of providers, hedged on latency.
+    
+    The first provider is asked first. When it has not answered within its
+    p95 latency (time to first token when streaming), or has failed, the
+    next provider is asked as well; the first good answer (not a
+    FallbackText) wins and the calls still running are cancelled. With no
+    good answer within `budget_seconds`, the canned fallback is returned.
+    
+    Every provider call runs under what is left of the budget as its
+    deadline (`set_call_deadline`), so request timeouts, key pool waits and
+    retries end with the budget. The sync path runs the provider calls on
+    threads of its own; a losing call there can't be cancelled and runs
+    on until that deadline. Report generation fails over in order, without
+    hedging.
+    """
+    
+    def __init__(
+        self,
+        adapters: List[Tuple[str, LLMAdapter]],
+        budget_seconds: float,
+        default_delay_seconds: float,
+    ):
+        """
+        Args:
+            adapters: (provider name, adapter) pairs in preference order
+            budget_seconds: Longest a helper call waits for a good answer
+            default_delay_seconds: Hedge delay until a provider has latency history
+        """
+        self.adapters = adapters
+        self.budget_seconds = budget_seconds
+        self.default_delay_seconds = default_delay_seconds
+        self.model_name = ">".join(f"{name}:{getattr(adapter, 'model_name', '')}" for name, adapter in adapters)
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}  # (provider, "full" | "first_token") -> seconds
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4 * len(adapters), thread_name_prefix="llm-hedge")
+        print(f"✓ Helper failover order: {' → '.join(name for name, _ in adapters)} (budget {budget_seconds:.0f}s)")
+    
+    def _observe(self, name: str, kind: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault((name, kind), deque(maxlen=LATENCY_WINDOW)).append(seconds)
+    
+    def _hedge_delay(self, name: str, kind: str) -> float:
+        """Seconds to wait on a provider before asking the next one: its p95."""
+        with self._lock:
+            samples = sorted(self._latencies.get((name, kind), ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return self.default_delay_seconds
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+    
+    @staticmethod
+    def _good(text: Optional[str]) -> bool:
+        return bool(text and text.strip()) and not isinstance(text, FallbackText)
+    
+    @staticmethod
+    def _result(name: str, call: Any) -> Optional[str]:
+        """Text of a finished call (asyncio.Task or Future); None if it raised."""
+        try:
+            return call.result()
+        except Exception as e:
+            print(f"✗ {name} helper error: {e}")
+            return None
+    
+    def _answered(self, name: str, asked: List[str], elapsed: float) -> None:
+        if len(asked) > 1:
+            print(f"⚠ Helper answered by {name} after asking {', '.join(asked)} ({elapsed:.1f}s)")
+        helper_route.set({"provider": name, "asked": list(asked), "latency_ms": round(elapsed * 1000, 1)})
+    
+    def _give_up(
+        self,
+        parameter: str,
+        language: Language,
+        asked: List[str],
+        elapsed: float,
+        fallback: Optional[str],
+    ) -> str:
+        print(f"✗ No provider answered the {parameter} helper within {elapsed:.1f}s (asked {', '.join(asked)})")
+        helper_route.set({"provider": None, "asked": list(asked), "latency_ms": round(elapsed * 1000, 1)})
+        return fallback or self._fallback_response(parameter, language)
+    
+    def generate_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Hedged helper text (provider calls on the adapter's threads)."""
+        def call(name: str, adapter: LLMAdapter) -> str:
+            call_started = time.monotonic()
+            set_call_deadline(deadline - call_started)
+            text = adapter.generate_helper(parameter, language, user_message, retrieved_chunks)
+            if self._good(text):
+                self._observe(name, "full", time.monotonic() - call_started)
+            return text
+        
+        started = time.monotonic()
+        deadline = started + self.budget_seconds
+        hedge_at = deadline
+        pending: Dict[Future, str] = {}
+        asked: List[str] = []
+        fallback: Optional[str] = None
+        try:
+            while True:
+                if len(asked) < len(self.adapters) and (not pending or time.monotonic() >= hedge_at):
+                    name, adapter = self.adapters[len(asked)]
+                    asked.append(name)
+                    # A context copy per call: the turn's usage tracking reaches provider threads
+                    pending[self._executor.submit(copy_context().run, call, name, adapter)] = name
+                    hedge_at = time.monotonic() + self._hedge_delay(name, "full")
+                if not pending:
+                    break
+                
+                wake = min(hedge_at, deadline) if len(asked) < len(self.adapters) else deadline
+                done, _ = wait(pending, timeout=max(0.0, wake - time.monotonic()), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    text = self._result(name, future)
+                    if self._good(text):
+                        self._answered(name, asked, time.monotonic() - started)
+                        return text
+                    fallback = fallback or text
+                    hedge_at = time.monotonic()  # Failed: ask the next provider now
+                if time.monotonic() >= deadline:
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+        
+        return self._give_up(parameter, language, asked, time.monotonic() - started, fallback)
+    
+    async def agenerate_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Hedged helper text; losing calls are cancelled."""
+        loop = asyncio.get_running_loop()
+        
+        async def call(name: str, adapter: LLMAdapter) -> str:
+            call_started = loop.time()
+            set_call_deadline(deadline - call_started)  # The task's own context
+            text = await adapter.agenerate_helper(parameter, language, user_message, retrieved_chunks)
+            if self._good(text):
+                self._observe(name, "full", loop.time() - call_started)
+            return text
+        
+        started = loop.time()
+        deadline = started + self.budget_seconds
+        hedge_at = deadline
+        pending: Dict["asyncio.Task[str]", str] = {}
+        asked: List[str] = []
+        fallback: Optional[str] = None
+        try:
+            while True:
+                if len(asked) < len(self.adapters) and (not pending or loop.time() >= hedge_at):
+                    name, adapter = self.adapters[len(asked)]
+                    asked.append(name)
+                    pending[loop.create_task(call(name, adapter))] = name
+                    hedge_at = loop.time() + self._hedge_delay(name, "full")
+                if not pending:
+                    break
+                
+                wake = min(hedge_at, deadline) if len(asked) < len(self.adapters) else deadline
+                done, _ = await asyncio.wait(
+                    pending, timeout=max(0.0, wake - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    name = pending.pop(task)
+                    text = self._result(name, task)
+                    if self._good(text):
+                        self._answered(name, asked, loop.time() - started)
+                        return text
+                    fallback = fallback or text
+                    hedge_at = loop.time()  # Failed: ask the next provider now
+                if loop.time() >= deadline:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        return self._give_up(parameter, language, asked, loop.time() - started, fallback)
+    
+    async def astream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        """
+        Hedged helper stream: hedges on time to first token, then streams
+        only from the provider that produced the first good piece.
+        """
+        loop = asyncio.get_running_loop()
+        pieces: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue()
+        end = object()  # Queued by a pump when its stream is over
+        
+        async def pump(name: str, adapter: LLMAdapter) -> None:
+            call_started = loop.time()
+            set_call_deadline(deadline - call_started)  # The task's own context
+            first = True
+            stream = adapter.astream_helper(parameter, language, user_message, retrieved_chunks)
+            try:
+                async for piece in stream:
+                    if first and self._good(piece):
+                        self._observe(name, "first_token", loop.time() - call_started)
+                        first = False
+                    pieces.put_nowait((name, piece))
+            except Exception as e:
+                print(f"✗ {name} helper stream error: {e}")
+            finally:
+                pieces.put_nowait((name, end))
+                await stream.aclose()
+        
+        started = loop.time()
+        deadline = started + self.budget_seconds
+        hedge_at = deadline
+        pumps: Dict[str, "asyncio.Task[None]"] = {}
+        asked: List[str] = []
+        fallback: Optional[str] = None
+        try:
+            winner: Optional[str] = None
+            while winner is None:
+                if len(asked) < len(self.adapters) and (not pumps or loop.time() >= hedge_at):
+                    name, adapter = self.adapters[len(asked)]
+                    asked.append(name)
+                    pumps[name] = loop.create_task(pump(name, adapter))
+                    hedge_at = loop.time() + self._hedge_delay(name, "first_token")
+                if not pumps:
+                    break
+                
+                wake = min(hedge_at, deadline) if len(asked) < len(self.adapters) else deadline
+                try:
+                    name, piece = await asyncio.wait_for(pieces.get(), timeout=max(0.0, wake - loop.time()))
+                except asyncio.TimeoutError:
+                    if loop.time() >= deadline:
+                        break
+                    continue
+                
+                if piece is end:
+                    pumps.pop(name, None)
+                    hedge_at = loop.time()  # Ended without a good piece: ask the next provider now
+                elif self._good(piece):
+                    winner = name
+                    for other, task in pumps.items():
+                        if other != winner:
+                            task.cancel()
+                    self._answered(name, asked, loop.time() - started)
+                    yield piece
+                elif isinstance(piece, FallbackText):
+                    fallback = fallback or piece
+            
+            if winner is None:
+                yield self._give_up(parameter, language, asked, loop.time() - started, fallback)
+                return
+            
+            while True:
+                name, piece = await pieces.get()
+                if name != winner:
+                    continue  # Leftovers of a cancelled provider
+                if piece is end:
+                    break
+                yield piece
+        finally:
+            for task in pumps.values():
+                task.cancel()
+    
+    def generate_sync(self, prompt: str, temperature: float = 0.3) -> str:
+        """Report text from the first provider that doesn't fail."""
+        error: Optional[Exception] = None
+        for name, adapter in self.adapters:
+            try:
+                return adapter.generate_sync(prompt, temperature)
+            except Exception as e:
+                print(f"⚠ {name} generation failed, trying the next provider: {e}")
+                error = e
+        raise error
+    
+    async def generate_async(self, prompt: str, temperature: float = 0.3) -> str:
+        """Async `generate_sync`."""
+        error: Optional[Exception] = None
+        for name, adapter in self.adapters:
+            try:
+                return await adapter.generate_async(prompt, temperature)
+            except Exception as e:
+                print(f"⚠ {name} generation failed, trying the next provider: {e}")
+                error = e
+        raise error
+    
+    def _fallback_response(self, parameter: str, language: Language) -> str:
+        """Fallback response if no provider answers in time."""
+        if language == "hi":
+            return FallbackText(f"किसान भाई, {parameter} की जांच के लिए कृपया विकल्पों में से चुनें या फिर से प्रयास करें।")
+        else:
+            return FallbackText(f"Please select from the options or try again to test {parameter}.")
+
+
+class CachedLLMAdapter(LLMAdapter):
+    """
+    Helper response cache in front of any adapter (see helper_cache.py).
+    
+    Helper calls are served from the cache when possible; everything else
+    (report generation, attributes such as model_name) goes to the wrapped
+    adapter.
+    """
+    
+    def __init__(self, adapter: LLMAdapter, cache: HelperCache):
+        self.adapter = adapter
+        self.cache = cache
+        self.namespace = f"{type(adapter).__name__}:{getattr(adapter, 'model_name', '')}"
+    
+    def __getattr__(self, name):
+        return getattr(self.adapter, name)
+    
+    def _lookup(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> Tuple[bytes, Optional[str]]:
+        key = helper_cache_key(self.namespace, parameter, language, user_message, retrieved_chunks)
+        text, status = self.cache.get(key)
+        helper_cache_status.set(status)
+        return key, text
+    
+    def _store(self, key: bytes, text: str) -> None:
+        if text and not isinstance(text, FallbackText):
+            self.cache.put(key, text)
+    
+    def generate_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        key, text = self._lookup(parameter, language, user_message, retrieved_chunks)
+        if text is None:
+            text = self.adapter.generate_helper(parameter, language, user_message, retrieved_chunks)
+            self._store(key, text)
+        return text
+    
+    async def agenerate_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        key, text = self._lookup(parameter, language, user_message, retrieved_chunks)
+        if text is None:
+            text = await self.adapter.agenerate_helper(parameter, language, user_message, retrieved_chunks)
+            self._store(key, text)
+        return text
+    
+    async def astream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        key, text = self._lookup(parameter, language, user_message, retrieved_chunks)
+        if text is not None:
+            yield text  # A hit arrives in one piece
+            return
+        
+        parts = []
+        complete = True
+        async for piece in self.adapter.astream_helper(parameter, language, user_message, retrieved_chunks):
+            complete = complete and not isinstance(piece, FallbackText)
+            parts.append(piece)
+            yield piece
+        if complete:
+            self._store(key, "".join(parts).strip())
+    
+    def generate_sync(self, prompt: str, temperature: float = 0.3) -> str:
+        return self.adapter.generate_sync(prompt, temperature)
+    
+    async def generate_async(self, prompt: str, temperature: float = 0.3) -> str:
+        return await self.adapter.generate_async(prompt, temperature)
+
+
+async def _stream_or_fallback(
+    stream: AsyncIterator[str],
+    provider: str,
+    fallback: Callable[[], str],
+) -> AsyncIterator[str]:
+    """
+    Pass a token stream through; if it fails before the first token, yield
+    the fallback text instead. A failure mid-stream ends the stream (what
+    was already sent stays).
+    """
+    started = False
+    try:
+        async for text in stream:
+            started = True
+            yield text
+    except Exception as e:
+        print(f"✗ {provider} stream error: {e}")
+        # Either way the text is not a complete answer: mark it so it isn't cached
+        yield fallback() if not started else FallbackText("")
+
+
 def create_llm_adapter() -> LLMAdapter:
     """
     Factory function to create appropriate LLM adapter based on config.
     
     Returns:
-        LLMAdapter instance (Groq, Gemini, Ollama, or Local)
+        LLMAdapter instance (Groq, Gemini, Ollama, or Local) - or, with
+        `llm_failover_providers` set, a HedgedLLMAdapter over
+        `llm_provider` and those - behind the helper response cache unless
+        `helper_cache_enabled` is off
     """
-    if settings.llm_provider == "groq":
+    adapter = _create_provider_adapter(settings.llm_provider)
+    if settings.llm_failover_providers:
+        adapter = _create_hedged_adapter(adapter)
+    if settings.helper_cache_enabled:
+        return CachedLLMAdapter(adapter, get_helper_cache())
+    return adapter
+
+
+def _create_hedged_adapter(primary: LLMAdapter) -> LLMAdapter:
+    """`primary` followed by the failover providers that can be set up."""
+    adapters = [(settings.llm_provider, primary)]
+    for provider in settings.llm_failover_providers:
+        if any(provider == name for name, _ in adapters):
+            continue
+        try:
+            adapters.append((provider, _create_provider_adapter(provider)))
+        except (ValueError, NotImplementedError) as e:
+            print(f"⚠ Failover provider {provider} skipped: {e}")
+    
+    if len(adapters) == 1:
+        return primary
+    return HedgedLLMAdapter(
+        adapters,
+        budget_seconds=settings.llm_hedge_budget_seconds,
+        default_delay_seconds=settings.llm_hedge_default_delay_seconds,
+    )
+
+
+def _create_provider_adapter(provider: str) -> LLMAdapter:
+    """The bare adapter for a provider name (see `llm_provider`)."""
+    if provider == "groq":
         # Use Groq (fast cloud LLM)
-        if not settings.groq_llm_api_key:
-            raise ValueError("GROQ_LLM_API_KEY not set in environment")
-        return GroqLLMAdapter(
-            api_key=settings.groq_llm_api_key,
-            model_name=settings.groq_llm_model
-        )
+        # Keys come from the pool (GROQ_LLM_API_KEY, GROQ_REPORT_API_KEY, GROQ_API_KEY)
+        if not len(get_key_pool("groq")):
+            raise ValueError("No Groq API key set in environment (GROQ_LLM_API_KEY)")
+        return GroqLLMAdapter(model_name=settings.groq_llm_model)
     
-    elif settings.llm_provider == "ollama":
+    elif provider == "ollama":
         # Use Ollama (local LLM)
         model_name = getattr(settings, 'ollama_model_name', 'mistral')
         return OllamaLLMAdapter(model_name=model_name)
     
-    elif settings.llm_provider == "gemini":
-        if not settings.gemini_api_key:
-            raise ValueError("GEMINI_API_KEY not set in environment")
-        return GeminiLLMAdapter(
-            api_key=settings.gemini_api_key,
-            model_name=settings.gemini_model_name
-        )
+    elif provider == "gemini":
+        # Keys come from the pool (GEMINI_API_KEY, GEMINI_API_KEY_1, GEMINI_API_KEY_2)
+        if not len(get_key_pool("gemini")):
+            raise ValueError("No Gemini API key set in environment (GEMINI_API_KEY)")
+        return GeminiLLMAdapter(model_name=settings.gemini_model_name)
     
-    elif settings.llm_provider == "local":
+    elif provider == "local":
         # Future: llama.cpp or other local implementations
         raise NotImplementedError("Local LLM adapter not yet implemented. Use 'ollama' instead.")
     
     else:
-        raise ValueError(f"Unknown LLM provider: {settings.llm_provider}")
+        raise ValueError(f"Unknown LLM provider: {provider}")
 
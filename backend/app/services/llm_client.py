@@ -0,0 +1,1021 @@
+"""
+Shared LLM client layer for every provider and call site.
+
+Intent classification, answer extraction, the helper adapters and the
+report agents all send their requests through one `LLMClient`:
+- Persistent keep-alive connection pools (one sync, one async httpx
+  client per process), HTTP/2 where the server supports it - so a turn
+  doesn't pay a TCP + TLS handshake per LLM call
+- One Gemini SDK client per API key (instead of one per call); the legacy
+  google-generativeai SDK is configured module-wide, so its calls run one
+  at a time with their own key (`LegacyGeminiClient`)
+- Groq and Gemini keys leased per attempt from the rate-limited key pool
+  (key_pool.py) unless the caller pins one - so a retry after a 429 moves
+  to another key
+- Uniform timeouts and retries (connection errors, 429 and 5xx, with
+  exponential backoff that honours Retry-After; a read/write timeout is
+  not retried, so a stalled call costs one timeout)
+- Coalescing of identical in-flight requests (singleflight.py): concurrent
+  callers with the same request fingerprint share one upstream call
+- A circuit breaker per provider endpoint (circuit_breaker.py): while an
+  endpoint keeps failing, calls to it raise LLMError at once instead of
+  waiting for their timeouts
+- Per-call-site metrics: calls, errors, retries, latency percentiles,
+  time to first token for streamed calls and prompt/completion tokens
+  (served on /health under "llm"), plus the same tokens per turn while
+  the orchestrator tracks one (`track_turn_usage`, for the audit)
+- Streaming (`astream_*`) for the SSE helper endpoint
+
+Call sites name themselves ("intent", "extraction", "helper", "report.soil", ...)
+so the metrics show where time and tokens go.
+
+To modify:
+- Timeouts / retries / pool size: `llm_*` settings in config.py
+- Coalescing: `llm_coalesce_enabled`
+- Circuit breakers: `circuit_breaker_*`
+- Add a provider: add a `<provider>_...` method that builds the request
+  and parses the result into an LLMResult, and route it through `_call`/`_acall`
+  with an endpoint name for its circuit breaker
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+import httpx
+from pydantic import BaseModel
+from ..config import settings
+from .blocking_pool import run_blocking
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .circuit_breaker import CircuitBreaker, CircuitOpen, circuit_breaker_stats, get_circuit_breaker
+from .key_pool import KeyLease, KeyPoolExhausted, estimate_tokens, get_key_pool, key_pool_stats
+
+
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+OLLAMA_URL = "http://localhost:11434"
+
+# Latency samples kept per call site for percentiles
+LATENCY_WINDOW = 512
+
+# LLM usage of the current turn, while one is tracked (see `track_turn_usage`)
+_turn_usage: ContextVar[Optional[Dict[str, Any]]] = ContextVar("turn_usage", default=None)
+
+# time.monotonic() by which calls from this context must end (see `set_call_deadline`)
+_call_deadline: ContextVar[Optional[float]] = ContextVar("call_deadline", default=None)
+
+
+class LLMError(Exception):
+    """An LLM call failed (after retries, if it was retryable)."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retryable: bool = False,
+        retry_after: Optional[str] = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after  # Retry-After header, if the server sent one
+
+
+class LLMResult(BaseModel):
+    """Text and usage of one LLM call."""
+    text: str
+    provider: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    attempts: int = 1
+
+
+class CallSiteMetrics:
+    """Counters for one call site (not thread-safe on its own - LLMClient locks)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.coalesced = 0  # Callers served by another caller's in-flight request
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latencies_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.first_token_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)  # Streaming calls only
+
+    def to_dict(self) -> Dict[str, Any]:
+        def percentile(samples: Deque[float], p: float) -> float:
+            ordered = sorted(samples)
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1) if ordered else 0.0
+
+        stats = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "coalesced": self.coalesced,
+            "latency_ms_p50": percentile(self.latencies_ms, 0.50),
+            "latency_ms_p95": percentile(self.latencies_ms, 0.95),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+        if self.first_token_ms:
+            stats["first_token_ms_p50"] = percentile(self.first_token_ms, 0.50)
+            stats["first_token_ms_p95"] = percentile(self.first_token_ms, 0.95)
+        return stats
+
+
+def _http2_available() -> bool:
+    if not settings.llm_http2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _status_error(provider: str, response: httpx.Response) -> LLMError:
+    """LLMError for a non-200 response (429 and 5xx are retryable)."""
+    status = response.status_code
+    return LLMError(
+        f"{provider} API error: {status} - {response.text[:200]}",
+        status_code=status,
+        retryable=status == 429 or status >= 500,
+        retry_after=response.headers.get("retry-after"),
+    )
+
+
+def _transport_error(error: httpx.TransportError) -> LLMError:
+    """
+    LLMError for a connection-level failure.
+
+    Only failures to get a connection are retried: after a read/write
+    timeout the server was already working on the request, and a retry
+    would wait out the caller's timeout again.
+    """
+    retryable = isinstance(error, httpx.ConnectTimeout) or not isinstance(error, httpx.TimeoutException)
+    return LLMError(f"{type(error).__name__}: {error}", retryable=retryable)
+
+
+def _within_deadline(timeout: Optional[float]) -> Optional[float]:
+    """A call's timeout cut to what is left of the context's deadline (None: no limit set)."""
+    deadline = _call_deadline.get()
+    if deadline is None:
+        return timeout
+    remaining = max(0.001, deadline - time.monotonic())
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def _can_wait(delay: float) -> bool:
+    """Whether a retry after `delay` seconds still starts before the context's deadline."""
+    deadline = _call_deadline.get()
+    return deadline is None or time.monotonic() + delay < deadline
+
+
+def _retry_delay(attempt: int, error: LLMError) -> float:
+    """Exponential backoff, or the server's Retry-After (both capped)."""
+    delay = settings.llm_retry_backoff_seconds * (2 ** attempt)
+    if error.retry_after:
+        try:
+            delay = max(delay, float(error.retry_after))
+        except ValueError:
+            pass
+    return min(delay, settings.llm_retry_max_wait_seconds)
+
+
+def _fingerprint(provider: str, model: str, api_key: Optional[str], request: Any) -> str:
+    """Identity of an LLM request for coalescing (provider, model, key, body)."""
+    material = json.dumps([provider, model, api_key or "", request], sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _message_text(messages: List[Any]) -> str:
+    """Concatenated content of chat messages (dicts or langchain messages), for token estimates."""
+    return "".join(
+        str(message.get("content", "") if isinstance(message, dict) else getattr(message, "content", ""))
+        for message in messages
+    )
+
+
+def _gemini_text(response: Any) -> str:
+    """Text of a google-genai response (falls back to walking the candidates)."""
+    try:
+        text = getattr(response, "text", None)
+        if text:
+            return text.strip()
+    except Exception:
+        pass
+
+    parts_text = []
+    for candidate in getattr(response, "candidates", None) or []:
+        content = getattr(candidate, "content", None)
+        for part in getattr(content, "parts", None) or []:
+            if getattr(part, "text", None):
+                parts_text.append(str(part.text))
+    if parts_text:
+        return " ".join(parts_text).strip()
+    raise LLMError("Could not extract text from Gemini response")
+
+
+class LLMClient:
+    """Pooled HTTP clients plus retry and metrics wrappers for LLM calls."""
+
+    def __init__(self):
+        self.http2 = _http2_available()
+        self._timeout = httpx.Timeout(settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds)
+        self._limits = httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_connections,
+            keepalive_expiry=settings.llm_keepalive_seconds,
+        )
+        self.http = httpx.Client(http2=self.http2, timeout=self._timeout, limits=self._limits)
+
+        # Async client is bound to the event loop it first runs on
+        self._async_http: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._gemini_clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, CallSiteMetrics] = {}
+        self._flights = SingleFlight()
+        self._async_flights = AsyncSingleFlight()
+
+    @property
+    def async_http(self) -> httpx.AsyncClient:
+        """The pooled async client for the running event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._lock:
+            if self._async_http is None or (self._async_loop is not None and loop not in (None, self._async_loop)):
+                self._async_http = httpx.AsyncClient(http2=self.http2, timeout=self._timeout, limits=self._limits)
+                self._async_loop = loop
+            elif self._async_loop is None:
+                self._async_loop = loop  # Created outside a loop (e.g. in __init__); bind on first use
+            return self._async_http
+
+    async def aclose(self) -> None:
+        """Close pooled connections (app shutdown)."""
+        self.http.close()
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+
+    # ---- Metrics ----
+
+    def _record(
+        self,
+        call_site: str,
+        result: Optional[LLMResult],
+        attempts: int,
+        elapsed_ms: float,
+        first_token_ms: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            metrics = self._metrics.setdefault(call_site, CallSiteMetrics())
+            metrics.calls += 1
+            metrics.retries += attempts - 1
+            metrics.latencies_ms.append(elapsed_ms)
+            if first_token_ms is not None:
+                metrics.first_token_ms.append(first_token_ms)
+            if result is None:
+                metrics.errors += 1
+            else:
+                metrics.prompt_tokens += result.prompt_tokens
+                metrics.completion_tokens += result.completion_tokens
+
+            usage = _turn_usage.get()
+            if usage is not None and result is not None:
+                turn = usage["calls"].setdefault(call_site, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+                turn["calls"] += 1
+                turn["prompt_tokens"] += result.prompt_tokens
+                turn["completion_tokens"] += result.completion_tokens
+
+    def _record_coalesced(self, call_site: str) -> None:
+        with self._lock:
+            self._metrics.setdefault(call_site, CallSiteMetrics()).coalesced += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-call-site metrics plus pool settings."""
+        with self._lock:
+            call_sites = {name: metrics.to_dict() for name, metrics in sorted(self._metrics.items())}
+        return {
+            "http2": self.http2,
+            "max_connections": settings.llm_max_connections,
+            "in_flight_coalescing": self._flights.in_flight() + self._async_flights.in_flight(),
+            "key_pools": key_pool_stats(),
+            "circuit_breakers": circuit_breaker_stats(),
+            "call_sites": call_sites,
+        }
+
+    def _request_timeout(self, timeout: Optional[float]) -> Any:
+        """httpx timeout of one attempt: the caller's (or the default), within the context's deadline."""
+        return _within_deadline(timeout) or self._timeout
+
+    # ---- Retry wrappers ----
+
+    def _call(
+        self,
+        call_site: str,
+        endpoint: str,
+        send: Callable[[], LLMResult],
+        retries: Optional[int],
+        fingerprint: Optional[str] = None,
+    ) -> LLMResult:
+        """
+        Run `send` with retries, recording latency and tokens.
+
+        `endpoint` names the circuit breaker ("groq.chat", ...).
+
+        With a fingerprint, concurrent calls for the same request share one
+        upstream call (each caller gets its own copy of the result).
+        """
+        if fingerprint is None or not settings.llm_coalesce_enabled:
+            return self._send_with_retries(call_site, endpoint, send, retries)
+
+        result = self._flights.do(
+            fingerprint,
+            lambda: self._send_with_retries(call_site, endpoint, send, retries),
+            on_shared=lambda: self._record_coalesced(call_site),
+        )
+        return result.model_copy()
+
+    def _send_with_retries(
+        self,
+        call_site: str,
+        endpoint: str,
+        send: Callable[[], LLMResult],
+        retries: Optional[int],
+    ) -> LLMResult:
+        breaker = self._admit(endpoint)
+        retries = settings.llm_max_retries if retries is None else retries
+        start = time.perf_counter()
+        attempt = 0
+        outcome: Optional[BaseException] = None
+        try:
+            while True:
+                try:
+                    result = send()
+                    break
+                except (httpx.TransportError, LLMError) as e:
+                    error = e if isinstance(e, LLMError) else _transport_error(e)
+                    delay = _retry_delay(attempt, error)
+                    if not error.retryable or attempt >= retries or not _can_wait(delay):
+                        self._record(call_site, None, attempt + 1, (time.perf_counter() - start) * 1000)
+                        raise error from e
+                    time.sleep(delay)
+                    attempt += 1
+        except BaseException as e:
+            outcome = e
+            raise
+        finally:
+            self._settle(breaker, outcome)
+
+        result.latency_ms = (time.perf_counter() - start) * 1000
+        result.attempts = attempt + 1
+        self._record(call_site, result, result.attempts, result.latency_ms)
+        return result
+
+    async def _acall(
+        self,
+        call_site: str,
+        endpoint: str,
+        send: Callable[[], Awaitable[LLMResult]],
+        retries: Optional[int],
+        fingerprint: Optional[str] = None,
+    ) -> LLMResult:
+        """Async `_call`."""
+        if fingerprint is None or not settings.llm_coalesce_enabled:
+            return await self._asend_with_retries(call_site, endpoint, send, retries)
+
+        result = await self._async_flights.do(
+            fingerprint,
+            lambda: self._asend_with_retries(call_site, endpoint, send, retries),
+            on_shared=lambda: self._record_coalesced(call_site),
+        )
+        return result.model_copy()
+
+    async def _asend_with_retries(
+        self,
+        call_site: str,
+        endpoint: str,
+        send: Callable[[], Awaitable[LLMResult]],
+        retries: Optional[int],
+    ) -> LLMResult:
+        breaker = self._admit(endpoint)
+        retries = settings.llm_max_retries if retries is None else retries
+        start = time.perf_counter()
+        attempt = 0
+        outcome: Optional[BaseException] = None
+        try:
+            while True:
+                try:
+                    result = await send()
+                    break
+                except (httpx.TransportError, LLMError) as e:
+                    error = e if isinstance(e, LLMError) else _transport_error(e)
+                    delay = _retry_delay(attempt, error)
+                    if not error.retryable or attempt >= retries or not _can_wait(delay):
+                        self._record(call_site, None, attempt + 1, (time.perf_counter() - start) * 1000)
+                        raise error from e
+                    await asyncio.sleep(delay)
+                    attempt += 1
+        except BaseException as e:
+            outcome = e
+            raise
+        finally:
+            self._settle(breaker, outcome)
+
+        result.latency_ms = (time.perf_counter() - start) * 1000
+        result.attempts = attempt + 1
+        self._record(call_site, result, result.attempts, result.latency_ms)
+        return result
+
+    # ---- Circuit breakers ----
+
+    @staticmethod
+    def _admit(endpoint: str) -> Optional[CircuitBreaker]:
+        """The endpoint's breaker, after it let this call through (LLMError if it is open)."""
+        breaker = get_circuit_breaker(endpoint)
+        if breaker is not None:
+            try:
+                breaker.admit()
+            except CircuitOpen as e:
+                raise LLMError(str(e), status_code=503) from e
+        return breaker
+
+    @staticmethod
+    def _settle(breaker: Optional[CircuitBreaker], error: Optional[BaseException]) -> None:
+        """Report a call's outcome: errors and timeouts count against the endpoint, bad requests don't."""
+        if breaker is None:
+            return
+        if error is None:
+            breaker.success()
+        elif isinstance(error, LLMError) and (error.retryable or error.status_code is None):
+            breaker.failure()
+        else:
+            breaker.release()  # Cancelled, 4xx, key pool exhausted...
+
+    # ---- Key pool ----
+
+    @staticmethod
+    def _lease(pool: str, tokens: int, max_wait: Optional[float] = None) -> KeyLease:
+        try:
+            return get_key_pool(pool).acquire(tokens, _within_deadline(max_wait))
+        except KeyPoolExhausted as e:
+            raise LLMError(str(e), status_code=429) from e
+
+    @staticmethod
+    async def _alease(pool: str, tokens: int, max_wait: Optional[float] = None) -> KeyLease:
+        try:
+            return await get_key_pool(pool).aacquire(tokens, _within_deadline(max_wait))
+        except KeyPoolExhausted as e:
+            raise LLMError(str(e), status_code=429) from e
+
+    @staticmethod
+    def _finish_failed(lease: KeyLease, error: BaseException) -> None:
+        lease.finish(error=error)
+        if isinstance(error, LLMError):
+            # The pool now keeps this key cooling down for Retry-After; the
+            # retry takes another key after the normal backoff
+            error.retry_after = None
+
+    def _with_key(
+        self,
+        pool: str,
+        api_key: Optional[str],
+        tokens: int,
+        send: Callable[[str], LLMResult],
+        max_wait: Optional[float] = None,
+    ) -> LLMResult:
+        """
+        Run `send` with the pinned key, or with a key leased from the pool for this attempt.
+
+        `max_wait` bounds the wait for a key (the call's timeout, so a caller
+        with a short budget isn't queued for `key_pool_max_wait_seconds`).
+        """
+        if api_key:
+            return send(api_key)
+        lease = self._lease(pool, tokens, max_wait)
+        try:
+            result = send(lease.key)
+        except BaseException as e:
+            self._finish_failed(lease, e)
+            raise
+        lease.finish(result.prompt_tokens + result.completion_tokens)
+        return result
+
+    async def _awith_key(
+        self,
+        pool: str,
+        api_key: Optional[str],
+        tokens: int,
+        send: Callable[[str], Awaitable[LLMResult]],
+        max_wait: Optional[float] = None,
+    ) -> LLMResult:
+        """Async `_with_key`."""
+        if api_key:
+            return await send(api_key)
+        lease = await self._alease(pool, tokens, max_wait)
+        try:
+            result = await send(lease.key)
+        except BaseException as e:
+            self._finish_failed(lease, e)
+            raise
+        lease.finish(result.prompt_tokens + result.completion_tokens)
+        return result
+
+    # ---- Groq (OpenAI-compatible chat completions) ----
+
+    @staticmethod
+    def _groq_headers(api_key: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+
+    @staticmethod
+    def _groq_result(response: httpx.Response, model: str) -> LLMResult:
+        if response.status_code != 200:
+            raise _status_error("Groq", response)
+        result = response.json()
+        usage = result.get("usage") or {}
+        return LLMResult(
+            text=result["choices"][0]["message"]["content"].strip(),
+            provider="groq",
+            model=model,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+
+    def groq_chat(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: str,
+        call_site: str,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        api_key: Optional[str] = None,
+        **params: Any,
+    ) -> LLMResult:
+        """
+        Groq chat completion over the pooled connection.
+
+        Args:
+            messages: OpenAI-style [{"role", "content"}, ...]
+            call_site: Metrics label
+            timeout: Read timeout in seconds (default: llm_timeout_seconds); also
+                the longest wait for a pooled key
+            retries: Override llm_max_retries
+            api_key: Pin a key (default: lease one from the "groq" key pool)
+            **params: temperature, max_tokens, top_p, ...
+        """
+        body = {"model": model, "messages": messages, **params}
+        tokens = estimate_tokens(_message_text(messages), params.get("max_tokens", 0))
+
+        def post(key: str) -> LLMResult:
+            response = self.http.post(
+                GROQ_CHAT_URL, headers=self._groq_headers(key), json=body, timeout=self._request_timeout(timeout)
+            )
+            return self._groq_result(response, model)
+
+        def send() -> LLMResult:
+            return self._with_key("groq", api_key, tokens, post, timeout)
+
+        return self._call(call_site, "groq.chat", send, retries, _fingerprint("groq", model, api_key, body))
+
+    async def agroq_chat(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: str,
+        call_site: str,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        api_key: Optional[str] = None,
+        **params: Any,
+    ) -> LLMResult:
+        """Async `groq_chat`."""
+        body = {"model": model, "messages": messages, **params}
+        tokens = estimate_tokens(_message_text(messages), params.get("max_tokens", 0))
+
+        async def post(key: str) -> LLMResult:
+            response = await self.async_http.post(
+                GROQ_CHAT_URL, headers=self._groq_headers(key), json=body, timeout=self._request_timeout(timeout)
+            )
+            return self._groq_result(response, model)
+
+        async def send() -> LLMResult:
+            return await self._awith_key("groq", api_key, tokens, post, timeout)
+
+        return await self._acall(call_site, "groq.chat", send, retries, _fingerprint("groq", model, api_key, body))
+
+    async def astream_groq_chat(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: str,
+        call_site: str,
+        timeout: Optional[float] = None,
+        api_key: Optional[str] = None,
+        **params: Any,
+    ) -> AsyncIterator[str]:
+        """
+        Streaming Groq chat completion: yields content deltas as they arrive.
+
+        Not retried (a retry after the first token would repeat text); errors
+        raise LLMError.
+        """
+        body = {"model": model, "messages": messages, **params, "stream": True}
+        usage: Dict[str, Any] = {}
+
+        def parse(line: str) -> Optional[str]:
+            if not line.startswith("data:"):
+                return None
+            data = line[len("data:"):].strip()
+            if not data or data == "[DONE]":
+                return None
+            chunk = json.loads(data)
+            usage.update((chunk.get("x_groq") or {}).get("usage") or chunk.get("usage") or {})
+            choices = chunk.get("choices") or []
+            return (choices[0].get("delta") or {}).get("content") if choices else None
+
+        breaker = self._admit("groq.chat")
+        lease = None
+        error: Optional[BaseException] = None
+        try:
+            if not api_key:
+                tokens = estimate_tokens(_message_text(messages), params.get("max_tokens", 0))
+                lease = await self._alease("groq", tokens, timeout)
+                api_key = lease.key
+            request = self.async_http.stream(
+                "POST", GROQ_CHAT_URL, headers=self._groq_headers(api_key), json=body, timeout=self._request_timeout(timeout)
+            )
+            async for text in self._astream(call_site, "Groq", model, request, parse, usage, "prompt_tokens", "completion_tokens"):
+                yield text
+        except BaseException as e:
+            error = e  # Includes the consumer closing the stream early
+            raise
+        finally:
+            self._settle(breaker, error)
+            if lease is not None:
+                lease.finish(
+                    usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0),
+                    error if isinstance(error, Exception) else None,
+                )
+
+    async def _astream(
+        self,
+        call_site: str,
+        provider: str,
+        model: str,
+        request: Any,
+        parse: Callable[[str], Optional[str]],
+        usage: Dict[str, Any],
+        prompt_key: str,
+        completion_key: str,
+    ) -> AsyncIterator[str]:
+        """Drive a streaming response line by line, recording first-token latency and usage."""
+        start = time.perf_counter()
+        first_token_ms: Optional[float] = None
+        try:
+            async with request as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise _status_error(provider, response)
+                async for line in response.aiter_lines():
+                    text = parse(line)
+                    if text:
+                        if first_token_ms is None:
+                            first_token_ms = (time.perf_counter() - start) * 1000
+                        yield text
+        except (httpx.TransportError, LLMError, ValueError) as e:
+            self._record(call_site, None, 1, (time.perf_counter() - start) * 1000)
+            raise (e if isinstance(e, LLMError) else LLMError(f"{provider} stream error: {e}", retryable=True)) from e
+
+        result = LLMResult(
+            text="",
+            provider=provider.lower(),
+            model=model,
+            prompt_tokens=usage.get(prompt_key, 0),
+            completion_tokens=usage.get(completion_key, 0),
+        )
+        self._record(call_site, result, 1, (time.perf_counter() - start) * 1000, first_token_ms)
+
+    # ---- Ollama (local) ----
+
+    @staticmethod
+    def _ollama_result(response: httpx.Response, model: str) -> LLMResult:
+        if response.status_code != 200:
+            raise _status_error("Ollama", response)
+        result = response.json()
+        return LLMResult(
+            text=result.get("response", "").strip(),
+            provider="ollama",
+            model=model,
+            prompt_tokens=result.get("prompt_eval_count", 0),
+            completion_tokens=result.get("eval_count", 0),
+        )
+
+    def ollama_generate(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        call_site: str,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        base_url: str = OLLAMA_URL,
+    ) -> LLMResult:
+        """Ollama /api/generate (non-streaming) over the pooled connection."""
+        body = {"model": model, "prompt": prompt, "stream": False, "options": options or {}}
+
+        def send() -> LLMResult:
+            response = self.http.post(f"{base_url}/api/generate", json=body, timeout=self._request_timeout(timeout))
+            return self._ollama_result(response, model)
+
+        return self._call(call_site, "ollama.generate", send, retries, _fingerprint(f"ollama:{base_url}", model, None, body))
+
+    async def aollama_generate(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        call_site: str,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        base_url: str = OLLAMA_URL,
+    ) -> LLMResult:
+        """Async `ollama_generate`."""
+        body = {"model": model, "prompt": prompt, "stream": False, "options": options or {}}
+
+        async def send() -> LLMResult:
+            response = await self.async_http.post(f"{base_url}/api/generate", json=body, timeout=self._request_timeout(timeout))
+            return self._ollama_result(response, model)
+
+        return await self._acall(call_site, "ollama.generate", send, retries, _fingerprint(f"ollama:{base_url}", model, None, body))
+
+    async def astream_ollama_generate(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        call_site: str,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        base_url: str = OLLAMA_URL,
+    ) -> AsyncIterator[str]:
+        """Streaming Ollama /api/generate (NDJSON): yields text pieces as they arrive."""
+        body = {"model": model, "prompt": prompt, "stream": True, "options": options or {}}
+        usage: Dict[str, Any] = {}
+
+        def parse(line: str) -> Optional[str]:
+            if not line.strip():
+                return None
+            chunk = json.loads(line)
+            if chunk.get("done"):
+                usage.update(chunk)  # Final line carries prompt_eval_count / eval_count
+            return chunk.get("response")
+
+        breaker = self._admit("ollama.generate")
+        error: Optional[BaseException] = None
+        try:
+            request = self.async_http.stream(
+                "POST", f"{base_url}/api/generate", json=body, timeout=self._request_timeout(timeout)
+            )
+            async for text in self._astream(call_site, "Ollama", model, request, parse, usage, "prompt_eval_count", "eval_count"):
+                yield text
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._settle(breaker, error)
+
+    # ---- Gemini (SDK; one client per API key) ----
+
+    def gemini_client(self, api_key: str) -> Any:
+        """Shared google-genai Client for an API key (or a LegacyGeminiClient)."""
+        with self._lock:
+            client = self._gemini_clients.get(api_key)
+            if client is None:
+                try:
+                    from google import genai
+                    client = genai.Client(api_key=api_key)
+                except ImportError:
+                    import google.generativeai as genai
+                    client = LegacyGeminiClient(genai, api_key)
+                self._gemini_clients[api_key] = client
+            return client
+
+    def gemini_generate(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        call_site: str,
+        temperature: float = 0.3,
+        max_output_tokens: int = 1500,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        api_key: Optional[str] = None,
+    ) -> LLMResult:
+        """
+        Gemini generate_content through the shared SDK client.
+
+        Args:
+            timeout: Request timeout in seconds (default: llm_timeout_seconds);
+                also the longest wait for a pooled key
+            retries: Override llm_max_retries
+            api_key: Pin a key (default: lease one from the "gemini" key pool)
+        """
+        tokens = estimate_tokens(prompt, max_output_tokens)
+
+        def generate(key: str) -> LLMResult:
+            client = self.gemini_client(key)
+            seconds = _within_deadline(timeout) or settings.llm_timeout_seconds
+            try:
+                if hasattr(client, "models"):
+                    from google.genai import types
+
+                    response = client.models.generate_content(
+                        model=model,
+                        contents=[types.Content(role="user", parts=[types.Part.from_text(text=prompt)])],
+                        config=types.GenerateContentConfig(
+                            temperature=temperature,
+                            max_output_tokens=max_output_tokens,
+                            http_options=types.HttpOptions(timeout=int(seconds * 1000)),  # Milliseconds
+                        ),
+                    )
+                else:
+                    response = client.generate_content(model, prompt, seconds)
+            except LLMError:
+                raise
+            except Exception as e:
+                status = getattr(e, "code", None) or getattr(e, "status_code", None)
+                retryable = isinstance(status, int) and (status == 429 or status >= 500)
+                raise LLMError(f"Gemini API error: {e}", status_code=status, retryable=retryable) from e
+
+            usage = getattr(response, "usage_metadata", None)
+            return LLMResult(
+                text=_gemini_text(response),
+                provider="gemini",
+                model=model,
+                prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+                completion_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+            )
+
+        def send() -> LLMResult:
+            return self._with_key("gemini", api_key, tokens, generate, timeout)
+
+        request = {"prompt": prompt, "temperature": temperature, "max_output_tokens": max_output_tokens}
+        return self._call(call_site, "gemini.generate", send, retries, _fingerprint("gemini", model, api_key, request))
+
+    async def agemini_generate(self, prompt: str, **kwargs: Any) -> LLMResult:
+        """`gemini_generate` on the blocking pool (the SDK is synchronous)."""
+        return await run_blocking(self.gemini_generate, prompt, **kwargs)
+
+    # ---- LangChain chat models (report agents) ----
+
+    def chat_groq(self, **kwargs: Any) -> Any:
+        """
+        A langchain ChatGroq that reuses the pooled connections, timeouts and retries.
+
+        Without `groq_api_key` the key comes from the "groq" key pool on
+        every `ainvoke` (a PooledChatModel builds one ChatGroq per key).
+        """
+        from langchain_groq import ChatGroq
+
+        kwargs.setdefault("timeout", settings.llm_report_timeout_seconds)
+        kwargs.setdefault("max_retries", settings.llm_max_retries)
+        if kwargs.get("groq_api_key"):
+            return ChatGroq(http_client=self.http, http_async_client=self.async_http, **kwargs)
+
+        def build(key: str) -> Any:
+            return ChatGroq(groq_api_key=key, http_client=self.http, http_async_client=self.async_http, **kwargs)
+
+        return PooledChatModel(build, "groq", kwargs.get("max_tokens") or 0)
+
+    async def ainvoke(self, chat_model: Any, messages: List[Any], call_site: str) -> Any:
+        """`chat_model.ainvoke(messages)` with latency and token metrics (retries happen inside the model)."""
+        start = time.perf_counter()
+        lease: Optional[KeyLease] = None
+        if isinstance(chat_model, PooledChatModel):
+            lease = await self._alease(chat_model.pool, estimate_tokens(_message_text(messages), chat_model.max_tokens))
+            chat_model = chat_model.for_key(lease.key)
+        try:
+            response = await chat_model.ainvoke(messages)
+        except Exception as e:
+            if lease is not None:
+                lease.finish(error=e)
+            self._record(call_site, None, 1, (time.perf_counter() - start) * 1000)
+            raise
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        if lease is not None:
+            lease.finish(usage.get("total_tokens", 0))
+        result = LLMResult(
+            text="",
+            provider=type(chat_model).__name__,
+            model=str(getattr(chat_model, "model_name", "")),
+            prompt_tokens=usage.get("input_tokens", 0),
+            completion_tokens=usage.get("output_tokens", 0),
+        )
+        self._record(call_site, result, 1, (time.perf_counter() - start) * 1000)
+        return response
+
+
+class LegacyGeminiClient:
+    """
+    One API key's handle on the legacy google-generativeai SDK.
+
+    That SDK keeps its key in module state (`genai.configure`), so a client
+    per key can't exist: each call configures this handle's key under a
+    process-wide lock held until the response is in. Legacy Gemini calls
+    therefore run one at a time - install google-genai (a real client per
+    key) for concurrent calls across the key pool.
+    """
+
+    _lock = threading.Lock()  # Shared by every key: guards the module-level configuration
+
+    def __init__(self, genai: Any, api_key: str):
+        self._genai = genai
+        self.api_key = api_key
+
+    def generate_content(self, model: str, prompt: str, timeout: float) -> Any:
+        if not self._lock.acquire(timeout=timeout):
+            raise LLMError(f"Legacy Gemini SDK busy for {timeout:.0f}s (install google-genai)", status_code=503)
+        try:
+            self._genai.configure(api_key=self.api_key)
+            return self._genai.GenerativeModel(model).generate_content(prompt, request_options={"timeout": timeout})
+        finally:
+            self._lock.release()
+
+
+class PooledChatModel:
+    """A langchain chat model whose key is leased per call; one model instance per key."""
+
+    def __init__(self, build: Callable[[str], Any], pool: str, max_tokens: int):
+        self._build = build
+        self.pool = pool
+        self.max_tokens = max_tokens
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def for_key(self, key: str) -> Any:
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._models[key] = self._build(key)
+            return model
+
+
+# Global instance
+_llm_client: Optional[LLMClient] = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Get or create the process-wide LLM client."""
+    global _llm_client
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = LLMClient()
+    return _llm_client
+
+
+def track_turn_usage() -> Dict[str, Any]:
+    """
+    Start collecting the current turn's LLM usage; returns the dict it fills.
+
+    "calls": provider-reported prompt/completion tokens by call site, for
+    every call made from this context (blocking-pool work and coalesced
+    calls this turn leads included). "prompts": helper prompt sizes by
+    provider, added by the adapters (see prompt_budget.py).
+    """
+    usage: Dict[str, Any] = {"calls": {}, "prompts": {}}
+    _turn_usage.set(usage)
+    return usage
+
+
+def set_call_deadline(seconds: float) -> None:
+    """
+    LLM calls made from this context from now on end within `seconds`.
+
+    Request timeouts and key pool waits are cut to the time left, and no
+    retry starts after it - e.g. a hedged helper call stays inside the
+    hedge's budget. Set it in a context of its own (a task, or a
+    `copy_context().run`), like `track_turn_usage`.
+    """
+    _call_deadline.set(time.monotonic() + seconds)
+
+
+def current_turn_usage() -> Optional[Dict[str, Any]]:
+    """The dict `track_turn_usage` returned in this context, if any."""
+    return _turn_usage.get()
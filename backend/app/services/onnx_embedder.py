@@ -0,0 +1,226 @@
+"""
+ONNX Runtime embedding backend (CPU, optional int8 quantization).
+
+Drop-in replacement for SentenceTransformer.encode() that needs only
+onnxruntime + tokenizers at runtime - no torch import, which keeps worker
+startup and per-query latency down on CPU-only nodes.
+
+The model is exported once with export_onnx_model.py (needs torch and
+sentence-transformers), which writes into `embedding_onnx_dir`:
+- model.onnx            fp32 transformer (outputs last_hidden_state)
+- model_int8.onnx       dynamically int8-quantized copy
+- tokenizer.json        fast tokenizer
+- onnx_config.json      pooling, normalization and max sequence length
+
+To modify:
+- Select the backend: `embedding_backend = "onnx"` in config.py
+- Use fp32 weights: `embedding_onnx_quantized = False`
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+CONFIG_FILE = "onnx_config.json"
+
+# Pooling modes we can reproduce in numpy
+SUPPORTED_POOLING = ("mean", "cls")
+
+ONNX_OPSET = 14
+
+
+class OnnxEmbedder:
+    """Sentence embeddings from an exported transformer via ONNX Runtime."""
+
+    def __init__(self, model_dir: str, quantized: bool = True, num_threads: int = 0):
+        """
+        Load the exported model and tokenizer.
+
+        Args:
+            model_dir: Directory written by `export_onnx_model()`
+            quantized: Prefer the int8 model when it exists
+            num_threads: ONNX Runtime intra-op threads (0 = runtime default)
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, CONFIG_FILE), "r", encoding="utf-8") as f:
+            self.config: Dict[str, Any] = json.load(f)
+
+        model_file = MODEL_FILE
+        if quantized and os.path.exists(os.path.join(model_dir, QUANTIZED_MODEL_FILE)):
+            model_file = QUANTIZED_MODEL_FILE
+        self.model_file = model_file
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file),
+            options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(
+            pad_id=self.config["pad_token_id"],
+            pad_token=self.config["pad_token"],
+        )
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+    ) -> np.ndarray:
+        """
+        Encode texts like SentenceTransformer.encode (same signature).
+
+        Texts are sorted by length before batching so each batch pads to a
+        similar length; results come back in input order.
+        """
+        if not texts:
+            return np.zeros((0, self.config["dimension"]), dtype=np.float32)
+
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = np.zeros((len(texts), self.config["dimension"]), dtype=np.float32)
+
+        batch_starts = range(0, len(texts), batch_size)
+        if show_progress_bar:
+            from tqdm import tqdm
+            batch_starts = tqdm(batch_starts, desc="Batches")
+
+        for start in batch_starts:
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([texts[i] for i in rows])
+
+        return embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Tokenize, run the transformer, pool and (optionally) normalize."""
+        encodings = self.tokenizer.encode_batch(texts)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        feeds = {name: value for name, value in inputs.items() if name in self._input_names}
+
+        hidden = self.session.run(None, feeds)[0]
+
+        if self.config["pooling"] == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.config["normalize"]:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+        return pooled.astype(np.float32)
+
+
+def onnx_model_exists(model_dir: str) -> bool:
+    """Whether an exported model is present in model_dir."""
+    return all(
+        os.path.exists(os.path.join(model_dir, name))
+        for name in (MODEL_FILE, TOKENIZER_FILE, CONFIG_FILE)
+    )
+
+
+def export_onnx_model(
+    model_name: str,
+    output_dir: str,
+    quantize: bool = True,
+    hf_token: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Export a sentence-transformers model to ONNX (plus int8 copy).
+
+    Requires torch, sentence-transformers and onnxruntime.
+
+    Returns:
+        The config written to onnx_config.json
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    model_kwargs = {"token": hf_token} if hf_token else {}
+    model = SentenceTransformer(model_name, device="cpu", **model_kwargs)
+
+    pooling = next((module for module in model if isinstance(module, Pooling)), None)
+    pooling_mode = "mean"
+    if pooling is not None:
+        # sentence-transformers >= 5 stores the mode directly; older versions use flags
+        pooling_mode = getattr(pooling, "pooling_mode", None) or pooling.get_pooling_mode_str()
+    if pooling_mode not in SUPPORTED_POOLING:
+        raise ValueError(f"Unsupported pooling mode for ONNX export: {pooling_mode}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = model.tokenizer
+    tokenizer.save_pretrained(output_dir)  # Writes tokenizer.json for fast tokenizers
+
+    class _HiddenStates(torch.nn.Module):
+        """Return only last_hidden_state so the graph has a single output."""
+
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask, token_type_ids=None):
+            return self.transformer(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids,
+            )[0]
+
+    sample = tokenizer(["export sample", "नमूना"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+
+    model_path = os.path.join(output_dir, MODEL_FILE)
+    wrapper = _HiddenStates(model[0].auto_model).eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(
+            model_path,
+            os.path.join(output_dir, QUANTIZED_MODEL_FILE),
+            weight_type=QuantType.QInt8,
+        )
+
+    config = {
+        "model_name": model_name,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.max_seq_length,
+        "pooling": pooling_mode,
+        "normalize": any(isinstance(module, Normalize) for module in model),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+    }
+    with open(os.path.join(output_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    return config
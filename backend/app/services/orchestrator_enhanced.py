@@ -6,9 +6,18 @@ Adds:
 - Confidence fusion (ASR + Validator + LLM)
 - Audit logging
 - TTS response generation
+
+`handle_user_message_enhanced_async` is the non-blocking variant used by
+the /next route and `stream_user_message_enhanced` streams helper text for
+/next/stream; all variants share the decision helpers below.
+
+Helper mode first asks the semantic cache (semantic_cache.py) for the text
+of a paraphrase asked earlier; a hit skips retrieval and the helper LLM.
+Otherwise all retrieved chunks go to the adapter, which packs what fits its
+token budget (prompt_budget.py).
 """
 
-from typing import Tuple, Optional, Dict, Any
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 from ..models import (
     SessionState,
     NextMessageResponse,
@@ -26,11 +35,17 @@ from .orchestrator import (
 from .validators_enhanced import ENHANCED_VALIDATORS
 from .orchestrator import validate_name
 from .rag_engine import RAGEngine
-from .llm_adapter import LLMAdapter
+from .llm_adapter import LLMAdapter, FallbackText, helper_route
+from .llm_client import track_turn_usage
 from .stt_service import STTService, ASRResult
 from .tts_service import TTSService
 from .answer_extractor import get_answer_extractor
 from .intent_classifier import get_intent_classifier
+from .blocking_pool import run_blocking
+from .helper_cache import helper_cache_audit
+from .semantic_cache import SemanticHit, get_semantic_cache, log_hit, semantic_extraction_hit
+from .circuit_breaker import circuit_breaker_states
+from ..config import settings
 
 
 # Confidence weights for fusion
@@ -41,6 +56,9 @@ W_LLM = 0.20
 # Threshold for auto-fill - Balanced to accept valid answers but reject help requests
 AUTO_FILL_THRESHOLD = 0.60
 
+# Skip intent classification for simple parameters that don't need help
+SIMPLE_PARAMETERS = ["name", "location", "fertilizer_used"]
+
 
 def compute_combined_confidence(
     asr_conf: float,
@@ -88,71 +106,297 @@ def handle_user_message_enhanced(
     """
     current_param = session.current_parameter
     language = session.language
-    
-    # Initialize audit data
-    audit = {
-        "asr_conf": 0.0,
-        "validator_conf": 0.0,
-        "llm_conf": 0.0,
-        "combined_conf": 0.0,
-        "asr_text": None,
-        "retrieved_chunks": [],
-    }
+    audit = _new_audit()
     
     # Step 1: Handle audio input if provided
-    asr_result: Optional[ASRResult] = None
     if audio_bytes and stt_service:
         try:
             asr_result = stt_service.transcribe(audio_bytes, language)
-            audit["asr_conf"] = asr_result.asr_confidence
-            audit["asr_text"] = asr_result.text
-            
-            # Use ASR text if no user_message provided
-            if not user_message:
-                user_message = asr_result.text
+            user_message = _apply_asr(audit, asr_result, user_message)
         except Exception as e:
             print(f"✗ STT error: {e}")
             audit["asr_conf"] = 0.0
     
     # If still no message, return error
     if not user_message or not user_message.strip():
-        return _create_error_response(
-            session,
-            "No input provided",
-            language,
-            tts_service
-        ), audit
+        response = _create_error_response(session, "No input provided", language)
+        return _attach_audio(response, language, tts_service), audit
     
     # Step 2: Use LLM to intelligently classify user intent
-    # Skip intent classification for simple parameters that don't need help
-    SIMPLE_PARAMETERS = ["name", "location", "fertilizer_used"]
-    
     if current_param in SIMPLE_PARAMETERS:
-        # For simple parameters, assume it's an answer unless explicitly asking for help
-        explicit_help_phrases = ["help", "मदद", "don't know", "नहीं पता", "how", "कैसे"]
-        is_help = any(phrase in user_message.lower() for phrase in explicit_help_phrases)
-        
-        if is_help:
-            intent = "help_request"
-            intent_confidence = 0.90
-        else:
-            intent = "answer"
-            intent_confidence = 0.95
-        
-        print(f"✓ Intent (simple param): {intent} (confidence: {intent_confidence:.2f})")
+        intent, intent_confidence = _classify_simple_intent(user_message)
     else:
         # For complex parameters, use LLM classification
         classifier = get_intent_classifier()
         intent, intent_confidence = classifier.classify_intent(user_message, current_param, language)
         print(f"✓ Intent classification: {intent} (confidence: {intent_confidence:.2f})")
     
+    if _is_help_request(audit, user_message, intent, intent_confidence):
+        # Jump directly to Step 4 (RAG helper mode)
+        validation_result = ValidationResult(value=None, is_confident=False)
+    else:
+        # Try LLM-based answer extraction
+        extractor = get_answer_extractor()
+        extracted_value, extraction_conf = extractor.extract_answer(
+            user_message, current_param, language, _get_expected_values(current_param)
+        )
+        validation_result = _accept_extraction(audit, extracted_value, extraction_conf)
+        if validation_result is None:
+            # Fall back to traditional validator
+            validator_func = ENHANCED_VALIDATORS.get(current_param)
+            if not validator_func:
+                # Unknown parameter - skip
+                return _handle_unknown_parameter(session, language, tts_service), audit
+            
+            validation_result = validator_func(user_message, language)
+            _score_validation(audit, validation_result)
+    
+    # Step 3: Decide if we need helper mode
+    response = _try_auto_fill(session, current_param, validation_result, audit, language)
+    if response is not None:
+        return _attach_audio(response, language, tts_service), audit
+    
+    # Step 4: Enter helper mode - call RAG + LLM
+    # This happens when:
+    # - User explicitly asked for help
+    # - No valid answer was extracted
+    # - Confidence is too low
+    print(f"✓ Entering helper mode for parameter: {current_param}")
+    hit = _semantic_helper_lookup(llm, rag_engine, current_param, language, user_message)
+    if hit is not None:
+        response = _semantic_helper_response(session, current_param, hit, audit)
+        return _attach_audio(response, language, tts_service), audit
+    
+    query = _build_rag_query(current_param, user_message, language)
+    
+    if rag_engine.is_ready():
+        chunks = rag_engine.retrieve(query, current_param, language, k=10)  # Get more chunks for better context
+    else:
+        chunks = []
+    
+    # Call helper LLM; the adapter packs as many of the chunks as its token budget allows
+    helper_text = llm.generate_helper(
+        parameter=current_param,
+        language=language,
+        user_message=user_message,
+        retrieved_chunks=chunks,
+    )
+    _semantic_helper_store(llm, rag_engine, current_param, language, user_message, helper_text, chunks)
+    
+    response = _helper_response(session, current_param, helper_text, chunks, audit)
+    return _attach_audio(response, language, tts_service), audit
+
+
+async def handle_user_message_enhanced_async(
+    session: SessionState,
+    user_message: Optional[str],
+    audio_bytes: Optional[bytes],
+    rag_engine: RAGEngine,
+    llm: LLMAdapter,
+    stt_service: Optional[STTService] = None,
+    tts_service: Optional[TTSService] = None,
+) -> Tuple[NextMessageResponse, Dict[str, Any]]:
+    """
+    Async variant of `handle_user_message_enhanced` (same steps and audit).
+    
+    LLM calls (intent, extraction, helper) and Groq Whisper use async I/O;
+    validators, RAG retrieval and TTS run on the bounded blocking pool, so
+    one slow turn doesn't stall the other sessions on the worker.
+    """
+    response, user_message, chunks, audit = await _aresolve_turn(
+        session, user_message, audio_bytes, rag_engine, llm, stt_service, tts_service
+    )
+    if response is not None:
+        return response, audit
+    
+    helper_text = await llm.agenerate_helper(
+        parameter=session.current_parameter,
+        language=session.language,
+        user_message=user_message,
+        retrieved_chunks=chunks,
+    )
+    await run_blocking(
+        _semantic_helper_store, llm, rag_engine, session.current_parameter, session.language,
+        user_message, helper_text, chunks,
+    )
+    
+    response = _helper_response(session, session.current_parameter, helper_text, chunks, audit)
+    return await _aattach_audio(response, session.language, tts_service), audit
+
+
+async def stream_user_message_enhanced(
+    session: SessionState,
+    user_message: Optional[str],
+    audio_bytes: Optional[bytes],
+    rag_engine: RAGEngine,
+    llm: LLMAdapter,
+    stt_service: Optional[STTService] = None,
+    tts_service: Optional[TTSService] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming variant of `handle_user_message_enhanced_async` (SSE endpoint).
+    
+    Yields ("token", text) for each helper-text piece as the LLM produces
+    it, then ("final", (NextMessageResponse, audit)). Turns that don't reach
+    helper mode yield only the final event. TTS runs after the text is
+    complete, so the audio URL arrives with the final event.
+    """
+    response, user_message, chunks, audit = await _aresolve_turn(
+        session, user_message, audio_bytes, rag_engine, llm, stt_service, tts_service
+    )
+    if response is None:
+        parts = []
+        complete = True
+        async for text in llm.astream_helper(
+            parameter=session.current_parameter,
+            language=session.language,
+            user_message=user_message,
+            retrieved_chunks=chunks,
+        ):
+            complete = complete and not isinstance(text, FallbackText)
+            if text:
+                parts.append(text)
+                yield "token", text
+        
+        helper_text = "".join(parts).strip()
+        if complete:
+            await run_blocking(
+                _semantic_helper_store, llm, rag_engine, session.current_parameter, session.language,
+                user_message, helper_text, chunks,
+            )
+        response = _helper_response(session, session.current_parameter, helper_text, chunks, audit)
+        response = await _aattach_audio(response, session.language, tts_service)
+    elif audit.get("semantic_cache", {}).get("kind") == "helper":
+        yield "token", response.helper_text  # A cached text arrives in one piece
+    
+    yield "final", (response, audit)
+
+
+async def _aresolve_turn(
+    session: SessionState,
+    user_message: Optional[str],
+    audio_bytes: Optional[bytes],
+    rag_engine: RAGEngine,
+    llm: LLMAdapter,
+    stt_service: Optional[STTService],
+    tts_service: Optional[TTSService],
+) -> Tuple[Optional[NextMessageResponse], Optional[str], list, Dict[str, Any]]:
+    """
+    Steps 1-3 of the async turn, plus retrieval for helper mode.
+    
+    Returns (response, user_message, chunks, audit): a finished response
+    (answer accepted, error, unknown parameter, semantic cache hit), or
+    response=None with the message and retrieved chunks when the helper LLM
+    has to answer.
+    """
+    current_param = session.current_parameter
+    language = session.language
+    audit = _new_audit()
+    
+    # Step 1: Handle audio input if provided
+    if audio_bytes and stt_service:
+        try:
+            asr_result = await stt_service.atranscribe(audio_bytes, language)
+            user_message = _apply_asr(audit, asr_result, user_message)
+        except Exception as e:
+            print(f"✗ STT error: {e}")
+            audit["asr_conf"] = 0.0
+    
+    if not user_message or not user_message.strip():
+        response = _create_error_response(session, "No input provided", language)
+        return await _aattach_audio(response, language, tts_service), user_message, [], audit
+    
+    # Step 2: Intent
+    if current_param in SIMPLE_PARAMETERS:
+        intent, intent_confidence = _classify_simple_intent(user_message)
+    else:
+        classifier = get_intent_classifier()
+        intent, intent_confidence = await classifier.aclassify_intent(user_message, current_param, language)
+        print(f"✓ Intent classification: {intent} (confidence: {intent_confidence:.2f})")
+    
+    if _is_help_request(audit, user_message, intent, intent_confidence):
+        validation_result = ValidationResult(value=None, is_confident=False)
+    else:
+        extractor = get_answer_extractor()
+        extracted_value, extraction_conf = await extractor.aextract_answer(
+            user_message, current_param, language, _get_expected_values(current_param)
+        )
+        validation_result = _accept_extraction(audit, extracted_value, extraction_conf)
+        if validation_result is None:
+            validator_func = ENHANCED_VALIDATORS.get(current_param)
+            if not validator_func:
+                return _handle_unknown_parameter(session, language, tts_service), user_message, [], audit
+            
+            # Validators may embed the message (semantic matching) - CPU-bound
+            validation_result = await run_blocking(validator_func, user_message, language)
+            _score_validation(audit, validation_result)
+    
+    # Step 3: Auto-fill if confident
+    response = _try_auto_fill(session, current_param, validation_result, audit, language)
+    if response is not None:
+        return await _aattach_audio(response, language, tts_service), user_message, [], audit
+    
+    # Step 4 (retrieval part): the caller generates or streams the helper text
+    print(f"✓ Entering helper mode for parameter: {current_param}")
+    hit = await run_blocking(_semantic_helper_lookup, llm, rag_engine, current_param, language, user_message)
+    if hit is not None:
+        response = _semantic_helper_response(session, current_param, hit, audit)
+        return await _aattach_audio(response, language, tts_service), user_message, [], audit
+    
+    query = _build_rag_query(current_param, user_message, language)
+    
+    if rag_engine.is_ready():
+        chunks = await run_blocking(rag_engine.retrieve, query, current_param, language, k=10)
+    else:
+        chunks = []
+    return None, user_message, chunks, audit
+
+
+def _new_audit() -> Dict[str, Any]:
+    """Initial audit data for a turn."""
+    return {
+        "asr_conf": 0.0,
+        "validator_conf": 0.0,
+        "llm_conf": 0.0,
+        "combined_conf": 0.0,
+        "asr_text": None,
+        "retrieved_chunks": [],
+        "circuit_breakers": circuit_breaker_states(),  # As the turn started; open ones answer with fallbacks
+        "llm_usage": track_turn_usage(),  # Filled in by this turn's LLM calls (tokens by call site, helper prompt size)
+    }
+
+
+def _apply_asr(audit: Dict[str, Any], asr_result: ASRResult, user_message: Optional[str]) -> Optional[str]:
+    """Record the transcription; it becomes the message unless text was also sent."""
+    audit["asr_conf"] = asr_result.asr_confidence
+    audit["asr_text"] = asr_result.text
+    
+    # Use ASR text if no user_message provided
+    return user_message or asr_result.text
+
+
+def _classify_simple_intent(user_message: str) -> Tuple[str, float]:
+    """Simple parameters skip the LLM: an answer unless explicitly asking for help."""
+    explicit_help_phrases = ["help", "मदद", "don't know", "नहीं पता", "how", "कैसे"]
+    is_help = any(phrase in user_message.lower() for phrase in explicit_help_phrases)
+    
+    if is_help:
+        intent, intent_confidence = "help_request", 0.90
+    else:
+        intent, intent_confidence = "answer", 0.95
+    
+    print(f"✓ Intent (simple param): {intent} (confidence: {intent_confidence:.2f})")
+    return intent, intent_confidence
+
+
+def _is_help_request(audit: Dict[str, Any], user_message: str, intent: str, intent_confidence: float) -> bool:
+    """Record the intent; True if it is clearly a help request (skip extraction)."""
     audit["intent"] = intent
     audit["intent_confidence"] = intent_confidence
     
     # Check if this is a follow-up question (confidence 0.75 indicates follow-up)
     is_follow_up = intent == "help_request" and intent_confidence == 0.75
     
-    # If it's clearly a help request, skip extraction and go straight to RAG helper
     if intent == "help_request" and intent_confidence >= 0.70:
         if is_follow_up:
             print(f"✓ Follow-up question detected: '{user_message}' - providing additional guidance")
@@ -162,54 +406,52 @@ def handle_user_message_enhanced(
         audit["validator_conf"] = 0.0
         audit["help_request"] = True
         audit["is_follow_up"] = is_follow_up
-        # Jump directly to Step 4 (RAG helper mode)
-        validation_result = ValidationResult(value=None, is_confident=False)
-    else:
-        # Try LLM-based answer extraction
-        extractor = get_answer_extractor()
-        expected_values = _get_expected_values(current_param)
-        
-        extracted_value, extraction_conf = extractor.extract_answer(
-            user_message, current_param, language, expected_values
-        )
-        
-        # If LLM extracted an answer, use it
-        if extracted_value and extraction_conf >= 0.80:
-            print(f"✓ LLM extracted: '{extracted_value}' (conf: {extraction_conf:.2f})")
-            validation_result = ValidationResult(value=extracted_value, is_confident=True)
-            audit["validator_conf"] = extraction_conf
-            audit["llm_extraction"] = extracted_value
-        else:
-            # Fall back to traditional validator
-            validator_func = ENHANCED_VALIDATORS.get(current_param)
-            if not validator_func:
-                # Unknown parameter - skip
-                return _handle_unknown_parameter(session, language, tts_service), audit
-            
-            validation_result: ValidationResult = validator_func(user_message, language)
-            
-            # Calculate validator confidence
-            if validation_result.is_confident and validation_result.value:
-                audit["validator_conf"] = 0.95  # High confidence
-            elif validation_result.value:
-                audit["validator_conf"] = 0.70  # Medium confidence
-            else:
-                audit["validator_conf"] = 0.10  # Very low confidence - likely help request
+        return True
+    return False
+
+
+def _accept_extraction(
+    audit: Dict[str, Any],
+    extracted_value: Optional[str],
+    extraction_conf: float,
+) -> Optional[ValidationResult]:
+    """Confident LLM extraction as a validation result, else None (use the validator)."""
+    extraction_hit = semantic_extraction_hit.get()
+    if extraction_hit is not None:
+        audit["semantic_cache"] = extraction_hit
     
-    # Step 3: Decide if we need helper mode
+    if extracted_value and extraction_conf >= 0.80:
+        print(f"✓ LLM extracted: '{extracted_value}' (conf: {extraction_conf:.2f})")
+        audit["validator_conf"] = extraction_conf
+        audit["llm_extraction"] = extracted_value
+        return ValidationResult(value=extracted_value, is_confident=True)
+    return None
+
+
+def _score_validation(audit: Dict[str, Any], validation_result: ValidationResult) -> None:
+    """Validator confidence for the audit."""
+    if validation_result.is_confident and validation_result.value:
+        audit["validator_conf"] = 0.95  # High confidence
+    elif validation_result.value:
+        audit["validator_conf"] = 0.70  # Medium confidence
+    else:
+        audit["validator_conf"] = 0.10  # Very low confidence - likely help request
+
+
+def _try_auto_fill(
+    session: SessionState,
+    current_param: str,
+    validation_result: ValidationResult,
+    audit: Dict[str, Any],
+    language: Language,
+) -> Optional[NextMessageResponse]:
+    """Auto-fill and advance if the answer is good enough, else None (helper mode)."""
     # If validator is confident AND has a value, accept immediately (skip LLM)
     if validation_result.is_confident and validation_result.value:
         # High confidence from validator - auto-fill immediately
         audit["combined_conf"] = audit["validator_conf"]
         audit["llm_conf"] = 0.0  # Skipped LLM
-        return _auto_fill_and_advance(
-            session,
-            current_param,
-            validation_result,
-            audit,
-            language,
-            tts_service
-        ), audit
+        return _auto_fill_and_advance(session, current_param, validation_result, audit, language)
     
     # Compute preliminary combined confidence (without LLM)
     prelim_conf = compute_combined_confidence(
@@ -222,37 +464,32 @@ def handle_user_message_enhanced(
     if validation_result.value and prelim_conf >= 0.60:
         audit["combined_conf"] = prelim_conf
         audit["llm_conf"] = 0.0  # Skipped LLM
-        return _auto_fill_and_advance(
-            session,
-            current_param,
-            validation_result,
-            audit,
-            language,
-            tts_service
-        ), audit
-    
-    # Step 4: Enter helper mode - call RAG + LLM
-    # This happens when:
-    # - User explicitly asked for help
-    # - No valid answer was extracted
-    # - Confidence is too low
-    print(f"✓ Entering helper mode for parameter: {current_param}")
-    query = _build_rag_query(current_param, user_message, language)
+        return _auto_fill_and_advance(session, current_param, validation_result, audit, language)
     
-    if rag_engine.is_ready():
-        chunks = rag_engine.retrieve(query, current_param, language, k=10)  # Get more chunks for better context
+    return None
+
+
+def _helper_response(
+    session: SessionState,
+    current_param: str,
+    helper_text: str,
+    chunks: list,
+    audit: Dict[str, Any],
+) -> NextMessageResponse:
+    """Helper-mode response (guidance text; the parameter is not filled)."""
+    if chunks:
         audit["retrieved_chunks"] = chunks[:2]  # Store first 2 for audit (shorter)
         print(f"✓ Retrieved {len(chunks)} chunks for {current_param}")
-    else:
-        chunks = []
     
-    # Call helper LLM with more chunks for better context
-    helper_text = llm.generate_helper(
-        parameter=current_param,
-        language=language,
-        user_message=user_message,
-        retrieved_chunks=chunks[:5] if chunks else [],  # Use top 5 chunks
-    )
+    # Helper response cache: this turn's lookup and running hit rates
+    cache_audit = helper_cache_audit()
+    if cache_audit is not None:
+        audit["helper_cache"] = cache_audit
+    
+    # Multi-provider failover: which provider answered, and who was asked
+    route = helper_route.get()
+    if route is not None:
+        audit["helper_route"] = route
     
     # For now, assume LLM confidence based on response length and content
     audit["llm_conf"] = _estimate_llm_confidence(helper_text, chunks)
@@ -269,15 +506,6 @@ def handle_user_message_enhanced(
     session.helper_mode = True
     print(f"✓ Showing helper guidance for: {current_param}")
     
-    # Generate TTS for helper text
-    audio_url = ""
-    if tts_service and helper_text:
-        try:
-            audio_path = tts_service.synthesize(helper_text, language)
-            audio_url = tts_service.get_audio_url(audio_path)
-        except Exception as e:
-            print(f"✗ TTS error: {e}")
-    
     return NextMessageResponse(
         session_id=session.session_id,
         parameter=current_param,
@@ -287,9 +515,116 @@ def handle_user_message_enhanced(
         step_number=get_step_number(current_param),
         total_steps=len(PARAMETER_ORDER),
         helper_mode=True,
-        audio_url=audio_url if audio_url else None,
         audit=audit,
-    ), audit
+    )
+
+
+def _llm_namespace(llm: LLMAdapter, rag_engine: RAGEngine) -> str:
+    """
+    Semantic cache namespace of helper texts: adapter, model and KB content.
+    
+    The KB part is the content id, not the per-process generation counter:
+    helper texts persist across restarts (sqlite store), and the counter
+    starts at 1 again after a rebuild + restart.
+    """
+    namespace = getattr(llm, "namespace", None) or f"{type(llm).__name__}:{getattr(llm, 'model_name', '')}"
+    return f"{namespace}:kb{rag_engine.content_id}"
+
+
+def _semantic_helper_lookup(
+    llm: LLMAdapter,
+    rag_engine: RAGEngine,
+    parameter: str,
+    language: Language,
+    user_message: str,
+) -> Optional[SemanticHit]:
+    """Helper text of a paraphrase asked earlier, if any (embeds the message - CPU-bound)."""
+    cache = get_semantic_cache()
+    if cache is None:
+        return None
+    
+    try:
+        vector = cache.embed(user_message)
+    except Exception as e:
+        print(f"⚠ Semantic cache skipped (embedding failed): {e}")
+        return None
+    
+    key = ("helper", _llm_namespace(llm, rag_engine), parameter, language)
+    hit = cache.lookup(key, vector, settings.semantic_cache_helper_threshold)
+    if hit is not None:
+        log_hit("helper", parameter, language, user_message, hit)
+    return hit
+
+
+def _semantic_helper_store(
+    llm: LLMAdapter,
+    rag_engine: RAGEngine,
+    parameter: str,
+    language: Language,
+    user_message: str,
+    helper_text: str,
+    chunks: list,
+) -> None:
+    """Remember a generated helper text (fallback/error texts are skipped)."""
+    cache = get_semantic_cache()
+    if cache is None or not helper_text or isinstance(helper_text, FallbackText):
+        return
+    
+    try:
+        vector = cache.embed(user_message)  # Served from the query cache after the lookup
+    except Exception:
+        return
+    
+    key = ("helper", _llm_namespace(llm, rag_engine), parameter, language)
+    cache.add(key, user_message, vector, {"text": helper_text, "chunks": chunks[:5]})
+
+
+def _semantic_helper_response(
+    session: SessionState,
+    current_param: str,
+    hit: SemanticHit,
+    audit: Dict[str, Any],
+) -> NextMessageResponse:
+    """Helper-mode response from a semantic cache hit."""
+    audit["semantic_cache"] = hit.audit("helper")
+    return _helper_response(session, current_param, hit.payload["text"], hit.payload["chunks"], audit)
+
+
+def _spoken_text(response: NextMessageResponse) -> Optional[str]:
+    """What the response says aloud: the helper text or the next question."""
+    return response.helper_text or response.question
+
+
+def _attach_audio(
+    response: NextMessageResponse,
+    language: Language,
+    tts_service: Optional[TTSService],
+) -> NextMessageResponse:
+    """Synthesize the spoken text and set audio_url (left empty on TTS errors)."""
+    text = _spoken_text(response)
+    if tts_service and text:
+        try:
+            audio_path = tts_service.synthesize(text, language)
+            response.audio_url = tts_service.get_audio_url(audio_path) or None
+        except Exception as e:
+            print(f"✗ TTS error: {e}")
+    return response
+
+
+async def _aattach_audio(
+    response: NextMessageResponse,
+    language: Language,
+    tts_service: Optional[TTSService],
+) -> NextMessageResponse:
+    """Async variant of `_attach_audio`."""
+    text = _spoken_text(response)
+    if tts_service and text:
+        try:
+            audio_path = await tts_service.asynthesize(text, language)
+            response.audio_url = tts_service.get_audio_url(audio_path) or None
+        except Exception as e:
+            print(f"✗ TTS error: {e}")
+    return response
 
 
 def _auto_fill_and_advance(
@@ -298,9 +633,8 @@ def _auto_fill_and_advance(
     validation: ValidationResult,
     audit: Dict[str, Any],
     language: Language,
-    tts_service: Optional[TTSService],
 ) -> NextMessageResponse:
-    """Auto-fill answer and advance to next parameter."""
+    """Auto-fill answer and advance to next parameter (audio is attached by the caller)."""
     print(f"✓ Auto-filling {current_param} with value: {validation.value}")
     
     # Update answers
@@ -315,20 +649,9 @@ def _auto_fill_and_advance(
     session.current_parameter = next_param
     
     if next_param:
-        # More parameters to collect
+        # More parameters to collect (ALL questions get audio)
         next_question = get_question_for_parameter(next_param, language)
         
-        # Generate TTS for next question (ALL questions get audio)
-        audio_url = ""
-        if tts_service:
-            print(f"🔊 Generating TTS for {next_param}: '{next_question[:50]}...'")
-            try:
-                audio_path = tts_service.synthesize(next_question, language)
-                audio_url = tts_service.get_audio_url(audio_path)
-                print(f"✓ TTS generated: {audio_url}")
-            except Exception as e:
-                print(f"✗ TTS error: {e}")
-        
         return NextMessageResponse(
             session_id=session.session_id,
             parameter=next_param,
@@ -338,7 +661,6 @@ def _auto_fill_and_advance(
             step_number=get_step_number(next_param),
             total_steps=len(PARAMETER_ORDER),
             helper_mode=False,
-            audio_url=audio_url if audio_url else None,
             audit=audit,
         )
     else:
@@ -487,22 +809,13 @@ def _create_error_response(
     session: SessionState,
     error_msg: str,
     language: Language,
-    tts_service: Optional[TTSService],
 ) -> NextMessageResponse:
-    """Create error response."""
+    """Create error response (audio is attached by the caller)."""
     if language == "hi":
         helper_text = f"माफ करें, {error_msg}। कृपया पुनः प्रयास करें।"
     else:
         helper_text = f"Sorry, {error_msg}. Please try again."
     
-    audio_url = ""
-    if tts_service:
-        try:
-            audio_path = tts_service.synthesize(helper_text, language)
-            audio_url = tts_service.get_audio_url(audio_path)
-        except:
-            pass
-    
     return NextMessageResponse(
         session_id=session.session_id,
         parameter=session.current_parameter,
@@ -512,5 +825,4 @@ def _create_error_response(
         step_number=get_step_number(session.current_parameter),
         total_steps=len(PARAMETER_ORDER),
         helper_mode=True,
-        audio_url=audio_url if audio_url else None,
     )
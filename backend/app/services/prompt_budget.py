@@ -0,0 +1,167 @@
+"""
+Token-budgeted prompt packing.
+
+The orchestrator retrieves the 10 best chunks for a helper question, and
+each adapter used to keep a fixed number of them (Ollama 3, Groq 5,
+Gemini all) whatever their length - so one long chunk could double a
+prompt, and prompt size drives both latency and cost. Instead, adapters
+pack the retrieved chunks into a token budget for their provider/model:
+chunks are taken in retrieval order (best first), duplicates dropped, a
+chunk that doesn't fit is skipped in favour of a shorter one further down,
+and if not even the best chunk fits it is truncated.
+
+Tokens are counted with a local tokenizer (`prompt_tokenizer`):
+- "heuristic" (default): no tokenizer; ~4 characters per token for ASCII
+  text and one token per character otherwise (Devanagari splits finely)
+- "tiktoken": a tiktoken encoding (`prompt_tokenizer_name`, default
+  cl100k_base - close to the Llama 3 vocabulary Groq serves); needs the
+  optional tiktoken package (commented out in requirements.txt)
+- "tokenizers": a Hugging Face tokenizer.json at `prompt_tokenizer_name`
+A tokenizer that can't be loaded falls back to the heuristic.
+
+Each helper prompt's size (budget, context and prompt tokens, chunks used)
+is added to the turn's LLM usage (llm_client.py), which the orchestrator
+puts in the audit next to the provider-reported prompt/completion tokens.
+
+To modify:
+- Budgets: `prompt_context_budget_tokens`, `prompt_context_budgets`
+  - e.g. PROMPT_CONTEXT_BUDGETS='{"groq": 700, "groq:llama-3.1-8b-instant": 400}'
+- Tokenizer: `prompt_tokenizer`, `prompt_tokenizer_name`
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+from ..config import settings
+
+
+CHUNK_SEPARATOR = "\n\n"
+
+
+class TokenCounter:
+    """Counts and truncates text in tokens of one local tokenizer."""
+
+    def __init__(self, backend: str, name: str):
+        self.backend = "heuristic"
+        self.name = "heuristic"
+        self._encoding: Any = None
+
+        try:
+            if backend == "tiktoken":
+                import tiktoken
+                self._encoding = tiktoken.get_encoding(name)
+            elif backend == "tokenizers":
+                from tokenizers import Tokenizer
+                self._encoding = Tokenizer.from_file(name)
+            else:
+                return
+            self.backend = backend
+            self.name = f"{backend}:{name}"
+        except Exception as e:
+            print(f"⚠ Prompt tokenizer {backend}:{name} unavailable, estimating tokens instead: {e}")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.backend == "tiktoken":
+            return len(self._encoding.encode(text, disallowed_special=()))
+        if self.backend == "tokenizers":
+            return len(self._encoding.encode(text, add_special_tokens=False).ids)
+        ascii_chars = sum(1 for char in text if ord(char) < 128)
+        return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """The longest prefix of text within max_tokens."""
+        if max_tokens <= 0:
+            return ""
+        if self.backend == "tiktoken":
+            return self._encoding.decode(self._encoding.encode(text, disallowed_special=())[:max_tokens])
+        if self.backend == "tokenizers":
+            offsets = self._encoding.encode(text, add_special_tokens=False).offsets
+            return text if len(offsets) <= max_tokens else text[:offsets[max_tokens - 1][1]]
+
+        low, high = 0, len(text)  # Heuristic: binary search on the prefix length
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low]
+
+
+class PackedContext:
+    """Retrieved chunks packed into a token budget."""
+
+    def __init__(self, chunks: List[str], offered: int, tokens: int, budget: int, truncated: bool):
+        self.chunks = chunks
+        self.text = CHUNK_SEPARATOR.join(chunks)
+        self.offered = offered
+        self.tokens = tokens
+        self.budget = budget
+        self.truncated = truncated
+
+    def audit(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "context_tokens": self.tokens,
+            "chunks_packed": len(self.chunks),
+            "chunks_retrieved": self.offered,
+            "truncated": self.truncated,
+        }
+
+
+# Global instance
+_token_counter: Optional[TokenCounter] = None
+_token_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """Process-wide token counter for `prompt_tokenizer`."""
+    global _token_counter
+    if _token_counter is None:
+        with _token_counter_lock:
+            if _token_counter is None:
+                _token_counter = TokenCounter(settings.prompt_tokenizer, settings.prompt_tokenizer_name)
+    return _token_counter
+
+
+def count_tokens(text: str) -> int:
+    return get_token_counter().count(text)
+
+
+def context_budget(provider: str, model: str) -> int:
+    """Context token budget for a provider/model ("provider:model", then "provider", then the default)."""
+    budgets = settings.prompt_context_budgets
+    return budgets.get(f"{provider}:{model}", budgets.get(provider, settings.prompt_context_budget_tokens))
+
+
+def pack_context(chunks: List[str], budget: int) -> PackedContext:
+    """
+    Pack chunks (best first) into `budget` tokens.
+
+    Args:
+        chunks: Retrieved chunks in rank order
+        budget: Token budget for the joined chunks (separators included)
+    """
+    counter = get_token_counter()
+    separator_tokens = counter.count(CHUNK_SEPARATOR)
+    packed: List[str] = []
+    seen = set()
+    used = 0
+    for chunk in chunks:
+        key = chunk.strip()
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        cost = counter.count(chunk) + (separator_tokens if packed else 0)
+        if used + cost <= budget:
+            packed.append(chunk)
+            used += cost
+
+    truncated = False
+    if not packed and seen and budget > 0:
+        best = next(chunk for chunk in chunks if chunk.strip())
+        packed = [counter.truncate(best, budget)]
+        used = counter.count(packed[0])
+        truncated = True
+    return PackedContext(packed, len(chunks), used, budget, truncated)
@@ -8,19 +8,352 @@ Loads FAISS index and metadata, retrieves relevant chunks based on:
 
 To modify:
 - Change embedding model: Update `embedding_model_name` in config.py
-- Change retrieval strategy: Modify `retrieve()` method
+- Change retrieval strategy: Modify `retrieve_many()` method
+- Tune hybrid search: `rag_overfetch_factor`, `rag_rrf_k`, `rag_lexical_skip_threshold`
 - Add new parameters: Ensure knowledge base chunks have correct metadata
+
+Hot reload across workers: the worker that loads a new generation (admin
+endpoint) writes its content id to kb_reload.json; every worker polls that
+marker (`kb_reload_poll_seconds`) and reloads when it names content it
+doesn't serve. The marker, not the manifest, is the trigger: a rebuild
+renames its files into place one by one, and only a generation that loaded
+and validated is published.
 """
 
 import os
-import pickle
 import json
-from typing import List, Dict, Any, Optional
+import hashlib
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 import faiss
-from sentence_transformers import SentenceTransformer
 from ..config import settings
 from ..models import Language
+from .kb_store import ChunkStore, load_chunk_store, save_json
+from .ann_index import configure_search, read_index_manifest
+from .lexical_index import LexicalIndex, reciprocal_rank_fusion
+from .embedding_service import EmbeddingService, get_embedding_service
+
+
+# Keywords used to decide whether a chunk is "about" a parameter (fuzzy match
+# against the chunk's parameter tag and the first 100 chars of its text)
+PARAM_KEYWORDS: Dict[str, List[str]] = {
+    "color": ["color", "रंग", "colour"],
+    "moisture": ["moisture", "नमी", "wet", "dry", "गीली", "सूखी"],
+    "smell": ["smell", "गंध", "odor", "scent"],
+    "ph": ["ph", "acid", "alkaline", "अम्ल", "क्षार"],
+    "soil_type": ["soil type", "मिट्टी", "clay", "sandy", "loamy", "चिकनी", "रेतीली"],
+    "earthworms": ["earthworm", "केंचुए", "worm"],
+    "location": ["location", "स्थान", "place"],
+    "fertilizer_used": ["fertilizer", "खाद", "manure"],
+}
+
+# Language ids for the precomputed per-chunk language array
+LANGUAGE_IDS: Dict[str, int] = {"en": 0, "hi": 1}
+
+# Vector over-fetch factor when no lexical index is available to fuse with
+LEGACY_OVERFETCH_FACTOR = 3
+
+# Written by the worker that loaded a new generation, polled by all workers
+RELOAD_MARKER_FILE = "kb_reload.json"
+
+
+class KBGeneration:
+    """
+    One immutable-once-loaded snapshot of the knowledge base.
+    
+    Holds the global index, shards, BM25 index, chunk metadata and the
+    precomputed scoring features. A hot reload builds a new generation and
+    RAGEngine swaps it in with a single reference assignment; requests that
+    already grabbed the old generation finish against it.
+    """
+    
+    def __init__(self, number: int):
+        """Create an empty generation (use `load()` to populate it)."""
+        self.number = number
+        self.loaded_at = time.time()
+        self.index: Optional[faiss.Index] = None
+        self.store: Optional[ChunkStore] = None
+        self.shards: Dict[Tuple[str, str], faiss.Index] = {}
+        self.index_info: Dict[str, Any] = {}  # Build manifest (index type, params)
+        self.content_id = ""  # Hash of chunk metadata + manifest (stable across restarts)
+        self.lexical: Optional[LexicalIndex] = None  # BM25 index (optional)
+        self.shard_masks: Dict[Tuple[str, str], np.ndarray] = {}
+        
+        # Static per-chunk features, computed once at load (see _build_chunk_features)
+        self._is_valid = np.zeros(0, dtype=bool)
+        self._is_how_to = np.zeros(0, dtype=bool)
+        self._is_json = np.zeros(0, dtype=bool)
+        self._language_id = np.zeros(0, dtype=np.int8)
+        self._param_match: Dict[str, np.ndarray] = {}
+    
+    @staticmethod
+    def _read_index(path: str) -> faiss.Index:
+        """
+        Read a FAISS index, memory-mapping it when enabled.
+        
+        With mmap, uvicorn workers on one host share the index pages instead
+        of each holding a private copy.
+        """
+        if not settings.kb_index_mmap:
+            index = faiss.read_index(path)
+        else:
+            flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            # Newer FAISS can also map flat code storage (IndexFlat*/IDMap shards)
+            flags |= getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+            try:
+                index = faiss.read_index(path, flags)
+            except RuntimeError as e:
+                print(f"⚠ mmap not supported for {os.path.basename(path)}, reading into memory: {e}")
+                index = faiss.read_index(path)
+        
+        # Query-time knobs (efSearch / nprobe) come from settings, not the build
+        configure_search(index)
+        return index
+    
+    @classmethod
+    def load(cls, embeddings_dir: str, number: int) -> Optional["KBGeneration"]:
+        """
+        Load FAISS index, shards, BM25 and chunk metadata from disk.
+        
+        Returns:
+            The loaded generation, or None if the index isn't built, failed to
+            load, or doesn't match the chunk metadata
+        """
+        index_path = os.path.join(embeddings_dir, "kb_index.faiss")
+        
+        if not os.path.exists(index_path):
+            print(f"⚠ Index files not found at {embeddings_dir}")
+            print("  Run preprocessing script first to build index.")
+            return None
+        
+        generation = cls(number)
+        try:
+            store = load_chunk_store(embeddings_dir, mmap=settings.kb_index_mmap)
+            if store is None:
+                print(f"⚠ Chunk metadata not found at {embeddings_dir}")
+                print("  Run preprocessing script first to build index.")
+                return None
+            generation.index = cls._read_index(index_path)
+            generation.store = store
+            if generation.index.ntotal != len(store):
+                # e.g. a rebuild still writing files, or artifacts from two builds
+                print(f"✗ FAISS index has {generation.index.ntotal} vectors but chunk metadata has {len(store)} chunks")
+                return None
+            generation.index_info = read_index_manifest(embeddings_dir)
+            generation.content_id = cls._content_id(store, generation.index_info)
+            index_type = generation.index_info.get("index_type", "flat")
+            print(f"✓ Loaded FAISS index with {generation.index.ntotal} chunks ({index_type}), generation {number}")
+        except Exception as e:
+            print(f"✗ Error loading index: {e}")
+            # Don't raise - allow app to start without RAG (helper mode won't work)
+            return None
+        
+        generation._load_shards(embeddings_dir)
+        for key, shard in generation.shards.items():
+            if not generation._ids_in_store(shard):
+                print(f"✗ Shard {key} has chunk ids outside the chunk metadata ({len(store)} chunks)")
+                return None
+        generation._build_chunk_features()
+        generation._load_lexical(embeddings_dir)
+        return generation
+    
+    def _ids_in_store(self, shard: faiss.Index) -> bool:
+        """Whether every chunk id a shard can return is a valid store row."""
+        id_map = getattr(shard, "id_map", None)
+        if id_map is None:
+            return shard.ntotal <= len(self.store)  # Ids are row positions
+        ids = faiss.vector_to_array(id_map)
+        return ids.size == 0 or (int(ids.min()) >= 0 and int(ids.max()) < len(self.store))
+    
+    @staticmethod
+    def _content_id(store: ChunkStore, index_info: Dict[str, Any]) -> str:
+        """
+        Identity of the KB content, unlike `number` the same after a restart.
+        
+        Persistent caches keyed by it (semantic_cache.py) stop matching as
+        soon as the KB is rebuilt with different chunks or index settings.
+        """
+        digest = hashlib.sha256(store.content_hash().encode("utf-8"))
+        digest.update(json.dumps(index_info, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()[:16]
+    
+    def _build_chunk_features(self) -> None:
+        """
+        Precompute static per-chunk scoring features as NumPy arrays.
+        
+        Everything retrieval used to derive from chunk text on every request
+        (keyword match per parameter, how-to flag, JSON flag, language) is
+        computed here once, indexed by chunk id. Texts stay in the store.
+        """
+        store = self.store
+        n = len(store)
+        params = self._chunk_params()
+        section_types = [store.value("section_type", i) for i in range(n)]
+        
+        is_valid = np.zeros(n, dtype=bool)
+        is_how_to = np.zeros(n, dtype=bool)
+        is_json = np.zeros(n, dtype=bool)
+        heads = []
+        for i, text in enumerate(store.iter_texts()):
+            lowered = text.lower()
+            heads.append(lowered[:100])
+            is_valid[i] = len(text) >= 20
+            is_how_to[i] = section_types[i] == "how_to_test" or "कैसे जांचें" in text or "how to" in lowered
+            is_json[i] = text.strip().startswith("{") or "```json" in text
+        
+        self._is_valid = is_valid
+        self._is_how_to = is_how_to
+        self._is_json = is_json
+        
+        # Map the store's language codes onto LANGUAGE_IDS with a lookup table
+        language_lookup = np.array([
+            LANGUAGE_IDS.get(lang, len(LANGUAGE_IDS)) for lang in store.vocab("language")
+        ], dtype=np.int8)
+        self._language_id = language_lookup[np.asarray(store.codes("language"))]
+        
+        # One match array per known parameter - the keyword test also looks at
+        # chunk text, so it can't be reduced to a plain parameter-id comparison
+        self._param_match = {}
+        for parameter in PARAM_KEYWORDS:
+            self._param_match[parameter] = self._match_keywords(parameter, params, heads)
+    
+    def _chunk_params(self) -> List[str]:
+        """Lowercased parameter tag of every chunk."""
+        vocab = [value.lower() for value in self.store.vocab("parameter")]
+        return [vocab[code] for code in self.store.codes("parameter")]
+    
+    @staticmethod
+    def _match_keywords(parameter: str, params: List[str], heads: List[str]) -> np.ndarray:
+        """Boolean array: does each chunk match the parameter's keywords."""
+        keywords = PARAM_KEYWORDS.get(parameter, [parameter])
+        return np.array([
+            any(kw in chunk_param or kw in head for kw in keywords)
+            for chunk_param, head in zip(params, heads)
+        ], dtype=bool)
+    
+    def _get_param_match(self, parameter: str) -> np.ndarray:
+        """Keyword-match array for a parameter (computed lazily for unknown ones)."""
+        match = self._param_match.get(parameter)
+        if match is None:
+            heads = [text.lower()[:100] for text in self.store.iter_texts()]
+            match = self._match_keywords(parameter, self._chunk_params(), heads)
+            self._param_match[parameter] = match
+        return match
+    
+    def _load_shards(self, embeddings_dir: str) -> None:
+        """
+        Load per-(parameter, language) sub-indexes listed in the shard manifest.
+        
+        Shards are optional: without them every query uses the global index.
+        """
+        manifest_path = os.path.join(embeddings_dir, "kb_index_shards.json")
+        if not os.path.exists(manifest_path):
+            print("  No shard manifest found - using global index only")
+            return
+        
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            
+            shards = {}
+            for entry in manifest.get("shards", []):
+                shard_path = os.path.join(embeddings_dir, entry["file"])
+                shards[(entry["parameter"], entry["language"])] = self._read_index(shard_path)
+            self.shards = shards
+            print(f"✓ Loaded {len(shards)} parameter/language shards")
+        except Exception as e:
+            print(f"⚠ Error loading shards, using global index only: {e}")
+            self.shards = {}
+    
+    def _load_lexical(self, embeddings_dir: str) -> None:
+        """
+        Load the BM25 index and per-shard chunk masks.
+        
+        Optional: without it retrieval is vector-only with the legacy over-fetch.
+        """
+        if not LexicalIndex.exists(embeddings_dir):
+            print("  No lexical index found - using vector search only")
+            return
+        
+        try:
+            lexical = LexicalIndex.load(embeddings_dir, mmap=settings.kb_index_mmap)
+            if lexical.n_docs != len(self.store):
+                print("⚠ Lexical index doesn't match chunk metadata, ignoring it")
+                return
+            
+            # Restrict lexical hits to the same buckets the FAISS shards cover
+            param_vocab = self.store.vocab("parameter")
+            lang_vocab = self.store.vocab("language")
+            param_codes = np.asarray(self.store.codes("parameter"))
+            lang_codes = np.asarray(self.store.codes("language"))
+            masks = {}
+            for parameter, language in self.shards:
+                if parameter in param_vocab and language in lang_vocab:
+                    masks[(parameter, language)] = (
+                        (param_codes == param_vocab.index(parameter))
+                        & (lang_codes == lang_vocab.index(language))
+                    )
+            
+            self.lexical = lexical
+            self.shard_masks = masks
+            print(f"✓ Loaded lexical index ({len(lexical.vocab)} terms)")
+        except Exception as e:
+            print(f"⚠ Error loading lexical index, using vector search only: {e}")
+            self.lexical = None
+            self.shard_masks = {}
+    
+    def score_candidates(
+        self,
+        chunk_ids: List[int],
+        parameter: str,
+        language: Language,
+    ) -> List[Tuple[float, int, str, str]]:
+        """
+        Re-rank candidate chunks with parameter/language/section boosts.
+        
+        Uses the precomputed feature arrays, so scoring is a single vectorized
+        expression over the candidate ids.
+        
+        Returns:
+            List of (score, chunk_id, text, language) sorted by score descending
+        """
+        if not chunk_ids:
+            return []
+        
+        ids = np.asarray(chunk_ids, dtype=np.int64)
+        
+        # Base score from similarity ranking
+        scores = 1.0 / np.arange(1, len(ids) + 1, dtype=np.float64)
+        
+        lang_id = LANGUAGE_IDS.get(language, len(LANGUAGE_IDS))
+        scores *= np.where(self._get_param_match(parameter)[ids], 2.0, 1.0)  # Parameter match
+        scores *= np.where(self._is_how_to[ids], 1.5, 1.0)  # "How to test" sections
+        scores *= np.where(self._language_id[ids] == lang_id, 1.3, 1.0)  # Matching language
+        scores *= np.where(self._is_json[ids], 0.1, 1.0)  # Penalize JSON/code chunks
+        
+        # Drop empty/very short chunks, then sort (stable, like the old list sort)
+        keep = np.flatnonzero(self._is_valid[ids])
+        order = keep[np.argsort(-scores[keep], kind="stable")]
+        
+        store = self.store
+        return [
+            (float(scores[j]), int(ids[j]), store.text(ids[j]), store.value("language", ids[j]))
+            for j in order
+        ]
+    
+    def info(self) -> Dict[str, Any]:
+        """Summary for /health and the admin endpoint."""
+        return {
+            "generation": self.number,
+            "content_id": self.content_id,
+            "loaded_at": self.loaded_at,
+            "chunks": len(self.store) if self.store is not None else 0,
+            "index_type": self.index_info.get("index_type", "flat"),
+            "shards": len(self.shards),
+            "lexical": self.lexical is not None,
+        }
 
 
 class RAGEngine:
@@ -28,57 +361,176 @@ class RAGEngine:
     RAG engine for retrieving relevant knowledge base chunks.
     
     Uses FAISS for fast similarity search and filters by parameter + language.
+    The index state lives in a KBGeneration that `reload()` can replace
+    while the server keeps serving.
     """
     
     def __init__(self):
         """Initialize RAG engine by loading index and embedding model."""
-        self.embedding_model: Optional[SentenceTransformer] = None
-        self.index: Optional[faiss.Index] = None
-        self.metadata: Dict[str, Dict[str, Any]] = {}
+        self.embeddings: EmbeddingService = get_embedding_service()  # Shared model + query cache
+        self.generation: Optional[KBGeneration] = None  # Swapped atomically by reload()
+        self.generation_counter = 0
+        self.lexical_skips = 0  # Queries answered without embedding
+        self._stats_lock = threading.Lock()  # retrieve_many runs on several pool threads
+        self._reload_lock = threading.Lock()  # One reload at a time
+        self._marker_mtime: Optional[int] = None  # Reload marker last acted on
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+        
         self._load_model()
         self._load_index()
     
     def _load_model(self) -> None:
-        """Load sentence transformer model for embeddings."""
-        try:
-            # Use HF token if provided (for private models)
-            model_kwargs = {}
-            if settings.hf_token:
-                model_kwargs["token"] = settings.hf_token
-            
-            self.embedding_model = SentenceTransformer(
-                settings.embedding_model_name,
-                **model_kwargs
-            )
-            print(f"✓ Loaded embedding model: {settings.embedding_model_name}")
-        except Exception as e:
-            print(f"✗ Error loading embedding model: {e}")
-            raise
+        """Load the shared embedding model (no-op if another component already did)."""
+        self.embeddings.load()
     
-    def _load_index(self) -> None:
-        """Load FAISS index and metadata from disk."""
-        # Resolve paths relative to backend/ directory
+    @staticmethod
+    def _embeddings_dir() -> str:
+        """Resolve embeddings_dir relative to backend/ directory."""
         backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        embeddings_dir = os.path.join(backend_dir, settings.embeddings_dir)
+        return os.path.join(backend_dir, settings.embeddings_dir)
+    
+    def _load_index(self) -> None:
+        """Load the first generation from disk."""
+        self.reload()
+    
+    def reload(self) -> Optional[KBGeneration]:
+        """
+        Load a new KB generation from disk and swap it in.
         
-        index_path = os.path.join(embeddings_dir, "kb_index.faiss")
-        meta_path = os.path.join(embeddings_dir, "kb_index_meta.pkl")
+        The new generation is fully built before the swap, which is a single
+        reference assignment; in-flight retrievals keep using the generation
+        they started with. If loading fails the current generation stays.
         
-        if not os.path.exists(index_path) or not os.path.exists(meta_path):
-            print(f"⚠ Index files not found at {embeddings_dir}")
-            print("  Run preprocessing script first to build index.")
+        Returns:
+            The new generation, or None if loading failed
+        """
+        with self._reload_lock:
+            number = self.generation_counter + 1
+            generation = KBGeneration.load(self._embeddings_dir(), number)
+            if generation is None:
+                return None
+            self.generation_counter = number
+            self.generation = generation
+            return generation
+    
+    def _marker_path(self) -> str:
+        return os.path.join(self._embeddings_dir(), RELOAD_MARKER_FILE)
+    
+    def publish_reload(self) -> None:
+        """Ask every other worker to load the content this one now serves."""
+        generation = self.generation
+        if generation is None:
             return
+        save_json(self._marker_path(), {
+            "content_id": generation.content_id,
+            "published_at": time.time(),
+            "pid": os.getpid(),
+        })
+    
+    def check_reload_marker(self) -> Optional[KBGeneration]:
+        """
+        Reload if the marker names KB content this worker doesn't serve.
+        
+        Each marker version is acted on once: if the load fails, the worker
+        keeps its generation until the next publish.
         
+        Returns:
+            The new generation, or None if nothing was (re)loaded
+        """
         try:
-            self.index = faiss.read_index(index_path)
-            with open(meta_path, "rb") as f:
-                self.metadata = pickle.load(f)
-            print(f"✓ Loaded FAISS index with {self.index.ntotal} chunks")
-        except Exception as e:
-            print(f"✗ Error loading index: {e}")
-            # Don't raise - allow app to start without RAG (helper mode won't work)
-            self.index = None
-            self.metadata = {}
+            mtime = os.stat(self._marker_path()).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime == self._marker_mtime:
+            return None
+        self._marker_mtime = mtime
+        
+        try:
+            with open(self._marker_path(), "r", encoding="utf-8") as f:
+                content_id = json.load(f).get("content_id")
+        except (OSError, ValueError) as e:
+            print(f"⚠ Unreadable KB reload marker, ignoring it: {e}")
+            return None
+        if not content_id or content_id == self.content_id:
+            return None
+        
+        print(f"🔄 KB {content_id} published by another worker - reloading")
+        generation = self.reload()
+        if generation is None:
+            print("✗ Published KB generation failed to load - still serving the previous one")
+        return generation
+    
+    def start_reload_watcher(self) -> None:
+        """Poll the reload marker in a daemon thread (`kb_reload_poll_seconds`, 0 disables)."""
+        interval = settings.kb_reload_poll_seconds
+        if interval <= 0 or self._watcher is not None:
+            return
+        
+        def watch() -> None:
+            while not self._watcher_stop.wait(interval):
+                try:
+                    self.check_reload_marker()
+                except Exception as e:
+                    print(f"⚠ KB reload watcher error: {e}")
+        
+        self._watcher_stop.clear()
+        self._watcher = threading.Thread(target=watch, name="kb-reload-watcher", daemon=True)
+        self._watcher.start()
+    
+    def stop_reload_watcher(self) -> None:
+        self._watcher_stop.set()
+        self._watcher = None
+    
+    # Read-only views of the current generation
+    @property
+    def index(self) -> Optional[faiss.Index]:
+        generation = self.generation
+        return generation.index if generation else None
+    
+    @property
+    def store(self) -> Optional[ChunkStore]:
+        generation = self.generation
+        return generation.store if generation else None
+    
+    @property
+    def shards(self) -> Dict[Tuple[str, str], faiss.Index]:
+        generation = self.generation
+        return generation.shards if generation else {}
+    
+    @property
+    def lexical(self) -> Optional[LexicalIndex]:
+        generation = self.generation
+        return generation.lexical if generation else None
+    
+    @property
+    def index_info(self) -> Dict[str, Any]:
+        generation = self.generation
+        return generation.index_info if generation else {}
+    
+    @property
+    def content_id(self) -> str:
+        generation = self.generation
+        return generation.content_id if generation else ""
+    
+    def _embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query, serving repeats from the shared LRU cache.
+        
+        Returns:
+            float32 array of shape (1, dim)
+        """
+        return self._embed_queries([query])
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed several queries in one batch via the shared embedding service."""
+        return self.embeddings.embed_queries(queries)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return embedding service counters plus lexical skips."""
+        stats = self.embeddings.stats()
+        stats["lexical_skips"] = self.lexical_skips
+        return stats
     
     def retrieve(
         self,
@@ -90,6 +542,10 @@ class RAGEngine:
         """
         Retrieve top-k relevant chunks for a query.
         
+        Queries are routed to the (parameter, language) shard when one
+        exists; the global index is only searched to top up a shard that
+        cannot fill k results on its own.
+        
         Args:
             query: User's question or context
             parameter: Current parameter being asked about
@@ -99,83 +555,148 @@ class RAGEngine:
         Returns:
             List of text chunks (strings) most relevant to query
         """
-        if self.index is None or self.embedding_model is None:
-            return []
+        return self.retrieve_many([query], [parameter], [language], k=k)[0]
+    
+    def retrieve_many(
+        self,
+        queries: List[str],
+        parameters: List[str],
+        languages: List[Language],
+        k: int = 4
+    ) -> List[List[str]]:
+        """
+        Retrieve top-k chunks for a batch of queries.
+        
+        Each query first gets a cheap BM25 pass; when its lexical confidence
+        clears `rag_lexical_skip_threshold` the query isn't embedded at all.
+        The remaining queries are embedded in one encode call, searched with
+        one multi-row search per shard (and one shared global top-up search),
+        and their vector hits are fused with the BM25 hits by reciprocal rank.
+        
+        Args:
+            queries: User questions or contexts
+            parameters: Parameter for each query
+            languages: Language preference for each query
+            k: Number of chunks to retrieve per query
+            
+        Returns:
+            One list of text chunks per query, in input order
+        """
+        if not (len(queries) == len(parameters) == len(languages)):
+            raise ValueError("queries, parameters and languages must have the same length")
         
-        # Embed the query
-        query_embedding = self.embedding_model.encode([query], convert_to_numpy=True)
-        query_embedding = query_embedding.astype('float32')
+        # Pin the current generation - a concurrent reload won't affect this call
+        gen = self.generation
+        if gen is None or gen.index is None or not self.embeddings.is_ready() or not queries:
+            return [[] for _ in queries]
         
-        # Search in FAISS
-        k_actual = min(k * 3, self.index.ntotal)  # Retrieve more, then filter
-        distances, indices = self.index.search(query_embedding, k_actual)
+        overfetch = settings.rag_overfetch_factor if gen.lexical else LEGACY_OVERFETCH_FACTOR
+        fetch = k * overfetch
+        n_queries = len(queries)
         
-        # Score and filter chunks with relaxed matching
-        scored_chunks = []
+        # Route each query to its (parameter, language) shard if one exists
+        routes: List[Optional[Tuple[str, str]]] = []
+        for key in zip(parameters, languages):
+            shard = gen.shards.get(key)
+            routes.append(key if shard is not None and shard.ntotal > 0 else None)
         
-        for i, idx in enumerate(indices[0]):
-            if idx < 0:  # Invalid index
-                continue
-            
-            chunk_id = str(idx)
-            chunk_meta = self.metadata.get(chunk_id, {})
-            
-            # Get chunk info
-            chunk_param = chunk_meta.get("parameter", "").lower()
-            chunk_lang = chunk_meta.get("language", "en")
-            chunk_text = chunk_meta.get("text", "")
-            chunk_type = chunk_meta.get("section_type", "")
-            
-            if not chunk_text or len(chunk_text) < 20:
-                continue
-            
-            # Calculate relevance score
-            score = 1.0 / (i + 1)  # Base score from similarity ranking
-            
-            # Boost for parameter match (fuzzy)
-            param_keywords = {
-                "color": ["color", "रंग", "colour"],
-                "moisture": ["moisture", "नमी", "wet", "dry", "गीली", "सूखी"],
-                "smell": ["smell", "गंध", "odor", "scent"],
-                "ph": ["ph", "acid", "alkaline", "अम्ल", "क्षार"],
-                "soil_type": ["soil type", "मिट्टी", "clay", "sandy", "loamy", "चिकनी", "रेतीली"],
-                "earthworms": ["earthworm", "केंचुए", "worm"],
-                "location": ["location", "स्थान", "place"],
-                "fertilizer_used": ["fertilizer", "खाद", "manure"],
-            }
-            
-            keywords = param_keywords.get(parameter, [parameter])
-            if any(kw in chunk_param or kw in chunk_text.lower()[:100] for kw in keywords):
-                score *= 2.0  # Strong boost for parameter match
-            
-            # Boost for "how to test" sections
-            if chunk_type == "how_to_test" or "कैसे जांचें" in chunk_text or "how to" in chunk_text.lower():
-                score *= 1.5
-            
-            # Boost for matching language
-            if chunk_lang == language:
-                score *= 1.3
-            
-            # Penalize JSON/code chunks
-            if chunk_text.strip().startswith("{") or "```json" in chunk_text:
-                score *= 0.1
-            
-            scored_chunks.append((score, chunk_text, chunk_lang))
+        # Lexical pass - confident rows skip embedding entirely
+        lexical_hits: List[List[int]] = [[] for _ in queries]
+        confident = [False] * n_queries
+        if gen.lexical is not None:
+            for row in range(n_queries):
+                mask = gen.shard_masks.get(routes[row]) if routes[row] else None
+                lexical_hits[row], confidence = gen.lexical.search(queries[row], fetch, mask)
+                confident[row] = (
+                    confidence >= settings.rag_lexical_skip_threshold
+                    and len(lexical_hits[row]) >= k
+                )
+            with self._stats_lock:
+                self.lexical_skips += sum(confident)
+        
+        # Embed the remaining queries (cached - helper queries repeat per parameter/language)
+        embed_rows = [row for row in range(n_queries) if not confident[row]]
+        embedding_row: Dict[int, int] = {row: i for i, row in enumerate(embed_rows)}
+        query_embeddings = self._embed_queries([queries[row] for row in embed_rows]) if embed_rows else None
+        
+        results: List[List[str]] = [[] for _ in queries]
+        seen_ids: List[set] = [set() for _ in queries]
         
-        # Sort by score and return top k
-        scored_chunks.sort(key=lambda x: x[0], reverse=True)
+        # Fast path: search only the pre-filtered shard for each parameter/language
+        by_shard: Dict[Tuple[str, str], List[int]] = {}
+        for row, route in enumerate(routes):
+            if route is not None:
+                by_shard.setdefault(route, []).append(row)
         
-        # Prefer same language but include others if needed
-        same_lang_chunks = [text for score, text, lang in scored_chunks if lang == language]
-        other_lang_chunks = [text for score, text, lang in scored_chunks if lang != language]
+        for (parameter, language), rows in by_shard.items():
+            vector_hits = self._vector_hits(gen.shards[(parameter, language)], rows, embedding_row, query_embeddings, fetch)
+            for row in rows:
+                ids = self._fuse(vector_hits.get(row, []), lexical_hits[row])
+                for score, chunk_id, text, lang in gen.score_candidates(ids, parameter, language):
+                    results[row].append(text)
+                    seen_ids[row].add(chunk_id)
         
-        result = same_lang_chunks[:k]
-        if len(result) < k:
-            result.extend(other_lang_chunks[:k - len(result)])
+        # Fallback: global index with the relaxed parameter/language scoring
+        pending = [row for row in range(n_queries) if len(results[row]) < k]
+        if pending:
+            vector_hits = self._vector_hits(gen.index, pending, embedding_row, query_embeddings, fetch)
+            for row in pending:
+                global_lexical = []
+                if gen.lexical is not None:
+                    if routes[row] is None:
+                        global_lexical = lexical_hits[row]  # Already searched unmasked
+                    else:
+                        global_lexical, _ = gen.lexical.search(queries[row], fetch)
+                ids = self._fuse(vector_hits.get(row, []), global_lexical)
+                ids = [chunk_id for chunk_id in ids if chunk_id not in seen_ids[row]]
+                language = languages[row]
+                scored_chunks = gen.score_candidates(ids, parameters[row], language)
+                
+                # Prefer same language but include others if needed
+                same_lang_chunks = [text for score, _, text, lang in scored_chunks if lang == language]
+                other_lang_chunks = [text for score, _, text, lang in scored_chunks if lang != language]
+                
+                result = results[row]
+                result.extend(same_lang_chunks[:k - len(result)])
+                if len(result) < k:
+                    result.extend(other_lang_chunks[:k - len(result)])
         
-        return result[:k]
+        return [result[:k] for result in results]
+    
+    def _vector_hits(
+        self,
+        index: faiss.Index,
+        rows: List[int],
+        embedding_row: Dict[int, int],
+        query_embeddings: Optional[np.ndarray],
+        fetch: int,
+    ) -> Dict[int, List[int]]:
+        """One multi-row search for the rows that were embedded; ids per row."""
+        rows = [row for row in rows if row in embedding_row]
+        if not rows:
+            return {}
+        id_lists = self._search(index, query_embeddings[[embedding_row[row] for row in rows]], fetch)
+        return dict(zip(rows, id_lists))
+    
+    @staticmethod
+    def _fuse(vector_ids: List[int], lexical_ids: List[int]) -> List[int]:
+        """Reciprocal-rank fusion of vector and BM25 hits (vector-only if no BM25 hits)."""
+        if not lexical_ids:
+            return vector_ids
+        if not vector_ids:
+            return lexical_ids
+        return reciprocal_rank_fusion([vector_ids, lexical_ids], k=settings.rag_rrf_k)
+    
+    @staticmethod
+    def _search(index: faiss.Index, query_embeddings: np.ndarray, k: int) -> List[List[int]]:
+        """Search an index with one or more query rows; return valid ids per row."""
+        k_actual = min(k, index.ntotal)
+        if k_actual <= 0:
+            return [[] for _ in range(len(query_embeddings))]
+        _, indices = index.search(query_embeddings, k_actual)
+        return [[int(idx) for idx in row if idx >= 0] for row in indices]
     
     def is_ready(self) -> bool:
         """Check if RAG engine is ready (index and model loaded)."""
-        return self.index is not None and self.embedding_model is not None
-
+        generation = self.generation
+        return generation is not None and generation.index is not None and self.embeddings.is_ready()
@@ -8,9 +8,8 @@ import logging
 import re
 from typing import Dict, Any, List
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
-from ..config import settings
+from .llm_client import get_llm_client
 
 logger = logging.getLogger(__name__)
 
@@ -26,27 +25,25 @@ class ReportOrchestrator:
     def __init__(self):
         """Initialize the three specialized agents - all using Groq for speed and reliability"""
         
-        # All agents use Groq for fast, reliable generation
+        # All agents use Groq for fast, reliable generation (pooled connections via llm_client;
+        # keys are leased per call from the Groq key pool)
         # Agent 1: Soil Analysis
-        self.soil_analysis_agent = ChatGroq(
+        self.soil_analysis_agent = get_llm_client().chat_groq(
             model="llama-3.3-70b-versatile",
-            groq_api_key=settings.groq_llm_api_key,  # Use existing Groq key
             temperature=0.3,
             max_tokens=2000
         )
         
         # Agent 2: Crop Recommendations
-        self.crop_agent = ChatGroq(
+        self.crop_agent = get_llm_client().chat_groq(
             model="llama-3.3-70b-versatile",
-            groq_api_key=settings.groq_llm_api_key,
             temperature=0.4,
             max_tokens=2000
         )
         
         # Agent 3: Fertilizer Recommendations
-        self.fertilizer_agent = ChatGroq(
+        self.fertilizer_agent = get_llm_client().chat_groq(
             model="llama-3.3-70b-versatile",
-            groq_api_key=settings.groq_report_api_key if settings.groq_report_api_key else settings.groq_llm_api_key,
             temperature=0.4,
             max_tokens=2000
         )
@@ -144,7 +141,7 @@ Provide comprehensive soil analysis in JSON format."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.soil_analysis_agent.ainvoke(messages)
+            response = await get_llm_client().ainvoke(self.soil_analysis_agent, messages, call_site="report.soil")
             cleaned = self._clean_json_response(response.content)
             result = json.loads(cleaned)
             
@@ -240,7 +237,7 @@ Return JSON array with 6 crop recommendations."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.crop_agent.ainvoke(messages)
+            response = await get_llm_client().ainvoke(self.crop_agent, messages, call_site="report.crops")
             cleaned = self._clean_json_response(response.content)
             result = json.loads(cleaned)
             
@@ -349,7 +346,7 @@ Return JSON array with 6 fertilizer recommendations."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.fertilizer_agent.ainvoke(messages)
+            response = await get_llm_client().ainvoke(self.fertilizer_agent, messages, call_site="report.fertilizer")
             cleaned = self._clean_json_response(response.content)
             result = json.loads(cleaned)
             
@@ -4,9 +4,8 @@ Translates English reports to Hindi using LLM
 """
 import logging
 from typing import Dict, Any, List
-from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
-from ..config import settings
+from .llm_client import get_llm_client
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +15,8 @@ class ReportTranslator:
     
     def __init__(self):
         """Initialize translation agent"""
-        self.translator = ChatGroq(
+        self.translator = get_llm_client().chat_groq(
             model="llama-3.3-70b-versatile",
-            groq_api_key=settings.groq_llm_api_key,
             temperature=0.2,  # Low temperature for consistent translation
             max_tokens=3000
         )
@@ -49,7 +47,7 @@ Return the translated JSON with same structure."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.translator.ainvoke(messages)
+            response = await get_llm_client().ainvoke(self.translator, messages, call_site="report.translate")
             
             # Parse response - try to extract JSON
             import json
@@ -100,7 +98,7 @@ Return the translated JSON array with same structure."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.translator.ainvoke(messages)
+            response = await get_llm_client().ainvoke(self.translator, messages, call_site="report.translate")
             
             import json
             import re
@@ -147,7 +145,7 @@ Return the translated JSON array with same structure."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.translator.ainvoke(messages)
+            response = await get_llm_client().ainvoke(self.translator, messages, call_site="report.translate")
             
             import json
             import re
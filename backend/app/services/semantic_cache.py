@@ -0,0 +1,282 @@
+"""
+Semantic cache for helper and extraction LLM calls.
+
+The exact-match helper cache (helper_cache.py) misses paraphrases: "how to
+check colour", "colour kaise dekhe" and "रंग कैसे पता करें" are the same
+question. This cache embeds the farmer's message (the shared embedding
+model, through its query cache) and looks for a previous message about the
+same parameter, in the same language, whose cosine similarity reaches a
+threshold; on a hit the previous result is reused:
+- "helper": the helper text - checked before retrieval, so a hit skips
+  both the RAG lookup and the LLM call
+- "extraction": the (value, confidence) the LLM extracted. Messages that
+  differ only in the answer ("it is black" / "it is red") embed very
+  closely, so this threshold is higher and a hit is refused when the new
+  message names a different value (or a synonym of one) than the cached one,
+  or different numbers ("pH is 5.5" / "pH is 8.2")
+
+Buckets are (kind, namespace, parameter, language); the namespace holds the
+provider/model and, for helper texts, the KB content id (a hash of the
+chunk metadata and index manifest), so a model switch or a KB rebuild -
+also one followed by a restart - starts clean. Every hit is logged and
+reported in the audit.
+
+Stores (`semantic_cache_store`):
+- "memory": per process
+- "sqlite": also written to `semantic_cache_path`; a bucket is loaded from
+  disk the first time a process uses it, so entries survive restarts and
+  are shared with workers started later
+
+To modify:
+- Thresholds: `semantic_cache_helper_threshold`, `semantic_cache_extraction_threshold`
+- Capacity / lifetime: `semantic_cache_max_entries` (per bucket), `semantic_cache_ttl_seconds`
+- Disable: `semantic_cache_enabled = False`
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from ..config import settings
+from .embedding_service import get_embedding_service
+
+
+BucketKey = Tuple[str, str, str, str]  # (kind, namespace, parameter, language)
+
+# Integers and decimals, in any script's digits (float() accepts "५.५")
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)?")
+
+# Extraction hit of the current request, for the audit (set by the answer extractor)
+semantic_extraction_hit: ContextVar[Optional[Dict[str, Any]]] = ContextVar("semantic_extraction_hit", default=None)
+
+
+class SemanticHit:
+    """A cache hit: the cached payload and what it matched."""
+
+    def __init__(self, payload: Any, similarity: float, matched_message: str):
+        self.payload = payload
+        self.similarity = similarity
+        self.matched_message = matched_message
+
+    def audit(self, kind: str) -> Dict[str, Any]:
+        return {
+            "kind": kind,
+            "similarity": round(self.similarity, 3),
+            "matched_message": self.matched_message,
+        }
+
+
+class _Bucket:
+    """Unit-norm vectors and payloads of one (kind, namespace, parameter, language)."""
+
+    def __init__(self, dimension: int):
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        self.messages: List[str] = []
+        self.payloads: List[Any] = []
+        self.expires_at: List[float] = []
+
+    def add(self, vector: np.ndarray, message: str, payload: Any, expires_at: float, max_entries: int) -> None:
+        self.vectors = np.vstack([self.vectors, vector[None, :]])
+        self.messages.append(message)
+        self.payloads.append(payload)
+        self.expires_at.append(expires_at)
+        if len(self.messages) > max_entries:
+            # Oldest first
+            drop = len(self.messages) - max_entries
+            self.vectors = self.vectors[drop:]
+            del self.messages[:drop], self.payloads[:drop], self.expires_at[:drop]
+
+    def best(self, vector: np.ndarray, now: float) -> Tuple[int, float]:
+        """Row and cosine similarity of the closest live entry (-1 if none)."""
+        if not self.messages:
+            return -1, 0.0
+        similarities = self.vectors @ vector
+        similarities[np.asarray(self.expires_at) <= now] = -1.0
+        row = int(np.argmax(similarities))
+        return (row, float(similarities[row])) if similarities[row] > -1.0 else (-1, 0.0)
+
+
+class SemanticCache:
+    """Thread-safe semantic cache over the shared embedding model."""
+
+    def __init__(self, store: str, path: str, max_entries: int, ttl_seconds: float):
+        self.store = store
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._buckets: Dict[BucketKey, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+        if self.store == "sqlite":
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                connection = self._connection()
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS semantic_cache ("
+                    " kind TEXT NOT NULL,"
+                    " namespace TEXT NOT NULL,"
+                    " parameter TEXT NOT NULL,"
+                    " language TEXT NOT NULL,"
+                    " message TEXT NOT NULL,"
+                    " vector BLOB NOT NULL,"
+                    " payload TEXT NOT NULL,"
+                    " expires_at REAL NOT NULL"
+                    ")"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS semantic_cache_bucket"
+                    " ON semantic_cache (kind, namespace, parameter, language)"
+                )
+                connection.commit()
+            except sqlite3.Error as e:
+                print(f"⚠ Semantic cache falling back to memory ({path}): {e}")
+                self.store = "memory"
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def embed(message: str) -> np.ndarray:
+        """Unit-norm embedding of a message (CPU-bound; served from the query cache on repeats)."""
+        vector = get_embedding_service().embed_queries([message])[0].astype(np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def _bucket(self, key: BucketKey, dimension: int) -> _Bucket:
+        """Bucket for key, loaded from disk on first use (caller holds the lock)."""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            return bucket
+
+        bucket = _Bucket(dimension)
+        if self.store == "sqlite":
+            try:
+                rows = self._connection().execute(
+                    "SELECT message, vector, payload, expires_at FROM semantic_cache"
+                    " WHERE kind = ? AND namespace = ? AND parameter = ? AND language = ? AND expires_at > ?"
+                    " ORDER BY rowid",
+                    (*key, time.time()),
+                ).fetchall()
+                for message, blob, payload, expires_at in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    if len(vector) == dimension:
+                        bucket.add(vector, message, json.loads(payload), expires_at, self.max_entries)
+            except sqlite3.Error as e:
+                print(f"⚠ Semantic cache read failed: {e}")
+        self._buckets[key] = bucket
+        return bucket
+
+    def lookup(self, key: BucketKey, vector: np.ndarray, threshold: float) -> Optional[SemanticHit]:
+        """Closest cached entry at or above the threshold, if any."""
+        kind = key[0]
+        with self._lock:
+            bucket = self._bucket(key, len(vector))
+            row, similarity = bucket.best(vector, time.time())
+            if row >= 0 and similarity >= threshold:
+                self.hits[kind] = self.hits.get(kind, 0) + 1
+                return SemanticHit(bucket.payloads[row], similarity, bucket.messages[row])
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+            return None
+
+    def reject(self, kind: str) -> None:
+        """A hit the caller refused counts as a miss."""
+        with self._lock:
+            self.hits[kind] -= 1
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+
+    def add(self, key: BucketKey, message: str, vector: np.ndarray, payload: Any) -> None:
+        """Remember a result (payload must be JSON-serializable)."""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._bucket(key, len(vector)).add(vector, message, payload, expires_at, self.max_entries)
+
+        if self.store == "sqlite":
+            try:
+                connection = self._connection()
+                with connection:
+                    connection.execute(
+                        "INSERT INTO semantic_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (*key, message, vector.astype(np.float32).tobytes(), json.dumps(payload, ensure_ascii=False), expires_at),
+                    )
+                    connection.execute("DELETE FROM semantic_cache WHERE expires_at <= ?", (time.time(),))
+            except sqlite3.Error as e:
+                print(f"⚠ Semantic cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hits/misses per kind for this process."""
+        with self._lock:
+            kinds = sorted(set(self.hits) | set(self.misses))
+            return {
+                "store": self.store,
+                "entries": sum(len(bucket.messages) for bucket in self._buckets.values()),
+                **{
+                    kind: {
+                        "hits": self.hits.get(kind, 0),
+                        "misses": self.misses.get(kind, 0),
+                        "hit_rate": round(self.hits.get(kind, 0) / max(1, self.hits.get(kind, 0) + self.misses.get(kind, 0)), 3),
+                    }
+                    for kind in kinds
+                },
+            }
+
+
+def names_other_value(message: str, cached_value: Optional[str], synonyms: Dict[str, str]) -> bool:
+    """Whether the message mentions a value (synonym -> value) other than the cached one."""
+    normalized = message.lower()
+    return any(
+        value != cached_value and word.replace("_", " ") in normalized
+        for word, value in synonyms.items()
+    )
+
+
+def _numbers(message: str) -> List[float]:
+    """Numbers in a message, in order ("5.5", "5,5" and "५.५" are the same)."""
+    return [float(match.replace(",", ".")) for match in NUMBER_PATTERN.findall(message)]
+
+
+def numbers_differ(message: str, cached_message: str) -> bool:
+    """Whether the two messages mention different numbers."""
+    return _numbers(message) != _numbers(cached_message)
+
+
+# Global instance
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Process-wide semantic cache (None when disabled)."""
+    global _semantic_cache
+    if not settings.semantic_cache_enabled:
+        return None
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticCache(
+                    store=settings.semantic_cache_store,
+                    path=settings.semantic_cache_path,
+                    max_entries=settings.semantic_cache_max_entries,
+                    ttl_seconds=settings.semantic_cache_ttl_seconds,
+                )
+    return _semantic_cache
+
+
+def log_hit(kind: str, parameter: str, language: str, message: str, hit: SemanticHit) -> None:
+    print(
+        f"♻️  Semantic {kind} cache hit [{parameter}/{language}] "
+        f"'{message}' ~ '{hit.matched_message}' (similarity {hit.similarity:.3f})"
+    )
@@ -0,0 +1,133 @@
+"""
+Request coalescing ("singleflight") for identical in-flight calls.
+
+When a village training session starts, dozens of farmers ask for help on
+the same parameter within seconds, and every one of them produces the same
+LLM request. The first caller for a key (the leader) makes the call; callers
+that arrive while it is in flight wait for it and get the same result or
+the same exception. Nothing is cached: once the call finishes, the next
+caller starts a new one.
+
+- `SingleFlight`: for threads (sync call paths, blocking-pool work)
+- `AsyncSingleFlight`: for coroutines on one event loop. The call runs as
+  its own task, so a caller that is cancelled (client disconnected, hedged
+  request lost) does not cancel it for the others - but once every caller
+  has left, the call is cancelled too, so an abandoned request releases its
+  connection and key lease instead of running on unobserved
+
+Used by `LLMClient` (llm_client.py), keyed on a fingerprint of the request.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """One in-flight call shared by its waiters (threads)."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls made from threads."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], T], on_shared: Optional[Callable[[], None]] = None) -> T:
+        """
+        Run `func` unless a call for `key` is already in flight.
+
+        Args:
+            key: Request identity
+            func: The call
+            on_shared: Called when this caller joins another caller's call
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if on_shared is not None:
+                on_shared()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+class _AsyncFlight:
+    """One in-flight call (a task) and the number of coroutines awaiting it."""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """Coalesce concurrent identical calls made from coroutines."""
+
+    def __init__(self):
+        self._flights: Dict[str, _AsyncFlight] = {}
+
+    async def do(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[T]],
+        on_shared: Optional[Callable[[], None]] = None,
+    ) -> T:
+        """Async `SingleFlight.do`; the call is cancelled when its last caller is."""
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        if flight is not None and flight.task.get_loop() is loop:
+            if on_shared is not None:
+                on_shared()
+        else:
+            flight = _AsyncFlight(loop.create_task(func()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda done: self._forget(key, flight))
+
+        flight.waiters += 1
+        try:
+            # shield: cancelling this caller must not cancel the call for the others
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left to get the result; later callers start a new call
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _AsyncFlight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if flight.task.done() and not flight.task.cancelled():
+            flight.task.exception()  # Retrieved here so an unawaited failure isn't logged as "never retrieved"
+
+    def in_flight(self) -> int:
+        return len(self._flights)
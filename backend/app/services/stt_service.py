@@ -7,6 +7,9 @@ Provides ASR (Automatic Speech Recognition) with multiple provider support:
 - OpenAI Whisper API (fallback)
 
 Returns ASRResult with text, confidence, and detected language.
+
+Groq Whisper keys are leased per call from the "groq.whisper" key pool
+(key_pool.py), which holds every configured Groq key.
 """
 
 import os
@@ -14,6 +17,9 @@ import tempfile
 from typing import Optional, Literal
 from pydantic import BaseModel
 from ..config import settings
+from .blocking_pool import run_blocking
+from .llm_client import get_llm_client
+from .key_pool import get_key_pool
 
 
 class ASRResult(BaseModel):
@@ -41,14 +47,13 @@ class STTService:
         """Initialize the selected ASR provider."""
         if self.provider == "groq":
             try:
-                from groq import Groq
-                api_key = getattr(settings, 'groq_api_key', None)
-                if not api_key:
+                import groq  # noqa: F401
+                if not len(get_key_pool("groq.whisper")):
                     print("⚠️  Groq API key not found, falling back to local Whisper")
                     self.provider = "local_whisper"
                     self._init_provider()
                     return
-                self.client = Groq(api_key=api_key)
+                self._groq_clients = {}  # Sync SDK client per key
                 print(f"✓ Initialized Groq STT")
             except Exception as e:
                 print(f"⚠️  Groq initialization failed: {e}, falling back to local Whisper")
@@ -101,6 +106,22 @@ class STTService:
         else:
             raise ValueError(f"Unknown ASR provider: {self.provider}")
     
+    async def atranscribe(
+        self,
+        audio_bytes: bytes,
+        language: Optional[Literal["hi", "en"]] = None
+    ) -> ASRResult:
+        """
+        Async variant of `transcribe` for the async request path.
+        
+        Groq Whisper is called with the SDK's async client over the shared
+        connection pool; local Whisper (CPU) and the OpenAI SDK run on the
+        blocking pool.
+        """
+        if self.provider == "groq":
+            return await self._atranscribe_groq(audio_bytes, language)
+        return await run_blocking(self.transcribe, audio_bytes, language)
+    
     def _transcribe_groq(
         self,
         audio_bytes: bytes,
@@ -115,23 +136,21 @@ class STTService:
             
             try:
                 # Call Groq Whisper
-                with open(temp_path, "rb") as audio_file:
-                    transcription = self.client.audio.transcriptions.create(
-                        file=audio_file,
-                        model="whisper-large-v3",
-                        language=self._map_language(language) if language else None,
-                        response_format="verbose_json"
-                    )
-                
-                # Extract confidence from segments if available
-                confidence = self._estimate_confidence_groq(transcription)
+                lease = get_key_pool("groq.whisper").acquire()
+                try:
+                    with open(temp_path, "rb") as audio_file:
+                        transcription = self._groq_client(lease.key).audio.transcriptions.create(
+                            file=audio_file,
+                            model="whisper-large-v3",
+                            language=self._map_language(language) if language else None,
+                            response_format="verbose_json"
+                        )
+                except Exception as e:
+                    lease.finish(error=e)
+                    raise
+                lease.finish()
                 
-                return ASRResult(
-                    text=transcription.text.strip(),
-                    asr_confidence=confidence,
-                    detected_language=language or transcription.language if hasattr(transcription, 'language') else None,
-                    provider="groq"
-                )
+                return self._groq_result(transcription, language)
             finally:
                 # Clean up temp file
                 if os.path.exists(temp_path):
@@ -147,6 +166,58 @@ class STTService:
                 provider="groq_error"
             )
     
+    async def _atranscribe_groq(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None
+    ) -> ASRResult:
+        """Transcribe using Groq Whisper API (async SDK client, no temp file)."""
+        try:
+            lease = await get_key_pool("groq.whisper").aacquire()
+            try:
+                transcription = await self._groq_client(lease.key, is_async=True).audio.transcriptions.create(
+                    file=("audio.wav", audio_bytes),
+                    model="whisper-large-v3",
+                    language=self._map_language(language) if language else None,
+                    response_format="verbose_json"
+                )
+            except Exception as e:
+                lease.finish(error=e)
+                raise
+            lease.finish()
+            return self._groq_result(transcription, language)
+        
+        except Exception as e:
+            print(f"✗ Groq transcription error: {e}")
+            return ASRResult(
+                text="",
+                asr_confidence=0.0,
+                detected_language=language,
+                provider="groq_error"
+            )
+    
+    def _groq_client(self, api_key: str, is_async: bool = False):
+        """Groq SDK client for a pooled key (async clients share the LLM connection pool, so aren't kept)."""
+        from groq import AsyncGroq, Groq
+        if is_async:
+            return AsyncGroq(api_key=api_key, http_client=get_llm_client().async_http)
+        client = self._groq_clients.get(api_key)
+        if client is None:
+            client = self._groq_clients[api_key] = Groq(api_key=api_key)
+        return client
+    
+    def _groq_result(self, transcription, language: Optional[str]) -> ASRResult:
+        """Build an ASRResult from a Groq verbose_json transcription."""
+        # Extract confidence from segments if available
+        confidence = self._estimate_confidence_groq(transcription)
+        
+        return ASRResult(
+            text=transcription.text.strip(),
+            asr_confidence=confidence,
+            detected_language=language or transcription.language if hasattr(transcription, 'language') else None,
+            provider="groq"
+        )
+    
     def _transcribe_local(
         self,
         audio_bytes: bytes,
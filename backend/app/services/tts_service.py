@@ -11,10 +11,12 @@ Returns audio file path for playback.
 
 import os
 import hashlib
+import uuid
 from pathlib import Path
 from typing import Literal, Optional
 from gtts import gTTS
 from ..config import settings
+from .blocking_pool import run_blocking
 
 
 class TTSService:
@@ -95,6 +97,30 @@ class TTSService:
         else:
             raise ValueError(f"Unknown TTS provider: {self.provider}")
     
+    async def asynthesize(
+        self,
+        text: str,
+        language: Literal["hi", "en"] = "en",
+        slow: bool = False
+    ) -> str:
+        """
+        Async variant of `synthesize` for the async request path.
+        
+        Cached gTTS audio is returned without leaving the event loop; synthesis
+        itself (gTTS/OpenAI SDK network calls, Coqui on CPU) runs on the
+        blocking pool, since none of them has an async API.
+        """
+        if self.provider == "gtts":
+            filename = self._gtts_filename(text, language, slow)
+            if (self.audio_dir / filename).exists():
+                return f"audio/{filename}"
+        return await run_blocking(self.synthesize, text, language, slow)
+    
+    def _gtts_filename(self, text: str, language: str, slow: bool) -> str:
+        """Cache filename for a gTTS synthesis (hash of text, language, speed)."""
+        text_hash = hashlib.md5(f"{text}_{language}_{slow}".encode()).hexdigest()[:12]
+        return f"tts_{text_hash}.mp3"
+    
     def _synthesize_gtts(
         self,
         text: str,
@@ -104,8 +130,7 @@ class TTSService:
         """Synthesize using gTTS."""
         try:
             # Generate unique filename based on text hash
-            text_hash = hashlib.md5(f"{text}_{language}_{slow}".encode()).hexdigest()[:12]
-            filename = f"tts_{text_hash}.mp3"
+            filename = self._gtts_filename(text, language, slow)
             filepath = self.audio_dir / filename
             
             # Check if already exists (cache)
@@ -117,8 +142,11 @@ class TTSService:
             gtts_lang = lang_map.get(language, "en")
             
             # Generate speech
+            # Write to a temp file first: concurrent requests may synthesize the same text
             tts = gTTS(text=text, lang=gtts_lang, slow=slow)
-            tts.save(str(filepath))
+            tmp_path = filepath.with_name(f"{filename}.{uuid.uuid4().hex}.tmp")
+            tts.save(str(tmp_path))
+            os.replace(tmp_path, filepath)
             
             return f"audio/{filename}"
         
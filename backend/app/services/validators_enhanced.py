@@ -36,13 +36,14 @@ class SemanticValidator:
             use_embeddings: Whether to use sentence embeddings for matching
         """
         self.use_embeddings = use_embeddings
-        self.model = None
+        self.model = None  # Shared EmbeddingService (same model as the RAG engine)
         
         if use_embeddings:
             try:
-                from sentence_transformers import SentenceTransformer
-                from ..config import settings
-                self.model = SentenceTransformer(settings.embedding_model_name)
+                from .embedding_service import get_embedding_service
+                service = get_embedding_service()
+                service.load()
+                self.model = service
                 print("✓ Semantic validator initialized with embeddings")
             except Exception as e:
                 print(f"⚠️  Could not load embeddings for validator: {e}")
@@ -60,9 +61,8 @@ class SemanticValidator:
             return self._fuzzy_match(text1, text2)
         
         try:
-            # Compute embeddings
-            emb1 = self.model.encode([text1], convert_to_numpy=True)[0]
-            emb2 = self.model.encode([text2], convert_to_numpy=True)[0]
+            # Compute both embeddings in one batch (synonyms repeat, so they hit the cache)
+            emb1, emb2 = self.model.embed_queries([text1, text2])
             
             # Cosine similarity
             import numpy as np
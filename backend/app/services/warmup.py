@@ -0,0 +1,175 @@
+"""
+Background warm-up of heavy components, with readiness tracking.
+
+Runs once at startup (off the event loop):
+1. Load the RAG engine (embedding model, FAISS index, shards, BM25)
+2. Dummy encode + dummy search per language, so the first real request
+   doesn't pay for lazy allocation, first-call kernel setup or page faults
+   on the memory-mapped index
+3. Run each enhanced validator once, pre-embedding its synonyms into the
+   shared query-embedding cache
+4. Load the prompt tokenizer (tiktoken may fetch its encoding file once)
+
+`/ready` in main.py reports `warmup_status`; it only turns 200 once warm-up
+has finished and the RAG engine has a KB loaded. Warm-up fails when no KB
+could be loaded (the engine is still handed to the routes, so a KB loaded
+later by a reload makes the worker ready). Steps 3-4 only warm caches: if
+one of them fails it is recorded as a warning.
+
+To modify:
+- Add a warm-up step: append to `run_warmup()` and record it with `_step()`
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+from ..models import Language
+from .rag_engine import RAGEngine
+
+
+# One representative query per language (Hindi / English)
+WARMUP_QUERIES: Dict[Language, str] = {
+    "en": "How do I check soil color?",
+    "hi": "मिट्टी का रंग कैसे देखें?",
+}
+
+
+class WarmupStatus:
+    """Thread-safe warm-up progress: pending -> running -> ready | failed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "pending"
+        self.current_step: Optional[str] = None
+        self.steps_ms: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.warnings: Dict[str, str] = {}  # Failed optional steps
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    def is_finished(self) -> bool:
+        return self.state in ("ready", "failed")
+
+    def start(self) -> None:
+        with self._lock:
+            self.state = "running"
+            self.started_at = time.time()
+
+    def begin_step(self, name: str) -> None:
+        with self._lock:
+            self.current_step = name
+
+    def end_step(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.steps_ms[name] = round(elapsed_ms, 1)
+            self.current_step = None
+
+    def warn(self, name: str, error: str) -> None:
+        with self._lock:
+            self.warnings[name] = error
+            self.current_step = None
+
+    def finish(self, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.state = "failed" if error else "ready"
+            self.error = error
+            self.finished_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            total = None
+            if self.started_at and self.finished_at:
+                total = round(self.finished_at - self.started_at, 2)
+            return {
+                "state": self.state,
+                "current_step": self.current_step,
+                "steps_ms": dict(self.steps_ms),
+                "total_seconds": total,
+                "error": self.error,
+                "warnings": dict(self.warnings),
+            }
+
+
+# Global warm-up status (read by /ready and /health)
+warmup_status = WarmupStatus()
+
+
+def _step(name: str, fn, *args, **kwargs):
+    """Run one warm-up step, recording its duration."""
+    warmup_status.begin_step(name)
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    warmup_status.end_step(name, (time.perf_counter() - start) * 1000)
+    return result
+
+
+def _warm_rag(rag_engine: RAGEngine) -> None:
+    """Dummy encode, then a dummy search through every retrieval path."""
+    # Encode directly: retrieval may skip embedding when BM25 is confident
+    rag_engine.embeddings.encode(list(WARMUP_QUERIES.values()))
+
+    languages = list(WARMUP_QUERIES)
+    rag_engine.retrieve_many(
+        [WARMUP_QUERIES[lang] for lang in languages],
+        ["color"] * len(languages),
+        languages,
+        k=5,
+    )
+
+
+def _warm_validators() -> None:
+    """Run every enhanced validator once so its synonyms are embedded and cached."""
+    from .validators_enhanced import ENHANCED_VALIDATORS, get_semantic_validator
+
+    get_semantic_validator()
+    for validator in ENHANCED_VALIDATORS.values():
+        for language in WARMUP_QUERIES:
+            validator("warmup", language)
+
+
+def _warm_tokenizer() -> None:
+    """Load the prompt tokenizer used for helper prompt budgets."""
+    from .prompt_budget import count_tokens
+
+    for query in WARMUP_QUERIES.values():
+        count_tokens(query)
+
+
+def run_warmup() -> Optional[RAGEngine]:
+    """
+    Load and warm heavy components (blocking - run in a worker thread).
+
+    Returns:
+        The RAG engine (even if warm-up failed after it was created), or
+        None if it couldn't be created
+    """
+    warmup_status.start()
+    print("🔄 Warming up RAG engine and embedding model...")
+
+    rag_engine: Optional[RAGEngine] = None
+    try:
+        rag_engine = _step("load_rag_engine", RAGEngine)
+        if not rag_engine.is_ready():
+            # RAGEngine() doesn't raise for a missing or invalid index
+            raise RuntimeError("Knowledge base index not loaded")
+        _step("warm_rag", _warm_rag, rag_engine)
+    except Exception as e:
+        warmup_status.finish(error=str(e))
+        print(f"⚠ Warning: warm-up failed: {e}")
+        print("  Helper mode will not work until index is built.")
+        return rag_engine  # Still picks up a KB published later (see RAGEngine.check_reload_marker)
+
+    # Cache warm-ups only: a failure costs first-request latency, not correctness
+    for name, warm in (("warm_validators", _warm_validators), ("warm_tokenizer", _warm_tokenizer)):
+        try:
+            _step(name, warm)
+        except Exception as e:
+            warmup_status.warn(name, str(e))
+            print(f"⚠ Warning: warm-up step {name} failed: {e}")
+
+    warmup_status.finish()
+    print(f"✓ Warm-up complete in {warmup_status.to_dict()['total_seconds']}s")
+    return rag_engine
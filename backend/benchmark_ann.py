@@ -0,0 +1,147 @@
+"""
+ANN Index Benchmark
+
+Compares the knowledge base index types from app/services/ann_index.py
+(flat, hnsw, ivfpq) on the same vectors and reports, per type:
+- build time and serialized index size
+- recall@k against exact Flat search
+- p50 / p99 single-query search latency
+
+Usage:
+    python benchmark_ann.py                      # current KB (kb_chunks.jsonl)
+    python benchmark_ann.py --synthetic 200000   # synthetic vectors at scale
+    python benchmark_ann.py --k 10 --queries 1000
+
+Query-time knobs come from settings (KB_HNSW_EF_SEARCH, KB_IVF_NPROBE),
+so sweep them via environment variables.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import List, Tuple
+import numpy as np
+import faiss
+from app.config import settings
+from app.services.ann_index import build_index, configure_search
+
+
+INDEX_TYPES = ["flat", "hnsw", "ivfpq"]
+
+
+def load_kb_embeddings() -> np.ndarray:
+    """Encode the processed KB chunks with the configured embedding model."""
+    from app.services.embedding_service import get_embedding_service
+
+    jsonl_path = Path(__file__).parent / settings.kb_processed_dir / "kb_chunks.jsonl"
+    if not jsonl_path.exists():
+        raise SystemExit(f"⚠ {jsonl_path} not found - run preprocessing first or use --synthetic")
+
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        texts = [json.loads(line)["text"] for line in f if line.strip()]
+
+    print(f"🔄 Encoding {len(texts)} KB chunks...")
+    return get_embedding_service().encode(texts, show_progress_bar=True)
+
+
+def synthetic_embeddings(n: int, dimension: int, seed: int) -> np.ndarray:
+    """Clustered Gaussian vectors - closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    n_clusters = max(1, n // 500)
+    centers = rng.standard_normal((n_clusters, dimension)).astype("float32")
+    assignments = rng.integers(0, n_clusters, size=n)
+    noise = 0.3 * rng.standard_normal((n, dimension)).astype("float32")
+    return centers[assignments] + noise
+
+
+def make_queries(embeddings: np.ndarray, n_queries: int, seed: int) -> np.ndarray:
+    """Perturbed samples of the data, so every query has real near neighbours."""
+    rng = np.random.default_rng(seed + 1)
+    rows = rng.integers(0, len(embeddings), size=n_queries)
+    scale = 0.1 * float(embeddings.std())
+    noise = scale * rng.standard_normal((n_queries, embeddings.shape[1])).astype("float32")
+    return embeddings[rows] + noise
+
+
+def time_queries(index: faiss.Index, queries: np.ndarray, k: int) -> Tuple[np.ndarray, List[float]]:
+    """Run single-row searches (as RAGEngine.retrieve does); return ids and latencies in ms."""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    latencies = []
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, row_ids = index.search(queries[i:i + 1], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids[i] = row_ids[0]
+    return ids, latencies
+
+
+def recall_at_k(ids: np.ndarray, truth: np.ndarray) -> float:
+    """Mean fraction of the exact top-k found by the ANN top-k."""
+    hits = [len(set(row) & set(true_row)) / truth.shape[1] for row, true_row in zip(ids, truth)]
+    return float(np.mean(hits))
+
+
+def run_benchmark(embeddings: np.ndarray, n_queries: int, k: int, seed: int) -> None:
+    """Build every index type and print the comparison table."""
+    # Single-threaded search gives stable per-query latencies
+    faiss.omp_set_num_threads(1)
+
+    queries = make_queries(embeddings, n_queries, seed)
+    k = min(k, len(embeddings))
+    print(f"\n📊 {len(embeddings)} vectors, dim {embeddings.shape[1]}, {n_queries} queries, k={k}\n")
+
+    truth = None
+    rows = []
+    for requested in INDEX_TYPES:
+        start = time.perf_counter()
+        index, built, params = build_index(embeddings, requested)
+        build_s = time.perf_counter() - start
+        configure_search(index)
+
+        ids, latencies = time_queries(index, queries, k)
+        if truth is None:
+            truth = ids  # Flat is first: exact results
+
+        rows.append({
+            "type": requested,
+            "built": built,
+            "params": params,
+            "build_s": build_s,
+            "size_mb": faiss.serialize_index(index).nbytes / 1e6,
+            "recall": recall_at_k(ids, truth),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+        })
+
+    print(f"{'type':<8}{'built':<8}{'build s':>9}{'size MB':>10}{f'recall@{k}':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for row in rows:
+        print(
+            f"{row['type']:<8}{row['built']:<8}{row['build_s']:>9.2f}{row['size_mb']:>10.1f}"
+            f"{row['recall']:>12.3f}{row['p50_ms']:>10.3f}{row['p99_ms']:>10.3f}"
+        )
+
+    for row in rows:
+        if row["built"] != row["type"]:
+            print(f"\n⚠ {row['type']} fell back to {row['built']} (too few vectors)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recall/latency comparison of KB index types")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic vectors instead of the KB")
+    parser.add_argument("--dim", type=int, default=384, help="Dimension for synthetic vectors")
+    parser.add_argument("--queries", type=int, default=500, help="Number of queries")
+    parser.add_argument("--k", type=int, default=12, help="Neighbours per query (retrieve uses k*3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        embeddings = synthetic_embeddings(args.synthetic, args.dim, args.seed)
+    else:
+        embeddings = load_kb_embeddings()
+
+    run_benchmark(embeddings, args.queries, args.k, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Export the embedding model to ONNX for the onnxruntime backend.
+
+Writes the fp32 model, a dynamically int8-quantized copy and the tokenizer
+to `embedding_onnx_dir` (see app/services/onnx_embedder.py). Needs torch,
+sentence-transformers and onnxruntime; the server itself then only needs
+onnxruntime + tokenizers.
+
+Usage:
+    python export_onnx_model.py
+    python export_onnx_model.py --no-quantize
+    python test_onnx_embeddings.py        # parity + latency vs torch
+
+Then set EMBEDDING_BACKEND=onnx.
+"""
+
+import argparse
+import os
+from pathlib import Path
+from app.config import settings
+from app.services.onnx_embedder import MODEL_FILE, QUANTIZED_MODEL_FILE, export_onnx_model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument("--model", default=settings.embedding_model_name, help="Sentence-transformers model")
+    parser.add_argument("--output", default=settings.embedding_onnx_dir, help="Output directory")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 copy")
+    args = parser.parse_args()
+
+    output_dir = Path(__file__).parent / args.output
+
+    print(f"🔄 Exporting {args.model} to {output_dir}...")
+    config = export_onnx_model(
+        args.model,
+        str(output_dir),
+        quantize=not args.no_quantize,
+        hf_token=settings.hf_token,
+    )
+
+    print(f"✓ Exported (dim {config['dimension']}, {config['pooling']} pooling, normalize={config['normalize']})")
+    for name in (MODEL_FILE, QUANTIZED_MODEL_FILE):
+        path = output_dir / name
+        if path.exists():
+            print(f"  {name}: {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
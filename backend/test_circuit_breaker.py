@@ -0,0 +1,165 @@
+"""
+Behaviour checks for the LLM circuit breakers (services/circuit_breaker.py).
+
+Tests:
+1. State transitions: closed -> open after consecutive failures, success resets
+2. Half-open: a single probe after the open period; its outcome decides
+3. LLMClient: open breakers fail calls fast; bad requests don't count
+
+Uses fake send functions - nothing is sent upstream.
+
+Usage:
+    python test_circuit_breaker.py
+"""
+
+import sys
+import time
+from app.config import settings
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen, get_circuit_breaker
+from app.services.llm_client import LLMClient, LLMError, LLMResult
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✓' if ok else '✗'} {message}")
+    return ok
+
+
+def admitted(breaker: CircuitBreaker) -> bool:
+    try:
+        breaker.admit()
+        return True
+    except CircuitOpen:
+        return False
+
+
+def test_transitions() -> bool:
+    """Test 1: consecutive failures open the breaker; a success in between resets the count."""
+    print("\n" + "=" * 60)
+    print("TEST 1: State transitions")
+    print("=" * 60)
+
+    breaker = CircuitBreaker("test.transitions", failure_threshold=3, open_seconds=60)
+    for _ in range(2):
+        breaker.admit()
+        breaker.failure()
+    breaker.admit()
+    breaker.success()
+    passed = check(breaker.state == CLOSED and breaker.failures == 0, "success resets consecutive failures")
+
+    for _ in range(3):
+        breaker.admit()
+        breaker.failure()
+    passed &= check(breaker.state == OPEN, "open after 3 consecutive failures")
+    passed &= check(not admitted(breaker) and not admitted(breaker), "open breaker rejects calls")
+
+    stats = breaker.to_dict()
+    passed &= check(stats["times_opened"] == 1 and stats["short_circuited"] == 2, f"stats recorded ({stats})")
+    return passed
+
+
+def test_half_open_probe() -> bool:
+    """Test 2: after the open period exactly one probe goes through."""
+    print("\n" + "=" * 60)
+    print("TEST 2: Half-open probe")
+    print("=" * 60)
+
+    breaker = CircuitBreaker("test.probe", failure_threshold=1, open_seconds=0.2)
+    breaker.admit()
+    breaker.failure()
+    passed = check(breaker.state == OPEN and not admitted(breaker), "open, rejecting")
+
+    time.sleep(0.25)
+    passed &= check(admitted(breaker) and breaker.state == HALF_OPEN, "first call after the open period is the probe")
+    passed &= check(not admitted(breaker), "concurrent calls still fail fast while probing")
+
+    breaker.failure()
+    passed &= check(breaker.state == OPEN and not admitted(breaker), "failed probe opens it again")
+
+    time.sleep(0.25)
+    passed &= check(admitted(breaker), "next probe after another open period")
+    breaker.release()
+    passed &= check(breaker.state == HALF_OPEN and admitted(breaker), "released probe (cancelled) lets another probe in")
+    breaker.success()
+    passed &= check(breaker.state == CLOSED and admitted(breaker) and admitted(breaker), "successful probe closes it")
+    return passed
+
+
+def test_llm_client() -> bool:
+    """Test 3: LLMClient reports outcomes and fails fast while the breaker is open."""
+    print("\n" + "=" * 60)
+    print("TEST 3: LLMClient integration")
+    print("=" * 60)
+
+    if not settings.circuit_breaker_enabled:
+        print("⚠ circuit_breaker_enabled is off - skipped")
+        return True
+
+    client = LLMClient()
+    endpoint = "test.chat"
+    sends = 0
+
+    def failing() -> LLMResult:
+        nonlocal sends
+        sends += 1
+        raise LLMError("503 Service Unavailable", status_code=503, retryable=True)
+
+    def bad_request() -> LLMResult:
+        nonlocal sends
+        sends += 1
+        raise LLMError("400 Bad Request", status_code=400)
+
+    def ok() -> LLMResult:
+        nonlocal sends
+        sends += 1
+        return LLMResult(text="ok", provider="test", model="fake")
+
+    breaker = get_circuit_breaker(endpoint)
+    breaker.open_seconds = 0.2
+
+    for _ in range(5):
+        try:
+            client._call("test", endpoint, bad_request, retries=0)
+        except LLMError:
+            pass
+    passed = check(breaker.state == CLOSED, "4xx responses don't count against the endpoint")
+
+    for _ in range(settings.circuit_breaker_failure_threshold):
+        try:
+            client._call("test", endpoint, failing, retries=0)
+        except LLMError:
+            pass
+    passed &= check(breaker.state == OPEN, f"open after {settings.circuit_breaker_failure_threshold} failed calls")
+
+    sends = 0
+    start = time.perf_counter()
+    try:
+        client._call("test", endpoint, ok, retries=0)
+        passed &= check(False, "call through an open breaker should fail")
+    except LLMError as e:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        passed &= check(sends == 0 and e.status_code == 503, f"failed fast without calling upstream ({elapsed_ms:.1f}ms)")
+
+    time.sleep(0.25)
+    result = client._call("test", endpoint, ok, retries=0)
+    passed &= check(result.text == "ok" and breaker.state == CLOSED, "probe succeeded and closed the breaker")
+    return passed
+
+
+def main() -> None:
+    print("\n" + "=" * 60)
+    print("CIRCUIT BREAKER TEST SUITE")
+    print("=" * 60)
+
+    results = [
+        test_transitions(),
+        test_half_open_probe(),
+        test_llm_client(),
+    ]
+    passed = all(results)
+
+    print("\n✅ ALL CIRCUIT BREAKER TESTS PASSED" if passed else "\n❌ CIRCUIT BREAKER TESTS FAILED")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Behaviour checks for hedged helper requests (HedgedLLMAdapter in services/llm_adapter.py).
+
+Tests:
+1. Winner selection: a fast primary answers alone; a slow one is hedged
+   and the faster provider wins
+2. Failover: an error or a canned FallbackText asks the next provider at once
+3. Budget: nobody answers in time -> canned fallback, within the budget
+4. Loser cleanup: losing calls are cancelled, including coalesced
+   LLMClient calls, and every call runs under the remaining budget
+5. Streaming: hedged on the first token, pieces only from the winner
+6. Sync path: same winner selection on the adapter's threads
+
+Uses fake provider adapters - nothing is sent upstream.
+
+Usage:
+    python test_hedging.py
+"""
+
+import asyncio
+import sys
+import time
+from typing import AsyncIterator, List, Optional
+from app.services.llm_adapter import FallbackText, HedgedLLMAdapter, LLMAdapter, helper_route
+from app.services.llm_client import LLMClient, LLMResult, _within_deadline
+
+
+BUDGET_SECONDS = 1.0
+HEDGE_DELAY_SECONDS = 0.1
+
+
+class FakeProvider(LLMAdapter):
+    """Answers `text` after `delay` seconds (or raises, or returns a FallbackText)."""
+
+    def __init__(self, name: str, delay: float, text: str = "", error: bool = False, fallback: bool = False):
+        self.provider = name
+        self.model_name = "fake"
+        self.delay = delay
+        self.text = text or f"answer from {name}"
+        self.error = error
+        self.fallback = fallback
+        self.calls = 0
+        self.cancelled = 0
+        self.deadlines: List[Optional[float]] = []  # Time left for LLM calls when each call started
+
+    def _answer(self) -> str:
+        if self.error:
+            raise RuntimeError(f"{self.provider} is down")
+        return FallbackText(self.text) if self.fallback else self.text
+
+    def generate_helper(self, parameter, language, user_message, retrieved_chunks) -> str:
+        self.calls += 1
+        self.deadlines.append(_within_deadline(None))
+        time.sleep(self.delay)
+        return self._answer()
+
+    async def agenerate_helper(self, parameter, language, user_message, retrieved_chunks) -> str:
+        self.calls += 1
+        self.deadlines.append(_within_deadline(None))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self._answer()
+
+    async def astream_helper(self, parameter, language, user_message, retrieved_chunks) -> AsyncIterator[str]:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+            for word in self._answer().split():
+                yield word + " "
+                await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def hedged(*providers: FakeProvider) -> HedgedLLMAdapter:
+    return HedgedLLMAdapter(
+        [(provider.provider, provider) for provider in providers],
+        budget_seconds=BUDGET_SECONDS,
+        default_delay_seconds=HEDGE_DELAY_SECONDS,
+    )
+
+
+def ask(adapter: LLMAdapter) -> str:
+    return adapter.agenerate_helper("color", "en", "how do I check color", ["chunk"])
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✓' if ok else '✗'} {message}")
+    return ok
+
+
+async def _winner_selection() -> bool:
+    primary, secondary = FakeProvider("primary", 0.02), FakeProvider("secondary", 0.02)
+    text = await ask(hedged(primary, secondary))
+    passed = check(text == "answer from primary" and secondary.calls == 0, "fast primary answers alone")
+    passed &= check(helper_route.get()["asked"] == ["primary"], f"route recorded ({helper_route.get()})")
+
+    primary, secondary = FakeProvider("primary", 0.8), FakeProvider("secondary", 0.05)
+    start = time.perf_counter()
+    text = await ask(hedged(primary, secondary))
+    elapsed = time.perf_counter() - start
+    passed &= check(text == "answer from secondary", f"slow primary hedged, secondary won ({elapsed:.2f}s)")
+    passed &= check(elapsed < 0.4, "answer came at about hedge delay + secondary latency")
+    passed &= check(helper_route.get()["asked"] == ["primary", "secondary"], "both providers recorded as asked")
+    return passed
+
+
+def test_winner_selection() -> bool:
+    """Test 1: the first good answer wins."""
+    print("\n" + "=" * 60)
+    print("TEST 1: Winner selection")
+    print("=" * 60)
+    return asyncio.run(_winner_selection())
+
+
+async def _failover() -> bool:
+    primary, secondary = FakeProvider("primary", 0.0, error=True), FakeProvider("secondary", 0.02)
+    start = time.perf_counter()
+    text = await ask(hedged(primary, secondary))
+    elapsed = time.perf_counter() - start
+    passed = check(text == "answer from secondary", "failed primary -> secondary answered")
+    passed &= check(elapsed < HEDGE_DELAY_SECONDS, f"next provider asked without waiting the hedge delay ({elapsed:.3f}s)")
+
+    primary, secondary = FakeProvider("primary", 0.0, fallback=True), FakeProvider("secondary", 0.02)
+    text = await ask(hedged(primary, secondary))
+    passed &= check(text == "answer from secondary", "canned FallbackText is not a good answer")
+
+    primary, secondary = FakeProvider("primary", 0.0, fallback=True), FakeProvider("secondary", 0.0, error=True)
+    text = await ask(hedged(primary, secondary))
+    passed &= check(text == "answer from primary" and isinstance(text, FallbackText), "all failed -> first provider's fallback")
+    return passed
+
+
+def test_failover() -> bool:
+    """Test 2: failures move on to the next provider immediately."""
+    print("\n" + "=" * 60)
+    print("TEST 2: Failover")
+    print("=" * 60)
+    return asyncio.run(_failover())
+
+
+async def _budget() -> bool:
+    primary, secondary = FakeProvider("primary", 5.0), FakeProvider("secondary", 5.0)
+    start = time.perf_counter()
+    text = await ask(hedged(primary, secondary))
+    elapsed = time.perf_counter() - start
+    passed = check(isinstance(text, FallbackText), "nobody answered -> canned fallback")
+    passed &= check(BUDGET_SECONDS <= elapsed < BUDGET_SECONDS + 0.2, f"gave up at the budget ({elapsed:.2f}s)")
+    passed &= check(helper_route.get()["provider"] is None, "route records no provider")
+    await asyncio.sleep(0)
+    passed &= check(primary.cancelled == 1 and secondary.cancelled == 1, "both calls cancelled on giving up")
+    return passed
+
+
+def test_budget() -> bool:
+    """Test 3: the hedge never waits longer than its budget."""
+    print("\n" + "=" * 60)
+    print("TEST 3: Budget")
+    print("=" * 60)
+    return asyncio.run(_budget())
+
+
+class CoalescedProvider(FakeProvider):
+    """Answers through LLMClient's async singleflight, as the real adapters do."""
+
+    def __init__(self, name: str, delay: float, client: LLMClient):
+        super().__init__(name, delay)
+        self.client = client
+        self.sends_cancelled = 0
+
+    async def agenerate_helper(self, parameter, language, user_message, retrieved_chunks) -> str:
+        self.calls += 1
+        self.deadlines.append(_within_deadline(None))
+
+        async def send() -> LLMResult:
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.sends_cancelled += 1
+                raise
+            return LLMResult(text=self.text, provider=self.provider, model="fake")
+
+        result = await self.client._acall(self.provider, f"test.{self.provider}", send, 0, fingerprint=self.provider)
+        return result.text
+
+
+async def _loser_cleanup() -> bool:
+    primary, secondary = FakeProvider("primary", 0.8), FakeProvider("secondary", 0.05)
+    await ask(hedged(primary, secondary))
+    await asyncio.sleep(0)
+    passed = check(primary.cancelled == 1, "losing call cancelled once the winner answered")
+
+    remaining = secondary.deadlines[0]
+    expected = BUDGET_SECONDS - HEDGE_DELAY_SECONDS
+    passed &= check(
+        primary.deadlines[0] is not None and primary.deadlines[0] <= BUDGET_SECONDS,
+        f"primary ran under the budget as its deadline ({primary.deadlines[0]:.2f}s)",
+    )
+    passed &= check(
+        remaining is not None and remaining <= expected + 0.05,
+        f"hedged call got only what was left of the budget ({remaining:.2f}s <= {expected:.2f}s)",
+    )
+
+    # The loser's upstream call is coalesced (shielded) - it must still be cancelled
+    client = LLMClient()
+    primary, secondary = CoalescedProvider("primary", 0.8, client), CoalescedProvider("secondary", 0.05, client)
+    text = await ask(hedged(primary, secondary))
+    await asyncio.sleep(0.01)
+    passed &= check(text == "answer from secondary", "coalesced providers: secondary won")
+    passed &= check(primary.sends_cancelled == 1, "loser's shielded upstream call cancelled")
+    passed &= check(client.stats()["in_flight_coalescing"] == 0, "no call left in flight")
+    return passed
+
+
+def test_loser_cleanup() -> bool:
+    """Test 4: losers don't keep running after the hedge returns."""
+    print("\n" + "=" * 60)
+    print("TEST 4: Loser cleanup and deadlines")
+    print("=" * 60)
+    return asyncio.run(_loser_cleanup())
+
+
+async def _streaming() -> bool:
+    primary = FakeProvider("primary", 0.8, text="slow primary words")
+    secondary = FakeProvider("secondary", 0.05, text="fast secondary words")
+    adapter = hedged(primary, secondary)
+    pieces = [piece async for piece in adapter.astream_helper("color", "en", "how?", ["chunk"])]
+    await asyncio.sleep(0)
+
+    passed = check("".join(pieces) == "fast secondary words ", f"streamed from the winner only ({pieces})")
+    passed &= check(primary.cancelled == 1, "losing stream cancelled")
+    return passed
+
+
+def test_streaming() -> bool:
+    """Test 5: hedged streaming switches to the provider with the first token."""
+    print("\n" + "=" * 60)
+    print("TEST 5: Streaming")
+    print("=" * 60)
+    return asyncio.run(_streaming())
+
+
+def test_sync_path() -> bool:
+    """Test 6: the sync path hedges on the adapter's threads."""
+    print("\n" + "=" * 60)
+    print("TEST 6: Sync path")
+    print("=" * 60)
+
+    primary, secondary = FakeProvider("primary", 0.6), FakeProvider("secondary", 0.05)
+    start = time.perf_counter()
+    text = hedged(primary, secondary).generate_helper("color", "en", "how?", ["chunk"])
+    elapsed = time.perf_counter() - start
+    passed = check(text == "answer from secondary" and elapsed < 0.4, f"secondary won ({elapsed:.2f}s)")
+
+    primary, secondary = FakeProvider("primary", 0.0, error=True), FakeProvider("secondary", 0.02)
+    text = hedged(primary, secondary).generate_helper("color", "en", "how?", ["chunk"])
+    passed &= check(text == "answer from secondary", "failed primary -> secondary answered")
+    return passed
+
+
+def main() -> None:
+    print("\n" + "=" * 60)
+    print("HEDGED HELPER TEST SUITE")
+    print("=" * 60)
+
+    results = [
+        test_winner_selection(),
+        test_failover(),
+        test_budget(),
+        test_loser_cleanup(),
+        test_streaming(),
+        test_sync_path(),
+    ]
+    passed = all(results)
+
+    print("\n✅ ALL HEDGING TESTS PASSED" if passed else "\n❌ HEDGING TESTS FAILED")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Behaviour checks for the helper response cache (services/helper_cache.py).
+
+Tests:
+1. Keys: message normalization; namespace and retrieved chunks change the key
+2. Memory tier: TTL expiry and LRU eviction
+3. Disk tier: shared with another cache instance (worker), same TTL
+4. CachedLLMAdapter: hits skip the adapter; fallback texts and broken
+   streams are never stored
+
+Uses a temporary SQLite file and a fake adapter - nothing is sent upstream.
+
+Usage:
+    python test_helper_cache.py
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import AsyncIterator
+from app.services.helper_cache import HelperCache, helper_cache_key, helper_cache_status
+from app.services.llm_adapter import CachedLLMAdapter, FallbackText, LLMAdapter
+
+
+CHUNKS = ["Take a handful of moist soil.", "Compare it with the colour chart."]
+
+
+class FakeAdapter(LLMAdapter):
+    """Counts helper calls; `fail` makes it answer with the canned fallback."""
+
+    provider = "fake"
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def _text(self, parameter: str) -> str:
+        if self.fail:
+            return FallbackText("Please select from the options.")
+        return f"Helper text #{self.calls} for {parameter}"
+
+    def generate_helper(self, parameter, language, user_message, retrieved_chunks) -> str:
+        self.calls += 1
+        return self._text(parameter)
+
+    async def astream_helper(self, parameter, language, user_message, retrieved_chunks) -> AsyncIterator[str]:
+        self.calls += 1
+        text = self._text(parameter)
+        if isinstance(text, FallbackText):
+            yield text  # Adapters send the canned text as one FallbackText piece
+            return
+        for word in text.split():
+            yield word + " "
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✓' if ok else '✗'} {message}")
+    return ok
+
+
+def test_keys() -> bool:
+    """Test 1: equivalent requests share a key; anything that changes the answer doesn't."""
+    print("\n" + "=" * 60)
+    print("TEST 1: Cache keys")
+    print("=" * 60)
+
+    message = "How do I check colour?"
+    key = helper_cache_key("Groq:llama", "color", "en", message, CHUNKS)
+    passed = check(
+        key == helper_cache_key("Groq:llama", "color", "en", "  how do i   check COLOUR ", CHUNKS),
+        "case, spacing and trailing punctuation normalized",
+    )
+    passed &= check(
+        helper_cache_key("Groq:llama", "color", "hi", "रंग कैसे देखें।", CHUNKS)
+        == helper_cache_key("Groq:llama", "color", "hi", "रंग कैसे देखें", CHUNKS),
+        "Devanagari danda dropped like a full stop",
+    )
+    passed &= check(key != helper_cache_key("Ollama:llama", "color", "en", message, CHUNKS), "namespace (adapter/model) in the key")
+    passed &= check(key != helper_cache_key("Groq:llama", "color", "en", message, CHUNKS[:1]), "retrieved chunks in the key (KB reload)")
+    passed &= check(key != helper_cache_key("Groq:llama", "moisture", "en", message, CHUNKS), "parameter in the key")
+    return passed
+
+
+def test_memory_tier() -> bool:
+    """Test 2: memory entries expire after the TTL; the LRU keeps the newest."""
+    print("\n" + "=" * 60)
+    print("TEST 2: Memory tier")
+    print("=" * 60)
+
+    cache = HelperCache(max_entries=2, ttl_seconds=0.2)
+    cache.put(b"a", "text a")
+    passed = check(cache.get(b"a") == ("text a", "memory"), "hit before the TTL")
+    time.sleep(0.25)
+    passed &= check(cache.get(b"a") == (None, "miss"), "miss after the TTL")
+
+    cache = HelperCache(max_entries=2, ttl_seconds=60)
+    cache.put(b"a", "text a")
+    cache.put(b"b", "text b")
+    cache.get(b"a")  # Most recently used
+    cache.put(b"c", "text c")
+    passed &= check(cache.get(b"b")[1] == "miss" and cache.get(b"a")[1] == "memory", "least recently used entry evicted")
+
+    stats = cache.stats()
+    passed &= check(stats["memory_hits"] == 2 and stats["misses"] == 1, f"counters ({stats})")
+    return passed
+
+
+def test_disk_tier(tmp_dir: str) -> bool:
+    """Test 3: another worker's cache finds entries on disk, within the TTL only."""
+    print("\n" + "=" * 60)
+    print("TEST 3: Disk tier")
+    print("=" * 60)
+
+    path = os.path.join(tmp_dir, "helper_cache.sqlite3")
+    writer = HelperCache(max_entries=10, ttl_seconds=0.5, path=path)
+    writer.put(b"shared", "shared text")
+
+    reader = HelperCache(max_entries=10, ttl_seconds=0.5, path=path)
+    passed = check(reader.get(b"shared") == ("shared text", "disk"), "other worker: disk hit")
+    passed &= check(reader.get(b"shared") == ("shared text", "memory"), "disk hit promoted to memory")
+
+    time.sleep(0.55)
+    late = HelperCache(max_entries=10, ttl_seconds=0.5, path=path)
+    passed &= check(late.get(b"shared") == (None, "miss"), "expired rows are not served")
+
+    disk_only = HelperCache(max_entries=0, ttl_seconds=60, path=path)
+    disk_only.put(b"k", "v")
+    passed &= check(
+        disk_only.get(b"k") == ("v", "disk") and disk_only.stats()["memory_entries"] == 0,
+        "max_entries=0: disk tier only",
+    )
+    return passed
+
+
+async def _adapter_async(adapter: CachedLLMAdapter, fake: FakeAdapter) -> bool:
+    async def stream(message: str) -> str:
+        return "".join([piece async for piece in adapter.astream_helper("moisture", "en", message, CHUNKS)])
+
+    first = await stream("how wet is it")
+    calls = fake.calls
+    second = await stream("how wet is it")
+    passed = check(fake.calls == calls and second == first.strip(), "complete stream stored, hit arrives in one piece")
+
+    fake.fail = True
+    await stream("is my soil dry")
+    await stream("is my soil dry")
+    passed &= check(fake.calls == calls + 2, "fallback stream never stored")
+    fake.fail = False
+    return passed
+
+
+def test_cached_adapter() -> bool:
+    """Test 4: CachedLLMAdapter in front of an adapter."""
+    print("\n" + "=" * 60)
+    print("TEST 4: CachedLLMAdapter")
+    print("=" * 60)
+
+    fake = FakeAdapter()
+    adapter = CachedLLMAdapter(fake, HelperCache(max_entries=10, ttl_seconds=60))
+
+    first = adapter.generate_helper("color", "en", "How do I check colour?", CHUNKS)
+    passed = check(helper_cache_status.get() == "miss" and fake.calls == 1, "first call generated")
+    second = adapter.generate_helper("color", "en", "how do i check colour", CHUNKS)
+    passed &= check(
+        second == first and fake.calls == 1 and helper_cache_status.get() == "memory",
+        "repeat served from the cache",
+    )
+    adapter.generate_helper("color", "en", "How do I check colour?", ["Another chunk"])
+    passed &= check(fake.calls == 2, "different retrieved chunks generate again")
+
+    fake.fail = True
+    adapter.generate_helper("smell", "en", "how to smell soil", CHUNKS)
+    adapter.generate_helper("smell", "en", "how to smell soil", CHUNKS)
+    passed &= check(fake.calls == 4, "fallback texts never stored")
+    fake.fail = False
+
+    passed &= asyncio.run(_adapter_async(adapter, fake))
+    return passed
+
+
+def main() -> None:
+    print("\n" + "=" * 60)
+    print("HELPER CACHE TEST SUITE")
+    print("=" * 60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="helper_cache_test_")
+    try:
+        results = [
+            test_keys(),
+            test_memory_tier(),
+            test_disk_tier(tmp_dir),
+            test_cached_adapter(),
+        ]
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    passed = all(results)
+
+    print("\n✅ ALL HELPER CACHE TESTS PASSED" if passed else "\n❌ HELPER CACHE TESTS FAILED")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Behaviour checks for near-duplicate chunk elimination (services/kb_dedup.py).
+
+Tests:
+1. Duplicates and near-duplicates within a (parameter, language) bucket are dropped
+2. Scoping: the same text under another parameter or language is kept
+3. Chunks without words ("---", table rules) are never duplicates
+4. Shingles keep Devanagari words whole
+5. Merge report and the disabled filter
+
+Usage:
+    python test_kb_dedup.py
+"""
+
+import sys
+from typing import Any, Dict
+from app.services.kb_dedup import NearDuplicateFilter, shingles
+
+
+PASSAGE = (
+    "Take a handful of moist soil from the field and look at it in daylight. "
+    "Dark brown or black soil usually has more organic matter, while red or "
+    "yellow soil often has iron and drains quickly. Compare the colour with "
+    "the chart on the card and pick the closest option."
+)
+NEAR_DUPLICATE = PASSAGE.replace("in daylight", "in bright daylight")
+UNRELATED = (
+    "Dig a small pit one foot deep, count the earthworms you find in the "
+    "soil you removed and write the number down before filling the pit."
+)
+
+
+def chunk(text: str, parameter: str = "color", language: str = "en") -> Dict[str, Any]:
+    return {"text": text, "parameter": parameter, "language": language, "module_name": "test.md"}
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✓' if ok else '✗'} {message}")
+    return ok
+
+
+def test_duplicates() -> bool:
+    """Test 1: duplicates in the same bucket are dropped, distinct chunks kept."""
+    print("\n" + "=" * 60)
+    print("TEST 1: Duplicates within a bucket")
+    print("=" * 60)
+
+    dedup = NearDuplicateFilter(threshold=0.8)
+    passed = check(dedup.check(chunk(PASSAGE)), "first occurrence kept")
+    passed &= check(not dedup.check(chunk(PASSAGE)), "exact duplicate dropped")
+    passed &= check(not dedup.check(chunk(NEAR_DUPLICATE)), "near-duplicate (one word added) dropped")
+    passed &= check(not dedup.check(chunk(PASSAGE.upper())), "case-only difference dropped")
+    passed &= check(dedup.check(chunk(UNRELATED)), "unrelated chunk kept")
+    passed &= check(dedup.n_dropped == 3, f"{dedup.n_dropped} dropped")
+    return passed
+
+
+def test_scoping() -> bool:
+    """Test 2: chunks are only compared within their (parameter, language) bucket."""
+    print("\n" + "=" * 60)
+    print("TEST 2: Scoping per (parameter, language)")
+    print("=" * 60)
+
+    dedup = NearDuplicateFilter(threshold=0.8)
+    dedup.check(chunk(PASSAGE, "color", "en"))
+    passed = check(dedup.check(chunk(PASSAGE, "moisture", "en")), "same text under another parameter kept")
+    passed &= check(dedup.check(chunk(PASSAGE, "color", "hi")), "same text under another language kept")
+    passed &= check(not dedup.check(chunk(PASSAGE, "moisture", "en")), "duplicate within the new bucket dropped")
+    passed &= check(dedup.n_seen == 4 and dedup.n_dropped == 1, "counts per bucket")
+    return passed
+
+
+def test_no_words() -> bool:
+    """Test 3: chunks with no words have no shingles and are never merged."""
+    print("\n" + "=" * 60)
+    print("TEST 3: Chunks without words")
+    print("=" * 60)
+
+    passed = check(shingles("---") == set() and shingles("| --- | --- |") == set(), "no words -> no shingles")
+
+    dedup = NearDuplicateFilter(threshold=0.8)
+    kept = [dedup.check(chunk(text)) for text in ("---", "---", "| --- | --- |", "***")]
+    passed &= check(all(kept), "separator-only chunks all kept")
+    passed &= check(dedup.check(chunk(PASSAGE)) and not dedup.check(chunk(PASSAGE)), "dedup still works after them")
+    return passed
+
+
+def test_devanagari() -> bool:
+    """Test 4: Hindi words (with matras and viramas) stay whole in shingles."""
+    print("\n" + "=" * 60)
+    print("TEST 4: Devanagari shingles")
+    print("=" * 60)
+
+    text = "मिट्टी का रंग देखें और कार्ड से मिलाएं"
+    result = shingles(text)
+    passed = check("मिट्टी का रंग" in result, f"whole-word shingles ({sorted(result)[:2]}...)")
+    passed &= check(shingles("मिट्टी रंग") == {"मिट्टी रंग"}, "short chunk: all words as one shingle")
+
+    hindi = "खेत से एक मुट्ठी नम मिट्टी लें और उसे दिन की रोशनी में देखें। गहरी भूरी या काली मिट्टी में आमतौर पर अधिक जैविक पदार्थ होता है।"
+    dedup = NearDuplicateFilter(threshold=0.8)
+    dedup.check(chunk(hindi, language="hi"))
+    passed &= check(not dedup.check(chunk(hindi, language="hi")), "Hindi duplicate dropped")
+    passed &= check(
+        dedup.check(chunk("केंचुए गिनने के लिए एक फुट गहरा गड्ढा खोदें और मिली मिट्टी में केंचुए गिनें।", language="hi")),
+        "different Hindi chunk kept",
+    )
+    return passed
+
+
+def test_report() -> bool:
+    """Test 5: the merge report lists what was folded into what; > 1 disables."""
+    print("\n" + "=" * 60)
+    print("TEST 5: Merge report and disabled filter")
+    print("=" * 60)
+
+    dedup = NearDuplicateFilter(threshold=0.8)
+    for text in (UNRELATED, PASSAGE, NEAR_DUPLICATE):
+        dedup.check(chunk(text))
+    report = dedup.report()
+    merge = report["merges"][0] if report["merges"] else {}
+    passed = check(report["chunks_in"] == 3 and report["chunks_kept"] == 2, "report counts")
+    passed &= check(
+        merge.get("kept", {}).get("chunk_id") == 1 and len(merge.get("dropped", [])) == 1,
+        "near-duplicate folded into kept chunk 1",
+    )
+    similarity = merge["dropped"][0]["similarity"] if merge.get("dropped") else 0.0
+    passed &= check(0.8 <= similarity <= 1.0, f"estimated similarity {similarity}")
+
+    disabled = NearDuplicateFilter(threshold=1.5)
+    kept = [disabled.check(chunk(PASSAGE)) for _ in range(2)]
+    passed &= check(not disabled.enabled and all(kept), "threshold > 1 keeps everything")
+    return passed
+
+
+def main() -> None:
+    print("\n" + "=" * 60)
+    print("KB DEDUP TEST SUITE")
+    print("=" * 60)
+
+    results = [
+        test_duplicates(),
+        test_scoping(),
+        test_no_words(),
+        test_devanagari(),
+        test_report(),
+    ]
+    passed = all(results)
+
+    print("\n✅ ALL DEDUP TESTS PASSED" if passed else "\n❌ DEDUP TESTS FAILED")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Behaviour checks for incremental KB builds (services/kb_incremental.py, kb_pipeline.py).
+
+Tests:
+1. First build: every chunk is embedded and a build manifest is written
+2. Unchanged rebuild: nothing is re-chunked or re-embedded, same vectors
+3. One file edited: only its new chunk texts are embedded; the rest reuse
+   their previous vectors
+4. Invalidation: --full, a changed embedding model and inconsistent
+   artifacts all rebuild from scratch
+
+Builds a small KB in a temporary directory with a fake embedding model
+(deterministic vectors from the text hash) - the real model is never loaded.
+
+Usage:
+    python test_kb_incremental.py
+"""
+
+import hashlib
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+from app.config import settings
+from app.services import kb_pipeline
+from app.services.kb_incremental import BUILD_MANIFEST_FILE, EMBEDDINGS_FILE, load_previous_build
+from app.services.kb_pipeline import JSONL_FILE, run_pipeline
+from app.services.kb_store import ChunkStore
+
+
+DIMENSION = 16
+
+KB_FILES = {
+    "01-color-detection.md": (
+        "# Soil Color\n\n"
+        "## Step 1\nTake a handful of moist soil and look at it in daylight.\n\n"
+        "## Step 2\nCompare it with the colour chart: black, brown, red or yellow.\n\n"
+        "## मिट्टी का रंग\nमिट्टी को दिन की रोशनी में देखें और रंग चार्ट से मिलाएं।\n"
+    ),
+    "02-moisture-testing.md": (
+        "# Soil Moisture\n\n"
+        "## Squeeze test\nSqueeze a ball of soil in your fist and open your hand.\n\n"
+        "## Reading\nIf it crumbles the soil is dry; if water drips it is wet.\n"
+    ),
+    "06-earthworm-presence.md": (
+        "# Earthworms\n\n"
+        "## Count\nDig a pit one foot deep and count the earthworms in the soil.\n\n"
+        "## Meaning\nMany earthworms mean healthy soil with organic matter.\n"
+    ),
+}
+
+
+class FakeEmbeddingService:
+    """Stands in for EmbeddingService during builds: hash-seeded unit vectors."""
+
+    def __init__(self):
+        self.texts_encoded = 0
+        self.encoded: List[str] = []
+
+    def disk_cache(self) -> None:
+        return None  # Only the previous build may supply vectors
+
+    def encode_cached(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        self.texts_encoded += len(texts)
+        self.encoded.extend(texts)
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(DIMENSION).astype(np.float32)
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.vstack(vectors)
+
+
+class TempKB:
+    """A KB in a temporary directory, built with the fake embedding service."""
+
+    def __init__(self):
+        self.root = Path(tempfile.mkdtemp(prefix="kb_incremental_test_"))
+        self.raw = self.root / "kb_raw"
+        self.processed = self.root / "kb_processed"
+        self.embeddings = self.root / "embeddings"
+        self.raw.mkdir()
+        for name, content in KB_FILES.items():
+            (self.raw / name).write_text(content, encoding="utf-8")
+
+        self._saved = {
+            name: getattr(settings, name)
+            for name in ("kb_raw_dir", "kb_processed_dir", "embeddings_dir", "kb_ingest_workers", "embedding_model_name")
+        }
+        settings.kb_raw_dir = str(self.raw)  # Absolute paths override the backend-relative defaults
+        settings.kb_processed_dir = str(self.processed)
+        settings.embeddings_dir = str(self.embeddings)
+        settings.kb_ingest_workers = 1  # Chunk in-process
+        self._get_embedding_service = kb_pipeline.get_embedding_service
+
+    def build(self, full: bool = False) -> FakeEmbeddingService:
+        service = FakeEmbeddingService()
+        kb_pipeline.get_embedding_service = lambda: service
+        try:
+            assert run_pipeline(chunker="basic", full=full)
+        finally:
+            kb_pipeline.get_embedding_service = self._get_embedding_service
+        return service
+
+    def vectors(self) -> dict:
+        """Chunk text -> vector of the current build."""
+        store = ChunkStore.load(str(self.embeddings))
+        embeddings = np.load(self.embeddings / EMBEDDINGS_FILE)
+        return {text: embeddings[row] for row, text in enumerate(store.iter_texts())}
+
+    def manifest(self) -> Optional[dict]:
+        path = self.embeddings / BUILD_MANIFEST_FILE
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+    def close(self) -> None:
+        for name, value in self._saved.items():
+            setattr(settings, name, value)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✓' if ok else '✗'} {message}")
+    return ok
+
+
+def test_first_build(kb: TempKB) -> bool:
+    """Test 1: a build from scratch embeds everything and records a manifest."""
+    print("\n" + "=" * 60)
+    print("TEST 1: First build")
+    print("=" * 60)
+
+    service = kb.build()
+    manifest = kb.manifest()
+    passed = check(manifest is not None and sorted(manifest["files"]) == sorted(KB_FILES), "manifest lists every file")
+    passed &= check(service.texts_encoded == manifest["n_chunks"], f"all {manifest['n_chunks']} chunks embedded")
+    return passed
+
+
+def test_unchanged_rebuild(kb: TempKB) -> bool:
+    """Test 2: an unchanged KB is rebuilt without embedding anything."""
+    print("\n" + "=" * 60)
+    print("TEST 2: Unchanged rebuild")
+    print("=" * 60)
+
+    before = kb.vectors()
+    service = kb.build()
+    after = kb.vectors()
+    passed = check(service.texts_encoded == 0, "nothing re-embedded")
+    passed &= check(
+        before.keys() == after.keys() and all(np.array_equal(before[t], after[t]) for t in before),
+        "same chunks, same vectors",
+    )
+    return passed
+
+
+def test_one_file_edited(kb: TempKB) -> bool:
+    """Test 3: editing one file only embeds that file's new chunk texts."""
+    print("\n" + "=" * 60)
+    print("TEST 3: One file edited")
+    print("=" * 60)
+
+    before = kb.vectors()
+    old_sha = kb.manifest()["files"]["02-moisture-testing.md"]["sha256"]
+    added = "## Drainage\nAfter rain, check whether water stands on the field for more than a day.\n"
+    path = kb.raw / "02-moisture-testing.md"
+    path.write_text(KB_FILES["02-moisture-testing.md"] + "\n" + added, encoding="utf-8")
+
+    service = kb.build()
+    after = kb.vectors()
+    new_texts = [text for text in after if text not in before]
+    print(f"  Embedded: {service.encoded}")
+
+    passed = check(len(new_texts) > 0 and sorted(service.encoded) == sorted(new_texts), "only the new chunk texts embedded")
+    passed &= check(
+        all(np.array_equal(before[t], after[t]) for t in after if t in before),
+        "every other chunk kept its previous vector",
+    )
+    passed &= check(kb.manifest()["files"]["02-moisture-testing.md"]["sha256"] != old_sha, "manifest records the new file hash")
+    return passed
+
+
+def test_invalidation(kb: TempKB) -> bool:
+    """Test 4: anything that could make old vectors or chunks wrong forces a full build."""
+    print("\n" + "=" * 60)
+    print("TEST 4: Invalidation")
+    print("=" * 60)
+
+    n_chunks = kb.manifest()["n_chunks"]
+    service = kb.build(full=True)
+    passed = check(service.texts_encoded == n_chunks, "--full re-embeds everything")
+
+    settings.embedding_model_name = settings.embedding_model_name + "-changed"
+    service = kb.build()
+    passed &= check(service.texts_encoded == n_chunks, "changed embedding model re-embeds everything")
+
+    # A JSONL that doesn't match the manifest (e.g. an interrupted copy) isn't trusted
+    jsonl_path = kb.processed / JSONL_FILE
+    lines = jsonl_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    jsonl_path.write_text("".join(lines[:-1]), encoding="utf-8")
+    previous = load_previous_build(str(kb.embeddings), str(jsonl_path), kb.manifest()["chunker"])
+    passed &= check(previous is None, "inconsistent artifacts are not reused")
+    if previous is not None:
+        previous.close()
+
+    (kb.embeddings / BUILD_MANIFEST_FILE).unlink()
+    service = kb.build()
+    passed &= check(service.texts_encoded == n_chunks, "missing manifest re-embeds everything")
+    return passed
+
+
+def main() -> None:
+    print("\n" + "=" * 60)
+    print("INCREMENTAL KB BUILD TEST SUITE")
+    print("=" * 60)
+
+    kb = TempKB()
+    try:
+        results = [
+            test_first_build(kb),
+            test_unchanged_rebuild(kb),
+            test_one_file_edited(kb),
+            test_invalidation(kb),
+        ]
+    finally:
+        kb.close()
+    passed = all(results)
+
+    print("\n✅ ALL INCREMENTAL BUILD TESTS PASSED" if passed else "\n❌ INCREMENTAL BUILD TESTS FAILED")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Behaviour checks for the API key pool (services/key_pool.py).
+
+Tests:
+1. Token buckets: requests/minute and tokens/minute limits, refunds
+2. Smooth weighted rotation over the keys
+3. FIFO wait queue: callers get keys in arrival order; timeouts
+4. 429 cooldown: a throttled key is skipped until Retry-After passes
+5. Async waiters: aacquire waits without blocking and leaves the queue on cancel
+
+Uses made-up keys - nothing is sent upstream.
+
+Usage:
+    python test_key_pool.py
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from typing import List, Optional
+from app.services.key_pool import KeyPool, KeyPoolExhausted, PooledKey
+
+
+class FakeRateLimitError(Exception):
+    """Stands in for an upstream 429 (same attributes as LLMError)."""
+
+    def __init__(self, retry_after: Optional[str] = None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.retry_after = retry_after
+
+
+def make_pool(*keys: PooledKey, max_wait: float = 5.0, cooldown: float = 30.0) -> KeyPool:
+    return KeyPool("test", list(keys), max_wait_seconds=max_wait, cooldown_seconds=cooldown)
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✓' if ok else '✗'} {message}")
+    return ok
+
+
+def test_token_buckets() -> bool:
+    """Test 1: a key takes no more requests/tokens than its buckets hold."""
+    print("\n" + "=" * 60)
+    print("TEST 1: Token buckets")
+    print("=" * 60)
+
+    passed = True
+    pool = make_pool(PooledKey("key_a", "secret-a", 1.0, rpm=2, tpm=None), max_wait=0.2)
+    pool.acquire()
+    pool.acquire()
+    start = time.monotonic()
+    try:
+        pool.acquire()
+        passed &= check(False, "third request within the minute should wait and time out")
+    except KeyPoolExhausted:
+        elapsed = time.monotonic() - start
+        passed &= check(0.15 <= elapsed < 1.0, f"RPM exhausted: third request timed out after {elapsed:.2f}s")
+    passed &= check(pool.stats()["timeouts"] == 1, "timeout counted in stats")
+
+    pool = make_pool(PooledKey("key_a", "secret-a", 1.0, rpm=0, tpm=1000), max_wait=0.2)
+    lease = pool.acquire(tokens=800)
+    passed &= check(pool.keys[0].tokens.level == 200, "TPM: estimate taken up front (1000 -> 200)")
+    lease.finish(tokens_used=300)
+    passed &= check(abs(pool.keys[0].tokens.level - 700) < 1, "TPM: estimate replaced by real usage (-> 700)")
+    pool.acquire(tokens=600).finish(error=RuntimeError("boom"))
+    passed &= check(abs(pool.keys[0].tokens.level - 700) < 1, "TPM: failed request refunded in full")
+    passed &= check(pool.keys[0].tokens_used == 300, "tokens_used counts successful usage only")
+    return passed
+
+
+def test_weighted_rotation() -> bool:
+    """Test 2: leases follow the key weights, interleaved."""
+    print("\n" + "=" * 60)
+    print("TEST 2: Smooth weighted rotation")
+    print("=" * 60)
+
+    pool = make_pool(
+        PooledKey("key_a", "secret-a", 2.0, rpm=0, tpm=None),
+        PooledKey("key_b", "secret-b", 1.0, rpm=0, tpm=None),
+    )
+    names = [pool.acquire().name for _ in range(6)]
+    print(f"  Order: {names}")
+
+    passed = check(names.count("key_a") == 4 and names.count("key_b") == 2, "2:1 weights give 4 + 2 leases")
+    passed &= check(names[:3] == ["key_a", "key_b", "key_a"], "rotation interleaves instead of bursting one key")
+    return passed
+
+
+def test_fifo_waiters() -> bool:
+    """Test 3: when every key is exhausted, waiters are served in arrival order."""
+    print("\n" + "=" * 60)
+    print("TEST 3: FIFO wait queue")
+    print("=" * 60)
+
+    key = PooledKey("key_a", "secret-a", 1.0, rpm=600, tpm=None)  # One request per 0.1s once drained
+    key.requests.level = 0.0
+    pool = make_pool(key, max_wait=3.0)
+
+    order: List[int] = []
+    order_lock = threading.Lock()
+
+    def worker(i: int) -> None:
+        pool.acquire()
+        with order_lock:
+            order.append(i)
+
+    threads = []
+    for i in range(4):
+        thread = threading.Thread(target=worker, args=(i,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)  # Fix the arrival order
+    for thread in threads:
+        thread.join(5)
+
+    print(f"  Served: {order}")
+    passed = check(order == [0, 1, 2, 3], "waiters served in arrival order")
+    passed &= check(pool.stats()["queued"] == 0, "queue empty afterwards")
+
+    # A caller's own deadline is honoured (and doesn't exceed the pool cap)
+    key.requests.level = 0.0
+    key.requests.rate = 0.001  # Effectively no refill
+    start = time.monotonic()
+    try:
+        pool.acquire(max_wait=0.1)
+        passed &= check(False, "exhausted pool should time out")
+    except KeyPoolExhausted:
+        passed &= check(time.monotonic() - start < 0.5, "per-call max_wait honoured")
+    passed &= check(pool.stats()["queued"] == 0, "timed-out caller left the queue")
+    return passed
+
+
+def test_429_cooldown() -> bool:
+    """Test 4: a 429 cools the key down so retries rotate to another key."""
+    print("\n" + "=" * 60)
+    print("TEST 4: 429 cooldown")
+    print("=" * 60)
+
+    pool = make_pool(
+        PooledKey("key_a", "secret-a", 1.0, rpm=0, tpm=None),
+        PooledKey("key_b", "secret-b", 1.0, rpm=0, tpm=None),
+        cooldown=30.0,
+    )
+    lease = pool.acquire()
+    throttled = lease.name
+    lease.finish(error=FakeRateLimitError(retry_after="0.3"))
+
+    names = [pool.acquire().name for _ in range(4)]
+    passed = check(throttled not in names, f"{throttled} skipped while cooling down ({names})")
+    stats = pool.stats()["keys"][throttled]
+    passed &= check(stats["throttled"] == 1 and stats["cooldown_seconds"] > 0, "cooldown recorded in stats")
+
+    time.sleep(0.35)
+    names = [pool.acquire().name for _ in range(4)]
+    passed &= check(throttled in names, "key back in rotation after Retry-After")
+
+    # Without Retry-After the pool default applies
+    lease = pool.acquire()
+    lease.finish(error=FakeRateLimitError())
+    cooldown = pool.stats()["keys"][lease.name]["cooldown_seconds"]
+    passed &= check(25 <= cooldown <= 30, f"default cooldown used without Retry-After ({cooldown}s)")
+
+    # Only 429s cool a key down
+    pool = make_pool(PooledKey("key_a", "secret-a", 1.0, rpm=0, tpm=None))
+    pool.acquire().finish(error=RuntimeError("500 Internal Server Error"))
+    passed &= check(pool.stats()["keys"]["key_a"]["cooldown_seconds"] == 0, "other errors don't cool the key down")
+    return passed
+
+
+async def _async_waiters() -> bool:
+    key = PooledKey("key_a", "secret-a", 1.0, rpm=600, tpm=None)
+    key.requests.level = 0.0
+    pool = make_pool(key, max_wait=3.0)
+
+    # The event loop keeps running while a caller waits for a key
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.ensure_future(ticker())
+    lease = await pool.aacquire()
+    passed = check(lease.name == "key_a" and ticks >= 3, f"aacquire waited without blocking the loop ({ticks} ticks)")
+
+    # A cancelled waiter at the head passes the turn on
+    key.requests.level = 0.0
+    first = asyncio.ensure_future(pool.aacquire())
+    await asyncio.sleep(0.02)
+    second = asyncio.ensure_future(pool.aacquire())
+    await asyncio.sleep(0.02)
+    first.cancel()
+    await asyncio.wait_for(second, 2.0)
+    passed &= check(first.cancelled() and second.done(), "cancelled head waiter handed its turn to the next")
+    passed &= check(pool.stats()["queued"] == 0, "queue empty afterwards")
+
+    ticking.cancel()
+    return passed
+
+
+def test_async_waiters() -> bool:
+    """Test 5: async callers share the same queue semantics."""
+    print("\n" + "=" * 60)
+    print("TEST 5: Async waiters")
+    print("=" * 60)
+    return asyncio.run(_async_waiters())
+
+
+def main() -> None:
+    print("\n" + "=" * 60)
+    print("KEY POOL TEST SUITE")
+    print("=" * 60)
+
+    results = [
+        test_token_buckets(),
+        test_weighted_rotation(),
+        test_fifo_waiters(),
+        test_429_cooldown(),
+        test_async_waiters(),
+    ]
+    passed = all(results)
+
+    print("\n✅ ALL KEY POOL TESTS PASSED" if passed else "\n❌ KEY POOL TESTS FAILED")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Parity and latency check for the ONNX embedding backend.
+
+Tests:
+1. Parity: cosine similarity between torch and ONNX (fp32 and int8)
+   embeddings of KB chunks and typical helper queries
+2. Latency: single-query p50/p99 and batch throughput, torch vs ONNX
+
+Run export_onnx_model.py first. Needs torch + sentence-transformers
+(for the reference embeddings) and onnxruntime.
+
+Usage:
+    python test_onnx_embeddings.py
+    python test_onnx_embeddings.py --min-cosine 0.98 --runs 300
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+from app.config import settings
+from app.services.onnx_embedder import OnnxEmbedder, QUANTIZED_MODEL_FILE, onnx_model_exists
+
+
+# Typical helper-mode queries (mixed Hindi / English / Hinglish)
+SAMPLE_QUERIES = [
+    "How do I test soil color?",
+    "How to check soil moisture",
+    "मिट्टी का रंग कैसे देखें",
+    "मिट्टी में नमी कैसे पता करें",
+    "mitti ki gandh kaise check karein",
+    "What are earthworms a sign of?",
+    "domat mitti kya hai",
+    "I don't know",
+]
+
+
+def load_texts() -> List[str]:
+    """KB chunk texts (if preprocessed) plus the sample queries."""
+    texts = list(SAMPLE_QUERIES)
+    jsonl_path = Path(__file__).parent / settings.kb_processed_dir / "kb_chunks.jsonl"
+    if jsonl_path.exists():
+        with open(jsonl_path, "r", encoding="utf-8") as f:
+            texts.extend(json.loads(line)["text"] for line in f if line.strip())
+    return texts
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity."""
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def test_parity(reference: np.ndarray, backends: Dict[str, OnnxEmbedder], texts: List[str], min_cosine: float) -> bool:
+    """Test 1: every ONNX embedding must be close to the torch embedding."""
+    print("\n" + "=" * 60)
+    print(f"TEST 1: Parity ({len(texts)} texts, min cosine {min_cosine})")
+    print("=" * 60)
+
+    passed = True
+    for name, embedder in backends.items():
+        cosines = cosine_rows(reference, embedder.encode(texts))
+        ok = float(cosines.min()) >= min_cosine
+        passed = passed and ok
+        print(
+            f"{'✓' if ok else '✗'} {name:<6} mean {cosines.mean():.5f}  "
+            f"min {cosines.min():.5f}  (worst: {texts[int(cosines.argmin())][:40]!r})"
+        )
+    return passed
+
+
+def time_single(encode, queries: List[str], runs: int) -> List[float]:
+    """Latencies (ms) of single-query encodes, as helper mode issues them."""
+    encode(queries[:1])  # Warm-up
+    latencies = []
+    for i in range(runs):
+        start = time.perf_counter()
+        encode([queries[i % len(queries)]])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def test_latency(torch_model, backends: Dict[str, OnnxEmbedder], texts: List[str], runs: int) -> None:
+    """Test 2: single-query latency and batch throughput."""
+    print("\n" + "=" * 60)
+    print(f"TEST 2: Latency ({runs} single-query runs, batch of {len(texts)})")
+    print("=" * 60)
+
+    encoders = {"torch": lambda batch: torch_model.encode(batch, convert_to_numpy=True)}
+    encoders.update({name: embedder.encode for name, embedder in backends.items()})
+
+    print(f"{'backend':<8}{'p50 ms':>10}{'p99 ms':>10}{'batch texts/s':>16}")
+    for name, encode in encoders.items():
+        latencies = time_single(encode, SAMPLE_QUERIES, runs)
+        start = time.perf_counter()
+        encode(texts)
+        throughput = len(texts) / (time.perf_counter() - start)
+        print(
+            f"{name:<8}{np.percentile(latencies, 50):>10.2f}"
+            f"{np.percentile(latencies, 99):>10.2f}{throughput:>16.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ONNX embedding backend parity + latency")
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="Parity threshold (int8)")
+    parser.add_argument("--runs", type=int, default=200, help="Single-query runs per backend")
+    parser.add_argument("--threads", type=int, default=settings.embedding_num_threads)
+    args = parser.parse_args()
+
+    onnx_dir = str(Path(__file__).parent / settings.embedding_onnx_dir)
+    if not onnx_model_exists(onnx_dir):
+        sys.exit(f"⚠ No ONNX model in {onnx_dir} - run export_onnx_model.py first")
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+
+    torch_model = SentenceTransformer(settings.embedding_model_name, device="cpu")
+    backends = {"fp32": OnnxEmbedder(onnx_dir, quantized=False, num_threads=args.threads)}
+    if (Path(onnx_dir) / QUANTIZED_MODEL_FILE).exists():
+        backends["int8"] = OnnxEmbedder(onnx_dir, quantized=True, num_threads=args.threads)
+
+    texts = load_texts()
+    reference = torch_model.encode(texts, convert_to_numpy=True)
+
+    passed = test_parity(reference, backends, texts, args.min_cosine)
+    test_latency(torch_model, backends, texts, args.runs)
+
+    print("\n✅ Parity OK" if passed else "\n❌ Parity below threshold")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
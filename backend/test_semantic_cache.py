@@ -0,0 +1,245 @@
+"""
+Behaviour checks for the semantic cache (services/semantic_cache.py).
+
+Tests:
+1. Lookup: threshold, buckets per (kind, namespace, parameter, language)
+2. TTL and capacity, in memory and in the SQLite store (shared by workers)
+3. Extraction hits refused when the message names another value (or a
+   synonym of one) or different numbers
+4. Helper texts are namespaced by the KB content id; fallbacks never stored
+
+Uses a fake embedding (fixed vectors per message) and temporary SQLite
+files - the embedding model is never loaded.
+
+Usage:
+    python test_semantic_cache.py
+"""
+
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict
+import numpy as np
+from app.services import answer_extractor, orchestrator_enhanced
+from app.services.answer_extractor import AnswerExtractor
+from app.services.llm_adapter import FallbackText
+from app.services.semantic_cache import SemanticCache, names_other_value, numbers_differ
+
+
+DIMENSION = 8
+
+
+def basis(i: int) -> np.ndarray:
+    vector = np.zeros(DIMENSION, dtype=np.float32)
+    vector[i] = 1.0
+    return vector
+
+
+def blend(a: np.ndarray, b: np.ndarray, cosine: float) -> np.ndarray:
+    """Unit vector at `cosine` similarity to `a` (a and b orthonormal)."""
+    return (cosine * a + math.sqrt(1.0 - cosine ** 2) * b).astype(np.float32)
+
+
+class FakeSemanticCache(SemanticCache):
+    """SemanticCache with fixed message vectors instead of the embedding model."""
+
+    def __init__(self, vectors: Dict[str, np.ndarray], **kwargs):
+        super().__init__(**kwargs)
+        self.vectors = vectors
+
+    def embed(self, message: str) -> np.ndarray:
+        return self.vectors.get(message, basis(DIMENSION - 1))
+
+
+def memory_cache(ttl_seconds: float = 60, max_entries: int = 16, vectors=None) -> FakeSemanticCache:
+    return FakeSemanticCache(vectors or {}, store="memory", path="", max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✓' if ok else '✗'} {message}")
+    return ok
+
+
+def test_lookup() -> bool:
+    """Test 1: hits need the threshold and the same bucket."""
+    print("\n" + "=" * 60)
+    print("TEST 1: Lookup threshold and buckets")
+    print("=" * 60)
+
+    cache = memory_cache()
+    key = ("helper", "Groq:llama:kbabc", "color", "en")
+    cache.add(key, "how to check colour", basis(0), {"text": "Look at the soil in daylight."})
+
+    hit = cache.lookup(key, blend(basis(0), basis(1), 0.95), threshold=0.90)
+    passed = check(hit is not None and hit.matched_message == "how to check colour", "paraphrase at 0.95 hits at 0.90")
+    passed &= check(cache.lookup(key, blend(basis(0), basis(1), 0.80), threshold=0.90) is None, "0.80 misses at 0.90")
+
+    for other in (
+        ("helper", "Groq:llama:kbabc", "moisture", "en"),
+        ("helper", "Groq:llama:kbabc", "color", "hi"),
+        ("helper", "Ollama:mistral:kbabc", "color", "en"),
+        ("extraction", "Groq:llama:kbabc", "color", "en"),
+    ):
+        passed &= check(cache.lookup(other, basis(0), threshold=0.90) is None, f"other bucket misses {other}")
+
+    stats = cache.stats()
+    passed &= check(stats["helper"]["hits"] == 1 and stats["helper"]["misses"] == 4, f"counters ({stats['helper']})")
+    return passed
+
+
+def test_ttl_and_store(tmp_dir: str) -> bool:
+    """Test 2: entries expire; the SQLite store is shared and survives restarts."""
+    print("\n" + "=" * 60)
+    print("TEST 2: TTL, capacity and SQLite store")
+    print("=" * 60)
+
+    key = ("helper", "Groq:llama:kbabc", "color", "en")
+    cache = memory_cache(ttl_seconds=0.2)
+    cache.add(key, "how to check colour", basis(0), {"text": "..."})
+    passed = check(cache.lookup(key, basis(0), 0.9) is not None, "hit before the TTL")
+    time.sleep(0.25)
+    passed &= check(cache.lookup(key, basis(0), 0.9) is None, "miss after the TTL")
+
+    cache = memory_cache(max_entries=2)
+    for i in range(3):
+        cache.add(key, f"message {i}", basis(i), {"text": str(i)})
+    evicted = cache.lookup(key, basis(0), 0.9) is None and cache.lookup(key, basis(2), 0.9) is not None
+    passed &= check(evicted, "oldest entry evicted")
+
+    path = os.path.join(tmp_dir, "semantic_cache.sqlite3")
+    writer = FakeSemanticCache({}, store="sqlite", path=path, max_entries=16, ttl_seconds=0.5)
+    writer.add(key, "how to check colour", basis(0), {"text": "Look in daylight."})
+    reader = FakeSemanticCache({}, store="sqlite", path=path, max_entries=16, ttl_seconds=0.5)
+    hit = reader.lookup(key, basis(0), 0.9)
+    passed &= check(hit is not None and hit.payload == {"text": "Look in daylight."}, "another worker loads the entry from SQLite")
+
+    time.sleep(0.55)
+    late = FakeSemanticCache({}, store="sqlite", path=path, max_entries=16, ttl_seconds=0.5)
+    passed &= check(late.lookup(key, basis(0), 0.9) is None, "expired rows are not loaded")
+    return passed
+
+
+def test_extraction_rules() -> bool:
+    """Test 3: near-identical answers that name another value or number are not reused."""
+    print("\n" + "=" * 60)
+    print("TEST 3: Extraction value/number rules")
+    print("=" * 60)
+
+    synonyms = {"black": "black", "kali": "black", "red": "red", "lal": "red"}
+    passed = check(names_other_value("it is red", "black", synonyms), "names_other_value: 'red' vs cached black")
+    passed &= check(names_other_value("lal hai", "black", synonyms), "names_other_value: synonym 'lal' (red)")
+    passed &= check(not names_other_value("kali mitti hai", "black", synonyms), "names_other_value: synonym of the cached value")
+    passed &= check(numbers_differ("pH is 8.2", "pH is 5.5"), "numbers_differ: 8.2 vs 5.5")
+    passed &= check(not numbers_differ("pH is 5,5", "pH is 5.5"), "numbers_differ: 5,5 == 5.5")
+    passed &= check(not numbers_differ("pH ५.५ है", "pH is 5.5"), "numbers_differ: Devanagari digits")
+
+    # Through the extractor: every message embeds identically, so only the rules decide
+    same = basis(0)
+    messages = ["it is black", "it is red", "its black soil", "kali mitti hai", "lal hai",
+                "pH is 5.5", "pH is 8.2", "pH is 5,5"]
+    cache = memory_cache(vectors={message: same for message in messages})
+    extractor = AnswerExtractor("ollama")
+    saved = answer_extractor.get_semantic_cache
+    answer_extractor.get_semantic_cache = lambda: cache
+    try:
+        colors = ["black", "red", "brown", "yellow", "grey"]
+        _, vector = extractor._semantic_lookup("it is black", "color", "en", colors)
+        extractor._semantic_store("it is black", "color", "en", vector, ("black", 0.95))
+
+        def reused(message: str, parameter: str, values: list) -> bool:
+            hit, _ = extractor._semantic_lookup(message, parameter, "en", values)
+            return hit is not None
+
+        passed &= check(not reused("it is red", "color", colors), "'it is red' not answered with black")
+        passed &= check(reused("its black soil", "color", colors), "'its black soil' reuses black")
+        passed &= check(reused("kali mitti hai", "color", colors), "'kali mitti hai' (synonym) reuses black")
+        passed &= check(not reused("lal hai", "color", colors), "'lal hai' (synonym of red) refused")
+
+        ph_values = ["acidic", "neutral", "alkaline"]
+        _, vector = extractor._semantic_lookup("pH is 5.5", "ph", "en", ph_values)
+        extractor._semantic_store("pH is 5.5", "ph", "en", vector, ("acidic", 0.9))
+        passed &= check(not reused("pH is 8.2", "ph", ph_values), "'pH is 8.2' not answered with 5.5's value")
+        passed &= check(reused("pH is 5,5", "ph", ph_values), "'pH is 5,5' reuses it")
+    finally:
+        answer_extractor.get_semantic_cache = saved
+
+    stats = cache.stats()["extraction"]
+    passed &= check(stats["hits"] == 3, f"refused hits counted as misses ({stats})")
+    return passed
+
+
+class FakeEngine:
+    def __init__(self, content_id: str):
+        self.content_id = content_id
+
+
+class FakeLLM:
+    namespace = "GroqLLMAdapter:llama-3.3-70b"
+
+
+def test_helper_namespacing() -> bool:
+    """Test 4: a KB with other content doesn't serve helper texts cached for the old one."""
+    print("\n" + "=" * 60)
+    print("TEST 4: KB content id namespacing")
+    print("=" * 60)
+
+    message = "how do I check colour"
+    cache = memory_cache(vectors={message: basis(0)})
+    llm = FakeLLM()
+    old_kb, new_kb = FakeEngine("3f2a9c"), FakeEngine("b71e04")
+
+    saved = orchestrator_enhanced.get_semantic_cache
+    orchestrator_enhanced.get_semantic_cache = lambda: cache
+    try:
+        orchestrator_enhanced._semantic_helper_store(llm, old_kb, "color", "en", message, "Look in daylight.", ["chunk"])
+        hit = orchestrator_enhanced._semantic_helper_lookup(llm, old_kb, "color", "en", message)
+        passed = check(hit is not None and hit.payload["text"] == "Look in daylight.", "same KB content: hit")
+        passed &= check(
+            orchestrator_enhanced._semantic_helper_lookup(llm, new_kb, "color", "en", message) is None,
+            "other KB content id: miss",
+        )
+        passed &= check(
+            orchestrator_enhanced._semantic_helper_lookup(llm, FakeEngine("3f2a9c"), "color", "en", message) is not None,
+            "same content id after a restart/reload: hit",
+        )
+
+        fallback_message = "what about smell"
+        cache.vectors[fallback_message] = basis(1)
+        orchestrator_enhanced._semantic_helper_store(
+            llm, old_kb, "smell", "en", fallback_message, FallbackText("Please select from the options."), []
+        )
+        passed &= check(
+            orchestrator_enhanced._semantic_helper_lookup(llm, old_kb, "smell", "en", fallback_message) is None,
+            "fallback helper texts never stored",
+        )
+    finally:
+        orchestrator_enhanced.get_semantic_cache = saved
+    return passed
+
+
+def main() -> None:
+    print("\n" + "=" * 60)
+    print("SEMANTIC CACHE TEST SUITE")
+    print("=" * 60)
+
+    tmp_dir = tempfile.mkdtemp(prefix="semantic_cache_test_")
+    try:
+        results = [
+            test_lookup(),
+            test_ttl_and_store(tmp_dir),
+            test_extraction_rules(),
+            test_helper_namespacing(),
+        ]
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    passed = all(results)
+
+    print("\n✅ ALL SEMANTIC CACHE TESTS PASSED" if passed else "\n❌ SEMANTIC CACHE TESTS FAILED")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
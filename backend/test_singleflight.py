@@ -0,0 +1,243 @@
+"""
+Behaviour checks for request coalescing (services/singleflight.py).
+
+Tests:
+1. Threads: concurrent identical calls share one call, result and exception
+2. Coroutines: same, on one event loop
+3. Cancellation: a cancelled caller leaves the call running for the others;
+   once every caller is gone the call is cancelled
+4. LLMClient: fingerprinted calls coalesce, each caller gets its own copy
+
+Uses fake calls - nothing is sent upstream.
+
+Usage:
+    python test_singleflight.py
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from typing import List
+from app.config import settings
+from app.services.llm_client import LLMClient, LLMResult
+from app.services.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✓' if ok else '✗'} {message}")
+    return ok
+
+
+def test_threads() -> bool:
+    """Test 1: SingleFlight coalesces concurrent calls from threads."""
+    print("\n" + "=" * 60)
+    print("TEST 1: Thread coalescing")
+    print("=" * 60)
+
+    flights = SingleFlight()
+    calls = 0
+    shared = 0
+    results: List[object] = []
+    lock = threading.Lock()
+
+    def slow_call() -> dict:
+        nonlocal calls
+        with lock:
+            calls += 1
+        time.sleep(0.2)
+        return {"answer": 42}
+
+    def on_shared() -> None:
+        nonlocal shared
+        with lock:
+            shared += 1
+
+    def worker() -> None:
+        result = flights.do("same-request", slow_call, on_shared)
+        with lock:
+            results.append(result)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    passed = check(calls == 1 and shared == 7, f"8 callers, {calls} call, {shared} shared")
+    passed &= check(len(results) == 8 and all(r is results[0] for r in results), "every caller got the result")
+    passed &= check(flights.in_flight() == 0, "nothing left in flight")
+
+    # Exceptions are shared too
+    errors: List[BaseException] = []
+
+    def failing_call() -> None:
+        time.sleep(0.1)
+        raise ValueError("upstream failed")
+
+    def failing_worker() -> None:
+        try:
+            flights.do("failing-request", failing_call)
+        except ValueError as e:
+            with lock:
+                errors.append(e)
+
+    threads = [threading.Thread(target=failing_worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    passed &= check(len(errors) == 4, "every caller got the exception")
+
+    # Not a cache: a later call runs again
+    flights.do("same-request", slow_call)
+    passed &= check(calls == 2, "finished calls are not cached")
+    return passed
+
+
+async def _coroutines() -> bool:
+    flights = AsyncSingleFlight()
+    calls = 0
+
+    async def slow_call() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    results = await asyncio.gather(*(flights.do("same-request", slow_call) for _ in range(6)))
+    passed = check(calls == 1 and results == ["ok"] * 6, f"6 callers, {calls} call")
+
+    different = await asyncio.gather(flights.do("a", slow_call), flights.do("b", slow_call))
+    passed &= check(calls == 3 and different == ["ok", "ok"], "different keys don't coalesce")
+
+    async def failing_call() -> str:
+        await asyncio.sleep(0.05)
+        raise ValueError("upstream failed")
+
+    outcomes = await asyncio.gather(*(flights.do("failing", failing_call) for _ in range(3)), return_exceptions=True)
+    passed &= check(all(isinstance(o, ValueError) for o in outcomes), "every caller got the exception")
+    passed &= check(flights.in_flight() == 0, "nothing left in flight")
+    return passed
+
+
+def test_coroutines() -> bool:
+    """Test 2: AsyncSingleFlight coalesces concurrent calls from coroutines."""
+    print("\n" + "=" * 60)
+    print("TEST 2: Coroutine coalescing")
+    print("=" * 60)
+    return asyncio.run(_coroutines())
+
+
+async def _cancellation() -> bool:
+    flights = AsyncSingleFlight()
+    started = 0
+    finished = 0
+    cancelled = 0
+
+    async def slow_call() -> str:
+        nonlocal started, finished, cancelled
+        started += 1
+        try:
+            await asyncio.sleep(0.2)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+        finished += 1
+        return "ok"
+
+    # One of two callers cancelled: the call keeps going for the other
+    first = asyncio.ensure_future(flights.do("request", slow_call))
+    second = asyncio.ensure_future(flights.do("request", slow_call))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    result = await second
+    passed = check(first.cancelled() and result == "ok", "remaining caller still got the result")
+    passed &= check(started == 1 and finished == 1 and cancelled == 0, "call not cancelled while a caller waits")
+
+    # Every caller cancelled: the call is cancelled and forgotten
+    callers = [asyncio.ensure_future(flights.do("abandoned", slow_call)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.sleep(0.05)
+    passed &= check(cancelled == 1, "call cancelled once its last caller left")
+    passed &= check(flights.in_flight() == 0, "abandoned call forgotten")
+
+    # A caller arriving after that starts a fresh call
+    result = await flights.do("abandoned", slow_call)
+    passed &= check(result == "ok" and started == 3, "next caller starts a new call")
+    return passed
+
+
+def test_cancellation() -> bool:
+    """Test 3: cancelling callers only cancels the call when nobody waits for it."""
+    print("\n" + "=" * 60)
+    print("TEST 3: Cancellation")
+    print("=" * 60)
+    return asyncio.run(_cancellation())
+
+
+def test_llm_client() -> bool:
+    """Test 4: LLMClient coalesces fingerprinted calls and copies the result."""
+    print("\n" + "=" * 60)
+    print("TEST 4: LLMClient coalescing")
+    print("=" * 60)
+
+    if not settings.llm_coalesce_enabled:
+        print("⚠ llm_coalesce_enabled is off - skipped")
+        return True
+
+    client = LLMClient()
+    sends = 0
+    results: List[LLMResult] = []
+    lock = threading.Lock()
+
+    def send() -> LLMResult:
+        nonlocal sends
+        with lock:
+            sends += 1
+        time.sleep(0.2)
+        return LLMResult(text="shared answer", provider="test", model="fake")
+
+    def worker() -> None:
+        result = client._call("test.coalesce", "test.coalesce", send, retries=0, fingerprint="fp-1")
+        with lock:
+            results.append(result)
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    passed = check(sends == 1 and len(results) == 5, f"5 callers, {sends} upstream call")
+    passed &= check(len({id(r) for r in results}) == 5, "each caller got its own copy")
+    coalesced = client.stats()["call_sites"]["test.coalesce"]["coalesced"]
+    passed &= check(coalesced == 4, f"coalesced calls counted ({coalesced})")
+
+    client._call("test.coalesce", "test.coalesce", send, retries=0)
+    client._call("test.coalesce", "test.coalesce", send, retries=0)
+    passed &= check(sends == 3, "calls without a fingerprint never coalesce")
+    return passed
+
+
+def main() -> None:
+    print("\n" + "=" * 60)
+    print("SINGLEFLIGHT TEST SUITE")
+    print("=" * 60)
+
+    results = [
+        test_threads(),
+        test_coroutines(),
+        test_cancellation(),
+        test_llm_client(),
+    ]
+    passed = all(results)
+
+    print("\n✅ ALL SINGLEFLIGHT TESTS PASSED" if passed else "\n❌ SINGLEFLIGHT TESTS FAILED")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()